@@ -10,6 +10,10 @@ setup(
         # Add your dependencies here, e.g.:
         # 'Markdown',
     ],
+    extras_require={
+        # vectorized attack forest evaluation, see tara/domain/numpy_forest_evaluator.py
+        'numpy': ['numpy'],
+    },
     entry_points={
         'console_scripts': [
             'taratool=tara.__main__:main',
@@ -1,15 +1,137 @@
-import sys, os
-from tara.domain.file_stubs import file_stubs
+import sys, os, time, cProfile
+from typing import Union
+from tara.domain.file_stubs import file_stubs, FileType
 from tara.domain.tara_parser import TaraParser
 from tara.domain.attack_tree_stub_generator import AttackTreeStubGenerator
 from tara.domain.tara_document_generator import TaraDocumentGenerator
 from tara.domain.threat_scenario_document_generator import ThreatScenarioDocumentGenerator
+from tara.domain.what_if_document_generator import WhatIfDocumentGenerator
+from tara.domain.control_set_optimizer import ControlSetOptimizer, read_control_costs
+from tara.domain.risk import RiskLevel
+from tara.domain.tara import Tara
+from tara.domain import evaluation_counters
+from tara.domain.tara_model_service import TaraModelService
+from tara.domain.tara_snapshot import write_snapshot, read_snapshot
+from tara.domain.flat_attack_forest import FlatAttackForest
+from tara.domain.numpy_forest_evaluator import NumpyForestEvaluator
 from tara.utilities.file_reader import FileReader
 from tara.utilities.file_writer import FileWriter
 from tara.utilities.error_logger import ErrorLogger
+from tara.utilities.parse_cache import ParseCache, MemoryParseCache
+from tara.utilities.json_server import create_json_server
+from tara.utilities.streaming_markdown_writer import StreamingMarkdownWriter
+from tara.utilities.phase_timer import PhaseTimer
 from tara.MarkdownLib.markdown_writer import MarkdownWriter
 
-usage_help = "Usage: python tara.py [init|check|gentrees|generate]"
+usage_help = "Usage: python tara.py [init|check|gentrees|generate|watch|whatif CONTROLS...|optimize TARGET [COSTS]|serve [PORT]|snapshot [FILE]] [--jobs N] [--cache] [--interval SECONDS] [--timings] [--profile FILE] [--counters] [--from-snapshot FILE] [--sensitivity] [--evaluator tree|flat|numpy]"
+
+# The values of --evaluator
+evaluator_names = ["tree", "flat", "numpy"]
+
+def parse_options(arguments: list[str]) -> tuple[dict, list[str]]:
+    """
+    Separates the options from the other arguments.
+    --jobs N: parse the attack tree files in N processes
+    --cache: reuse the parsed attack tree files of earlier runs from the directory .tara_cache
+    --interval SECONDS: the time between two checks for changed files of the watch command
+    --timings: print the time and peak memory of each phase, tracing the memory slows the command down
+    --profile FILE: write cProfile statistics of the command to FILE, e.g. for pstats or snakeviz
+    --counters: print how often the attack tree nodes were evaluated and the trees were looked up by generate
+    --from-snapshot FILE: load the TARA from a file written by the snapshot command instead of parsing the markdown files
+    --sensitivity: add the control sensitivity section to the report of generate, which evaluates the TARA once more per active control
+    --evaluator NAME: how whatif evaluates the control sets, tree switches the controls on the attack trees and re-evaluates
+        the dependent nodes (default), flat evaluates all trees per control set in one sweep over a FlatAttackForest,
+        numpy evaluates them level by level with a NumpyForestEvaluator and falls back to flat if numpy is not installed
+    """
+    options = {"jobs": 1, "cache": False, "interval": 1.0, "timings": False, "profile": None, "counters": False, "from_snapshot": None,
+               "sensitivity": False, "evaluator": "tree"}
+    other_arguments = []
+    argument_iter = iter(arguments)
+    for argument in argument_iter:
+        if argument == "--jobs":
+            value = next(argument_iter, "")
+            if not value.isdigit() or int(value) < 1:
+                print("The option --jobs requires a positive number of processes.")
+                sys.exit(1)
+            options["jobs"] = int(value)
+        elif argument == "--interval":
+            value = next(argument_iter, "")
+            try:
+                options["interval"] = float(value)
+            except ValueError:
+                options["interval"] = 0
+            if options["interval"] <= 0:
+                print("The option --interval requires a positive number of seconds.")
+                sys.exit(1)
+        elif argument == "--cache":
+            options["cache"] = True
+        elif argument == "--timings":
+            options["timings"] = True
+        elif argument == "--counters":
+            options["counters"] = True
+        elif argument == "--sensitivity":
+            options["sensitivity"] = True
+        elif argument == "--profile":
+            value = next(argument_iter, "")
+            if not value or value.startswith("--"):
+                print("The option --profile requires a file name.")
+                sys.exit(1)
+            options["profile"] = value
+        elif argument == "--evaluator":
+            value = next(argument_iter, "")
+            if value not in evaluator_names:
+                print(f"The option --evaluator requires one of {', '.join(evaluator_names)}.")
+                sys.exit(1)
+            options["evaluator"] = value
+        elif argument == "--from-snapshot":
+            value = next(argument_iter, "")
+            if not value or value.startswith("--"):
+                print("The option --from-snapshot requires a file name.")
+                sys.exit(1)
+            options["from_snapshot"] = value
+        elif argument.startswith("--"):
+            print(f"Unknown option: {argument}")
+            print(usage_help)
+            sys.exit(1)
+        else:
+            other_arguments.append(argument)
+    return options, other_arguments
+
+def create_parser(error_logger: ErrorLogger, options: dict) -> TaraParser:
+    return TaraParser(FileReader(), error_logger, ParseCache() if options["cache"] else None, options["timer"])
+
+def load_tara(error_logger: ErrorLogger, options: dict) -> Tara:
+    """
+    Loads the TARA from the snapshot given by --from-snapshot or parses the markdown files in the current directory.
+    """
+    if options["from_snapshot"] is None:
+        return create_parser(error_logger, options).parse(".", jobs=options["jobs"])
+
+    with options["timer"].phase("reading the snapshot"):
+        try:
+            return read_snapshot(options["from_snapshot"], error_logger)
+        except (OSError, ValueError) as e:
+            print(f"Could not read the snapshot {options['from_snapshot']}: {e}")
+            sys.exit(1)
+
+def create_evaluator(tara: Tara, options: dict, error_logger: ErrorLogger) -> Union[FlatAttackForest, NumpyForestEvaluator]:
+    """
+    Returns the evaluator selected with --evaluator for the what-if analysis, or None to switch the controls on the attack trees.
+    Without numpy, the flat forest is returned instead of the NumPy evaluator.
+    """
+    if options["evaluator"] == "tree":
+        return None
+
+    with options["timer"].phase("building the flat forest"):
+        forest = FlatAttackForest.from_attack_trees(tara.attack_trees)
+
+    if options["evaluator"] == "numpy":
+        try:
+            with options["timer"].phase("building the numpy evaluator"):
+                return NumpyForestEvaluator(forest)
+        except ImportError as e:
+            error_logger.log_warning(f"{e} The flat forest is used instead.")
+    return forest
 
 def init():
     """The init command initializes the directory tara with stubs for the necessary files."""
@@ -23,65 +145,311 @@ def init():
             with open(file_path, 'w') as f:
                 f.write(file_stub.content)
 
-def check():
+def check(options: dict):
     print("Checking...")
-    parser = TaraParser(FileReader(), ErrorLogger())
-    parser.parse(".")
+    parser = create_parser(ErrorLogger(), options)
+    parser.parse(".", jobs=options["jobs"])
 
-def generate_attack_trees():
+def generate_attack_trees(options: dict):
     print("Parsing input files...")
     error_logger = ErrorLogger()
-    parser = TaraParser(FileReader(), error_logger)
+    parser = create_parser(error_logger, options)
     directory = "."
-    tara = parser.parse(directory)
+    tara = parser.parse(directory, jobs=options["jobs"])
     if error_logger.has_errors():
         print("Errors found during parsing. Please fix them before generating attack trees.")
         sys.exit(1)
         
     print("Generating attack trees...")
     generator = AttackTreeStubGenerator(FileWriter(), error_logger)
-    generator.update_stubs(tara, directory)
+    with options["timer"].phase("writing attack tree stubs"):
+        generator.update_stubs(tara, directory)
 
-def generate():
+def generate(options: dict):
     print("Generating...")
     error_logger = ErrorLogger()
-    parser = TaraParser(FileReader(), error_logger)
-    directory = "."
-    tara = parser.parse(directory)
+    tara = load_tara(error_logger, options)
     if error_logger.has_errors():
         print("Errors found during parsing. Please fix them before generating the document.")
         sys.exit(1)
 
+    timer: PhaseTimer = options["timer"]
+    with timer.phase("generating threat scenarios"):
+        threat_scenario_generator = ThreatScenarioDocumentGenerator()
+        threat_scenarios_document = threat_scenario_generator.generate(tara)
+
+    # the report is written part by part, so the whole report is never in memory at once;
+    # it replaces the previous report only if the generation succeeds
+    report_file_name = "tara_report.md"
+    temporary_file_name = f"{report_file_name}.tmp"
+    generator = TaraDocumentGenerator(error_logger, timer, options["sensitivity"])
+    try:
+        with open(temporary_file_name, 'w') as f:
+            writer = StreamingMarkdownWriter(f)
+            for part in generator.generate_parts(tara):
+                with timer.phase("writing files"):
+                    writer.write(part)
+    except BaseException:
+        # e.g. an evaluation error or Ctrl+C, the previous report is kept
+        if os.path.exists(temporary_file_name):
+            os.remove(temporary_file_name)
+        raise
+
+    if error_logger.has_errors():
+        os.remove(temporary_file_name)
+        print("Errors found tara generation.")
+        sys.exit(1)
+
+    with timer.phase("writing files"), open("06_ThreatScenarios.md", 'w') as f:
+        writer = MarkdownWriter()
+        f.write(writer.write(threat_scenarios_document))
+
+    os.replace(temporary_file_name, report_file_name)
+
+    if evaluation_counters.active is not None:
+        print(evaluation_counters.active.format_summary(tara.attack_trees))
+
+def render_reports(tara: Tara, error_logger: ErrorLogger) -> dict[str, str]:
+    """
+    Renders the threat scenarios document and the TARA report.
+
+    :return: The content of each report by file name.
+    """
     threat_scenario_generator = ThreatScenarioDocumentGenerator()
     threat_scenarios_document = threat_scenario_generator.generate(tara)
-    
+
     generator = TaraDocumentGenerator(error_logger)
     document = generator.generate(tara)
+
+    writer = MarkdownWriter()
+    return {
+        "06_ThreatScenarios.md": writer.write(threat_scenarios_document),
+        "tara_report.md": writer.write(document),
+    }
+
+def get_modification_times(directory: str) -> dict[str, int]:
+    """
+    Returns the modification times of the input files of the TARA by file path.
+    """
+    file_paths = [os.path.join(directory, FileType.to_path(file_type)) for file_type in [FileType.ASSUMPTIONS, FileType.DAMAGE_SCENARIOS, FileType.ASSETS, FileType.CONTROLS]]
+    attack_tree_dir = os.path.join(directory, "AttackTrees")
+    if os.path.isdir(attack_tree_dir):
+        file_paths += [os.path.join(attack_tree_dir, file_name) for file_name in os.listdir(attack_tree_dir) if file_name.endswith('.md')]
+
+    modification_times = {}
+    for file_path in file_paths:
+        try:
+            modification_times[file_path] = os.stat(file_path).st_mtime_ns
+        except OSError:
+            pass
+    return modification_times
+
+def watch(options: dict):
+    """
+    The watch command parses the TARA and regenerates the reports whenever an input file changes.
+    The parsed attack tree files are kept in memory, so only changed files are parsed again,
+    and a report file is only rewritten if its content has changed.
+    The files are parsed in this process to keep them in memory, so --jobs is not used.
+    """
+    directory = "."
+    cache = MemoryParseCache()
+    # Maps the report file names to their last written content
+    written_reports: dict[str, str] = {}
+    modification_times = None
+
+    print("Watching for changes, press Ctrl+C to stop...")
+    try:
+        while True:
+            current_modification_times = get_modification_times(directory)
+            if current_modification_times != modification_times:
+                modification_times = current_modification_times
+                update_reports(directory, cache, written_reports)
+            time.sleep(options["interval"])
+    except KeyboardInterrupt:
+        pass
+
+def update_reports(directory: str, cache: MemoryParseCache, written_reports: dict[str, str]) -> None:
+    """
+    Parses the TARA with the given cache and writes the reports which have changed since the last update.
+    """
+    start = time.perf_counter()
+    error_logger = ErrorLogger()
+    tara = TaraParser(FileReader(), error_logger, cache).parse(directory)
+    if error_logger.has_errors():
+        print("Errors found during parsing. The reports are updated once they are fixed.")
+        return
+
+    reports = render_reports(tara, error_logger)
     if error_logger.has_errors():
         print("Errors found tara generation.")
+        return
+
+    changed_file_names = [file_name for file_name, content in reports.items() if written_reports.get(file_name) != content]
+    for file_name in changed_file_names:
+        with open(os.path.join(directory, file_name), 'w') as f:
+            f.write(reports[file_name])
+        written_reports[file_name] = reports[file_name]
+
+    print(f"Updated {', '.join(changed_file_names) if changed_file_names else 'no reports'} in {time.perf_counter() - start:.2f} s.")
+
+def what_if(control_set_arguments: list[str], options: dict):
+    """
+    The whatif command evaluates the residual risks for several sets of active controls.
+    Each argument is a comma separated list of control IDs, e.g. "C-1,C-2". An empty argument means no active controls.
+    """
+    if not control_set_arguments:
+        print("Usage: python tara.py whatif CONTROLS... (e.g. whatif \"C-1,C-2\" \"C-3\")")
         sys.exit(1)
 
-    with open("06_ThreatScenarios.md", 'w') as f:
-        writer = MarkdownWriter()
-        f.write(writer.write(threat_scenarios_document))
+    control_sets = [{control_id.strip() for control_id in argument.split(",") if control_id.strip()} for argument in control_set_arguments]
 
-    with open("tara_report.md", 'w') as f:
+    print("Parsing input files...")
+    error_logger = ErrorLogger()
+    tara = load_tara(error_logger, options)
+    if error_logger.has_errors():
+        print("Errors found during parsing. Please fix them before running the what-if analysis.")
+        sys.exit(1)
+
+    print(f"Evaluating {len(control_sets)} control sets...")
+    generator = WhatIfDocumentGenerator()
+    try:
+        document = generator.generate(tara, control_sets, create_evaluator(tara, options, error_logger))
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+
+    with open("whatif_report.md", 'w') as f:
         writer = MarkdownWriter()
         f.write(writer.write(document))
 
+def optimize(arguments: list[str], options: dict):
+    """
+    The optimize command searches the cheapest set of active controls which brings the residual risk
+    of every threat scenario to or below the target risk level. The optional costs file contains
+    a markdown table with the header | ID | Cost |, controls without a cost cost 1.
+    """
+    target_names = [risk_level.name for risk_level in RiskLevel]
+    if len(arguments) not in [1, 2] or arguments[0] not in target_names:
+        print(f"Usage: python tara.py optimize TARGET [COSTS] with TARGET one of {', '.join(target_names)}")
+        sys.exit(1)
+    target = RiskLevel[arguments[0]]
+
+    print("Parsing input files...")
+    error_logger = ErrorLogger()
+    tara = load_tara(error_logger, options)
+    costs = read_control_costs(FileReader(), arguments[1], error_logger) if len(arguments) == 2 else {}
+    if error_logger.has_errors():
+        print("Errors found during parsing. Please fix them before optimizing the controls.")
+        sys.exit(1)
+
+    print(f"Searching the cheapest control set for residual risks at or below {target.name}...")
+    try:
+        optimizer = ControlSetOptimizer(tara, costs, error_logger)
+        control_ids = optimizer.optimize(target)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+
+    if control_ids is None:
+        print(f"The target {target.name} can not be reached with any set of controls.")
+        sys.exit(1)
+
+    print(f"Active controls: {', '.join(control_ids) if control_ids else 'none'} (cost {optimizer.get_cost(control_ids):g})")
+
+def snapshot(arguments: list[str], options: dict):
+    """
+    The snapshot command writes the parsed TARA to a binary file, by default tara.snapshot.
+    The other commands load it with --from-snapshot FILE instead of parsing the markdown files.
+    The snapshot is not updated when the markdown files change, so create it again after editing them.
+    """
+    if len(arguments) > 1:
+        print("Usage: python tara.py snapshot [FILE]")
+        sys.exit(1)
+    file_path = arguments[0] if arguments else "tara.snapshot"
+
+    print("Parsing input files...")
+    error_logger = ErrorLogger()
+    parser = create_parser(error_logger, options)
+    tara = parser.parse(".", jobs=options["jobs"])
+    if error_logger.has_errors():
+        print("Errors found during parsing. Please fix them before creating the snapshot.")
+        sys.exit(1)
+
+    with options["timer"].phase("writing the snapshot"):
+        write_snapshot(tara, file_path)
+    print(f"Snapshot written to {file_path}.")
+
+def serve(arguments: list[str], options: dict):
+    """
+    The serve command keeps the parsed TARA in memory and answers JSON requests on localhost,
+    see TaraModelService.handle for the requests. The default port is 8765.
+    With --from-snapshot the TARA is loaded from the snapshot, also on reload. The snapshot is memory-mapped
+    and the attack trees are loaded on first access, so queries for single trees and threat scenarios only
+    load the trees they depend on.
+    """
+    if len(arguments) > 1 or (arguments and not arguments[0].isdigit()):
+        print("Usage: python tara.py serve [PORT]")
+        sys.exit(1)
+    port = int(arguments[0]) if arguments else 8765
+
+    print("Parsing input files...")
+    service = TaraModelService(FileReader(), ".", options["from_snapshot"])
+    validation = service.get_validation()
+    for error in validation["errors"]:
+        print(f"Error: {error}")
+    for warning in validation["warnings"]:
+        print(f"Warning: {warning}")
+
+    server = create_json_server("127.0.0.1", port, service.handle)
+    print(f"Serving on http://127.0.0.1:{server.server_port}, press Ctrl+C to stop...")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
 def main():
-    if len(sys.argv) < 2:
+    options, arguments = parse_options(sys.argv[1:])
+    if len(arguments) < 1:
         print(usage_help)
         sys.exit(1)
-    command = sys.argv[1]
+
+    options["timer"] = PhaseTimer(enabled=options["timings"], trace_memory=True)
+    if options["counters"]:
+        evaluation_counters.enable()
+    profiler = cProfile.Profile() if options["profile"] else None
+    if profiler:
+        profiler.enable()
+    try:
+        run_command(arguments[0], arguments[1:], options)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(options["profile"])
+            print(f"Profile written to {options['profile']}.")
+        if options["timings"]:
+            print(options["timer"].format_report())
+
+def run_command(command: str, arguments: list[str], options: dict):
     if command == "init":
         init()
     elif command == "check":
-        check()
+        check(options)
     elif command == "gentrees":
-        generate_attack_trees()
+        generate_attack_trees(options)
     elif command == "generate":
-        generate()
+        generate(options)
+    elif command == "watch":
+        watch(options)
+    elif command == "whatif":
+        what_if(arguments, options)
+    elif command == "optimize":
+        optimize(arguments, options)
+    elif command == "serve":
+        serve(arguments, options)
+    elif command == "snapshot":
+        snapshot(arguments, options)
     else:
         print(f"Unknown command: {command}")
         print(usage_help)
@@ -0,0 +1,64 @@
+import sys, json
+from tara.benchmarks.scaling_benchmark import run_scaling_benchmark
+
+usage_help = ("Usage: python -m tara.benchmarks [--sizes 10,30,100] [--depth 3] [--fan-out 3] [--ref-density 0.1] "
+              "[--control-density 0.2] [--controls 20] [--seed 0] [--repeat 3] [--output FILE]")
+
+# The options of the benchmark with their default values
+option_defaults = {
+    "--sizes": "10,30,100",
+    "--depth": "3",
+    "--fan-out": "3",
+    "--ref-density": "0.1",
+    "--control-density": "0.2",
+    "--controls": "20",
+    "--seed": "0",
+    "--repeat": "3",
+}
+
+def parse_options(arguments: list[str]) -> tuple[dict, str]:
+    """
+    Returns the parameters of the benchmark and the output file, None for the console.
+    """
+    values = dict(option_defaults)
+    output_file = None
+    argument_iter = iter(arguments)
+    for argument in argument_iter:
+        value = next(argument_iter, None)
+        if value is None or (argument not in option_defaults and argument != "--output"):
+            print(usage_help)
+            sys.exit(1)
+        if argument == "--output":
+            output_file = value
+        else:
+            values[argument] = value
+
+    try:
+        parameters = {
+            "asset_counts": [int(size) for size in values["--sizes"].split(",") if size.strip()],
+            "depth": int(values["--depth"]),
+            "fan_out": int(values["--fan-out"]),
+            "ref_density": float(values["--ref-density"]),
+            "control_density": float(values["--control-density"]),
+            "control_count": int(values["--controls"]),
+            "seed": int(values["--seed"]),
+            "repeat": int(values["--repeat"]),
+        }
+    except ValueError:
+        print(usage_help)
+        sys.exit(1)
+    return parameters, output_file
+
+def main():
+    parameters, output_file = parse_options(sys.argv[1:])
+    results = run_scaling_benchmark(**parameters)
+
+    content = json.dumps(results, indent=2)
+    if output_file:
+        with open(output_file, 'w') as f:
+            f.write(content)
+    else:
+        print(content)
+
+if __name__ == "__main__":
+    main()
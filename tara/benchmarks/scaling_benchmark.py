@@ -0,0 +1,83 @@
+import math
+import tempfile
+import time
+from tara.benchmarks.synthetic_tara import SyntheticTaraGenerator
+from tara.domain.tara_parser import TaraParser
+from tara.domain.attack_forest import AttackForest
+from tara.domain.tara_document_generator import TaraDocumentGenerator
+from tara.domain.threat_scenario_document_generator import ThreatScenarioDocumentGenerator
+from tara.utilities.file_reader import FileReader
+from tara.utilities.file_writer import FileWriter
+from tara.utilities.error_logger import MemoryErrorLogger
+from tara.MarkdownLib.markdown_writer import MarkdownWriter
+
+# The measured steps in the order they run
+PHASES = ["parse", "evaluate", "threat_scenario_document", "tara_document", "write_markdown"]
+
+def run_scaling_benchmark(asset_counts: list[int], repeat: int = 3, **generator_parameters) -> dict:
+    """
+    Generates a synthetic TARA for each asset count and measures the steps of the generate command on it.
+
+    Each step is run repeat times and the fastest time is reported. The scaling exponent of a step
+    is the slope of log(time) over log(node count) between the smallest and the largest TARA:
+    about 1 for linear steps, about 2 for quadratic ones.
+
+    :param asset_counts: The sizes of the generated TARAs.
+    :param repeat: The number of runs per size.
+    :param generator_parameters: Further parameters of SyntheticTaraGenerator, e.g. depth or fan_out.
+    :return: The parameters, the timings per size and the scaling exponents, ready to be written as JSON.
+    """
+    results = [_measure(SyntheticTaraGenerator(asset_count, **generator_parameters), repeat) for asset_count in sorted(asset_counts)]
+
+    scaling_exponents = {}
+    if len(results) > 1 and results[-1]["nodes"] > results[0]["nodes"]:
+        node_ratio = math.log(results[-1]["nodes"] / results[0]["nodes"])
+        for phase in PHASES:
+            first, last = results[0]["seconds"][phase], results[-1]["seconds"][phase]
+            scaling_exponents[phase] = round(math.log(last / first) / node_ratio, 2) if first > 0 and last > 0 else None
+
+    return {
+        "parameters": dict(generator_parameters, repeat=repeat),
+        "results": results,
+        "scaling_exponents": scaling_exponents,
+    }
+
+def _measure(generator: SyntheticTaraGenerator, repeat: int) -> dict:
+    seconds = {phase: math.inf for phase in PHASES}
+    with tempfile.TemporaryDirectory() as directory:
+        generator.write(FileWriter(), directory)
+
+        for _ in range(repeat):
+            logger = MemoryErrorLogger()
+            start = time.perf_counter()
+            tara = TaraParser(FileReader(), logger).parse(directory)
+            seconds["parse"] = min(seconds["parse"], time.perf_counter() - start)
+            if logger.has_errors():
+                raise ValueError(f"The synthetic TARA has errors: {logger.get_errors()[:3]}")
+
+            forest = AttackForest(tara.attack_trees)
+            start = time.perf_counter()
+            forest.evaluate(without_controls=True)
+            forest.evaluate()
+            seconds["evaluate"] = min(seconds["evaluate"], time.perf_counter() - start)
+
+            start = time.perf_counter()
+            threat_scenario_document = ThreatScenarioDocumentGenerator().generate(tara)
+            seconds["threat_scenario_document"] = min(seconds["threat_scenario_document"], time.perf_counter() - start)
+
+            start = time.perf_counter()
+            tara_document = TaraDocumentGenerator(logger).generate(tara)
+            seconds["tara_document"] = min(seconds["tara_document"], time.perf_counter() - start)
+
+            start = time.perf_counter()
+            writer = MarkdownWriter()
+            writer.write(threat_scenario_document)
+            writer.write(tara_document)
+            seconds["write_markdown"] = min(seconds["write_markdown"], time.perf_counter() - start)
+
+    return {
+        "assets": generator.asset_count,
+        "attack_trees": len(tara.attack_trees),
+        "nodes": sum(len(tree.get_nodes()) for tree in tara.attack_trees),
+        "seconds": {phase: round(value, 6) for phase, value in seconds.items()},
+    }
@@ -0,0 +1,157 @@
+import os
+import random
+from tara.domain.file_stubs import FileType
+from tara.domain.impacts import Impact
+from tara.domain.security_property import SecurityProperty
+from tara.domain.attack_tree import circumvent_tree_id
+from tara.utilities.file_writer import IFileWriter
+
+# The valid strings of the five ratings of a leaf node
+_ELAPSED_TIMES = ["1w", "1m", "6m", "3y", ">3y"]
+_EXPERTISES = ["L", "P", "E", "ME"]
+_KNOWLEDGES = ["P", "R", "C", "SC"]
+_WINDOWS_OF_OPPORTUNITY = ["U", "E", "M", "D"]
+_EQUIPMENTS = ["ST", "SP", "B", "MB"]
+
+class SyntheticTaraGenerator:
+    """
+    Generates the input files of a valid TARA of configurable size and shape for benchmarks.
+
+    Every asset has one damage scenario for each security property, so there are three
+    attack trees per asset. Each attack tree is a complete tree of the given depth and fan-out
+    with alternating OR and AND levels. An inner node below the root is replaced by a REF node
+    with the given probability, it references an attack tree generated earlier, so the trees
+    never reference each other circularly. Each leaf carries a control with the given probability.
+    Every control has a circumvent tree with a single leaf, half of the controls are active.
+    The same parameters and seed always generate the same files.
+    """
+
+    def __init__(self, asset_count: int, depth: int = 3, fan_out: int = 3, ref_density: float = 0.1,
+                 control_density: float = 0.2, control_count: int = 20, seed: int = 0):
+        """
+        :param asset_count: The number of assets.
+        :param depth: The number of levels below the root node of each attack tree.
+        :param fan_out: The number of children of each inner node.
+        :param ref_density: The probability that an inner node below the root is a REF node.
+        :param control_density: The probability that a leaf carries a control.
+        :param control_count: The number of security controls.
+        :param seed: The seed of the random ratings and structure.
+        """
+        if asset_count < 1 or depth < 1 or fan_out < 1 or control_count < 1:
+            raise ValueError("The asset count, depth, fan-out and control count must be positive.")
+
+        self.asset_count = asset_count
+        self.depth = depth
+        self.fan_out = fan_out
+        self.ref_density = ref_density
+        self.control_density = control_density
+        self.control_count = control_count
+        self.seed = seed
+
+    def generate(self) -> dict[str, str]:
+        """
+        Generates the content of all input files.
+
+        :return: The content of each file by its path relative to the TARA directory.
+        """
+        rng = random.Random(self.seed)
+        files = {
+            FileType.to_path(FileType.ASSUMPTIONS): self._generate_assumptions(),
+            FileType.to_path(FileType.DAMAGE_SCENARIOS): self._generate_damage_scenarios(rng),
+            FileType.to_path(FileType.ASSETS): self._generate_assets(),
+            FileType.to_path(FileType.CONTROLS): self._generate_controls(),
+        }
+
+        tree_ids = []
+        for asset_number in range(1, self.asset_count + 1):
+            for security_property in SecurityProperty:
+                tree_id = f"AT_A-{asset_number}_{security_property.to_attack_id()}"
+                files[os.path.join("AttackTrees", f"{tree_id}.md")] = self._generate_attack_tree(rng, tree_id, tree_ids)
+                tree_ids.append(tree_id)
+
+        for control_number in range(1, self.control_count + 1):
+            tree_id = circumvent_tree_id(f"C-{control_number}")
+            rows = [self._leaf_row(rng, f"Circumvent control {control_number}", 0, control_id="")]
+            files[os.path.join("AttackTrees", f"{tree_id}.md")] = self._attack_tree_document(tree_id, rows)
+
+        return files
+
+    def write(self, file_writer: IFileWriter, directory: str) -> dict[str, str]:
+        """
+        Generates all input files and writes them to the directory.
+
+        :return: The content of each file by its path relative to the TARA directory.
+        """
+        files = self.generate()
+        for file_path, content in files.items():
+            file_writer.write(os.path.join(directory, file_path), content)
+        return files
+
+    def get_node_count_per_tree(self) -> int:
+        """
+        Returns the number of table rows of an attack tree of an asset.
+        """
+        return sum(self.fan_out ** level for level in range(self.depth + 1))
+
+    def _generate_assumptions(self) -> str:
+        return _document("Assumptions", FileType.get_header(FileType.ASSUMPTIONS), [["Ast-1", "Synthetic assumption", "None", ""]])
+
+    def _generate_damage_scenarios(self, rng: random.Random) -> str:
+        impacts = [impact.name for impact in Impact]
+        rows = []
+        for asset_number in range(1, self.asset_count + 1):
+            for security_property in SecurityProperty:
+                rows.append([f"DS-{asset_number}-{security_property.to_attack_id()}", f"Damage {asset_number} {security_property.name}",
+                             rng.choice(impacts), rng.choice(impacts), rng.choice(impacts), rng.choice(impacts), "", ""])
+        return _document("Damage Scenarios", FileType.get_header(FileType.DAMAGE_SCENARIOS), rows)
+
+    def _generate_assets(self) -> str:
+        rows = []
+        for asset_number in range(1, self.asset_count + 1):
+            damage_scenario_ids = [f"DS-{asset_number}-{security_property.to_attack_id()}"
+                                   for security_property in [SecurityProperty.Availability, SecurityProperty.Integrity, SecurityProperty.Confidentiality]]
+            rows.append([f"A-{asset_number}", f"Asset {asset_number}"] + damage_scenario_ids + ["", ""])
+        return _document("Assets", FileType.get_header(FileType.ASSETS), rows)
+
+    def _generate_controls(self) -> str:
+        rows = [[f"C-{control_number}", f"Control {control_number}", f"Goal-{control_number}", "x" if control_number % 2 == 1 else ""]
+                for control_number in range(1, self.control_count + 1)]
+        return _document("Controls", FileType.get_header(FileType.CONTROLS), rows)
+
+    def _generate_attack_tree(self, rng: random.Random, tree_id: str, earlier_tree_ids: list[str]) -> str:
+        rows = []
+        # (level, node number) in pre-order
+        stack = [(0, 1)]
+        while stack:
+            level, number = stack.pop()
+            name = f"Attack {tree_id} {number}"
+            if level == self.depth:
+                rows.append(self._leaf_row(rng, name, level))
+            elif level > 0 and earlier_tree_ids and rng.random() < self.ref_density:
+                referenced_tree_id = rng.choice(earlier_tree_ids)
+                rows.append(self._row(f"[{name}](./{referenced_tree_id}.md)", level, "REF"))
+            else:
+                rows.append(self._row(name, level, "OR" if level % 2 == 0 else "AND"))
+                for child in reversed(range(self.fan_out)):
+                    stack.append((level + 1, number * self.fan_out + child))
+
+        return self._attack_tree_document(tree_id, rows)
+
+    def _leaf_row(self, rng: random.Random, name: str, level: int, control_id: str = None) -> list[str]:
+        if control_id is None:
+            control_id = f"C-{rng.randint(1, self.control_count)}" if rng.random() < self.control_density else ""
+        ratings = [rng.choice(_ELAPSED_TIMES), rng.choice(_EXPERTISES), rng.choice(_KNOWLEDGES),
+                   rng.choice(_WINDOWS_OF_OPPORTUNITY), rng.choice(_EQUIPMENTS)]
+        return self._row(name, level, "LEAF", ratings, control_id)
+
+    def _row(self, name: str, level: int, node_type: str, ratings: list[str] = None, control_id: str = "") -> list[str]:
+        indentation = f"{'--' * level} " if level > 0 else ""
+        return [indentation + name, node_type] + (ratings or [""] * 5) + ["", control_id, ""]
+
+    def _attack_tree_document(self, tree_id: str, rows: list[list[str]]) -> str:
+        return _document(tree_id, FileType.get_header(FileType.ATTACK_TREE), rows)
+
+def _document(title: str, header: list[str], rows: list[list[str]]) -> str:
+    lines = [f"# {title}", "", "| " + " | ".join(header) + " |", "| " + " | ".join("---" for _ in header) + " |"]
+    lines += ["| " + " | ".join(row) + " |" for row in rows]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,59 @@
+import os
+import unittest
+from tara.benchmarks.synthetic_tara import SyntheticTaraGenerator
+from tara.benchmarks.scaling_benchmark import run_scaling_benchmark, PHASES
+from tara.domain.tara_parser import TaraParser
+from tara.domain.attack_tree import AttackTreeReferenceNode
+from tara.utilities.file_reader import MockFileReader
+from tara.utilities.error_logger import MemoryErrorLogger
+
+class TestSyntheticTara(unittest.TestCase):
+    def parse(self, generator: SyntheticTaraGenerator):
+        directory = "synthetic"
+        reader = MockFileReader()
+        for file_path, content in generator.generate().items():
+            reader.setup_file(os.path.join(directory, file_path), content)
+        logger = MemoryErrorLogger()
+        return TaraParser(reader, logger).parse(directory), logger
+
+    def test_the_generated_tara_is_valid(self):
+        generator = SyntheticTaraGenerator(4, depth=3, fan_out=2, ref_density=0.3, control_density=0.5, control_count=5)
+
+        # Act
+        tara, logger = self.parse(generator)
+
+        # Assert
+        self.assertEqual(logger.get_errors(), [])
+        self.assertEqual(logger.get_warnings(), [])
+        self.assertEqual(len(tara.assets), 4)
+        self.assertEqual(len(tara.damage_scenarios), 12)
+        self.assertEqual(len(tara.security_controls), 5)
+        # three trees per asset and one circumvent tree per control
+        self.assertEqual(len(tara.attack_trees), 4 * 3 + 5)
+
+        asset_trees = [tree for tree in tara.attack_trees if tree.id.startswith("AT_")]
+        reference_nodes = [node for tree in asset_trees for node in tree.get_nodes() if isinstance(node, AttackTreeReferenceNode)]
+        self.assertGreater(len(reference_nodes), 0)
+        self.assertTrue(any(node.security_control_ids for tree in asset_trees for node in tree.get_nodes()))
+
+        # a tree without REF nodes is complete
+        complete_trees = [tree for tree in asset_trees if not any(isinstance(node, AttackTreeReferenceNode) for node in tree.get_nodes())]
+        self.assertGreater(len(complete_trees), 0)
+        for tree in complete_trees:
+            self.assertEqual(len(tree.get_nodes()), generator.get_node_count_per_tree())
+
+    def test_the_same_seed_generates_the_same_files(self):
+        self.assertEqual(SyntheticTaraGenerator(3, seed=7).generate(), SyntheticTaraGenerator(3, seed=7).generate())
+        self.assertNotEqual(SyntheticTaraGenerator(3, seed=7).generate(), SyntheticTaraGenerator(3, seed=8).generate())
+
+    def test_the_benchmark_reports_each_phase_per_size(self):
+        # Act
+        report = run_scaling_benchmark([1, 3], repeat=1, depth=2, fan_out=2, control_count=2)
+
+        # Assert
+        self.assertEqual([result["assets"] for result in report["results"]], [1, 3])
+        self.assertLess(report["results"][0]["nodes"], report["results"][1]["nodes"])
+        for result in report["results"]:
+            self.assertEqual(list(result["seconds"]), PHASES)
+        self.assertEqual(list(report["scaling_exponents"]), PHASES)
+        self.assertEqual(report["parameters"], {"depth": 2, "fan_out": 2, "control_count": 2, "repeat": 1})
@@ -0,0 +1,256 @@
+from tara.domain.attack_tree import AttackTree, AttackTreeNode, circumvent_tree_id
+from tara.domain.feasibility import Feasibility
+from tara.domain.security_control import SecurityControl
+
+def strongly_connected_components(dependencies: dict[str, list[str]]) -> list[list[str]]:
+    """
+    Determines the strongly connected components of a reference graph with Tarjan's algorithm.
+    The components are returned in topological order: every component comes after
+    all components it references.
+    The algorithm is implemented iteratively, so deep reference chains do not exhaust the call stack.
+
+    :param dependencies: Maps each tree ID to the IDs of the trees it references. All referenced IDs must be keys.
+    :return: A list of components, each a list of tree IDs.
+    """
+    index: dict[str, int] = {}
+    lowlink: dict[str, int] = {}
+    stack: list[str] = []
+    on_stack: set[str] = set()
+    components: list[list[str]] = []
+
+    def visit(tree_id: str) -> None:
+        index[tree_id] = len(index)
+        lowlink[tree_id] = index[tree_id]
+        stack.append(tree_id)
+        on_stack.add(tree_id)
+
+    for start_id in dependencies:
+        if start_id in index:
+            continue
+
+        visit(start_id)
+        work = [(start_id, iter(dependencies[start_id]))]
+        while work:
+            tree_id, dependency_iter = work[-1]
+            dependency_id = next(dependency_iter, None)
+
+            if dependency_id is None:
+                # all dependencies are done
+                work.pop()
+                if work:
+                    parent_id = work[-1][0]
+                    lowlink[parent_id] = min(lowlink[parent_id], lowlink[tree_id])
+
+                if lowlink[tree_id] == index[tree_id]:
+                    component = []
+                    while True:
+                        member_id = stack.pop()
+                        on_stack.discard(member_id)
+                        component.append(member_id)
+                        if member_id == tree_id:
+                            break
+                    components.append(component[::-1])
+            elif dependency_id not in index:
+                visit(dependency_id)
+                work.append((dependency_id, iter(dependencies[dependency_id])))
+            elif dependency_id in on_stack:
+                lowlink[tree_id] = min(lowlink[tree_id], index[dependency_id])
+
+    return components
+
+def cycles_of(components: list[list[str]], dependencies: dict[str, list[str]]) -> list[list[str]]:
+    """
+    Returns the components which are cycles: components with more than one tree
+    and trees referencing themselves.
+    """
+    return [component for component in components if len(component) > 1 or component[0] in dependencies[component[0]]]
+
+def describe_cycles(cycles: list[list[str]]) -> list[str]:
+    """
+    Returns a human readable description for each cycle.
+    """
+    return [f"Circular references between attack trees: {', '.join(cycle)}." for cycle in cycles]
+
+class AttackForest:
+    """
+    The reference graph over all attack trees of a TARA.
+
+    Trees depend on each other through REF nodes and through the circumvent trees
+    of their controls. The forest evaluates the trees in topological order, so that
+    every referenced tree is evaluated before the trees referencing it and each tree
+    is evaluated exactly once per evaluation mode.
+
+    The order is derived from the strongly connected components of the reference graph.
+    Components with more than one tree, or with a tree referencing itself, are cycles.
+    A forest with cycles can not be evaluated.
+
+    When a security control is switched on or off, only the nodes depending on the
+    control are re-evaluated, see set_control_active.
+    """
+
+    def __init__(self, attack_trees: list[AttackTree], security_controls: list[SecurityControl] = None):
+        """
+        :param attack_trees: The attack trees of the TARA, including the circumvent trees.
+        :param security_controls: The security controls of the TARA, required to switch controls or to get the dependent nodes.
+        """
+        self.attack_trees: dict[str, AttackTree] = {tree.id: tree for tree in attack_trees}
+        self.security_controls: dict[str, SecurityControl] = {control.id: control for control in security_controls or []}
+        # Maps each tree ID to the IDs of the existing trees it references
+        self.dependencies: dict[str, list[str]] = {
+            tree.id: [tree_id for tree_id in tree.get_referenced_tree_ids() if tree_id in self.attack_trees]
+            for tree in attack_trees
+        }
+        components = strongly_connected_components(self.dependencies)
+        # Each cycle holds the IDs of the trees which reference each other circularly
+        self.cycles: list[list[str]] = cycles_of(components, self.dependencies)
+        self.evaluation_order: list[str] = [tree_id for component in components for tree_id in component]
+        # Maps the evaluation mode (without_controls) to the feasibilities by tree ID
+        self._feasibilities: dict[bool, dict[str, Feasibility]] = {True: {}, False: {}}
+        # The dependency index is built when it is first needed, see _build_dependency_index
+        self._is_indexed = False
+
+    def describe_cycles(self) -> list[str]:
+        """
+        Returns a human readable description for each cycle.
+        """
+        return describe_cycles(self.cycles)
+
+    def evaluate(self, without_controls: bool = False) -> dict[str, Feasibility]:
+        """
+        Evaluates all trees in topological order and returns their feasibilities by tree ID.
+        Trees which have already been evaluated in this mode are not evaluated again.
+        """
+        if self.cycles:
+            raise ValueError(" ".join(self.describe_cycles()))
+
+        feasibilities = self._feasibilities[without_controls]
+        if len(feasibilities) == len(self.evaluation_order):
+            return feasibilities
+
+        for tree_id in self.evaluation_order:
+            if tree_id not in feasibilities:
+                feasibilities[tree_id] = self.attack_trees[tree_id].get_feasibility(without_controls)
+
+        return feasibilities
+
+    def get_feasibility(self, tree_id: str, without_controls: bool = False) -> Feasibility:
+        """
+        Returns the feasibility of the tree with the given ID.
+        """
+        if tree_id not in self.attack_trees:
+            raise ValueError(f"Attack tree with id '{tree_id}' not found.")
+
+        return self.evaluate(without_controls)[tree_id]
+
+    def invalidate_cache(self) -> None:
+        """
+        Invalidates the cached feasibilities of all trees in both evaluation modes.
+        """
+        for tree in self.attack_trees.values():
+            tree.invalidate_cache()
+
+        for feasibilities in self._feasibilities.values():
+            feasibilities.clear()
+
+    def _build_dependency_index(self) -> None:
+        """
+        Builds the index from the nodes to the nodes depending on them:
+        the parents of each node, the REF nodes referencing each tree and the nodes carrying each control.
+        """
+        if self._is_indexed:
+            return
+
+        # Maps the node IDs (id(node)) to the parents of the node
+        self._parents: dict[int, list[AttackTreeNode]] = {}
+        # Maps the node IDs of the root nodes to their tree ID
+        self._root_tree_ids: dict[int, str] = {}
+        # Maps a tree ID to the REF nodes referencing the tree
+        self._reference_nodes: dict[str, list[AttackTreeNode]] = {}
+        # Maps a control ID to the nodes carrying the control
+        self._control_nodes: dict[str, list[AttackTreeNode]] = {}
+        # Maps a circumvent tree ID to the ID of its control
+        self._circumvented_control_ids: dict[str, str] = {}
+
+        for tree in self.attack_trees.values():
+            if tree.root_node:
+                self._root_tree_ids[id(tree.root_node)] = tree.id
+            for node in tree.get_nodes():
+                for child in node.children:
+                    self._parents.setdefault(id(child), []).append(node)
+                if getattr(node, 'referenced_node_id', None):
+                    self._reference_nodes.setdefault(node.referenced_node_id, []).append(node)
+                for control_id in node.security_control_ids:
+                    self._control_nodes.setdefault(control_id, []).append(node)
+                    self._circumvented_control_ids[circumvent_tree_id(control_id)] = control_id
+
+        self._is_indexed = True
+
+    def _get_security_control(self, control_id: str) -> SecurityControl:
+        control = self.security_controls.get(control_id)
+        if control is None:
+            raise ValueError(f"Security control with id '{control_id}' not found.")
+        return control
+
+    def get_dependent_nodes(self, control_id: str) -> list[AttackTreeNode]:
+        """
+        Returns all nodes whose feasibility with controls depends on the given control:
+        the nodes carrying the control and their ancestors, the REF nodes referencing
+        an affected tree and the nodes whose active controls have an affected circumvent tree,
+        together with all their ancestors.
+
+        :param control_id: The ID of the security control.
+        :return: The dependent nodes, each contained once.
+        """
+        self._build_dependency_index()
+
+        dependent_nodes = []
+        visited: set[int] = set()
+        stack = list(self._control_nodes.get(control_id, []))
+        while stack:
+            node = stack.pop()
+            if id(node) in visited:
+                continue
+
+            visited.add(id(node))
+            dependent_nodes.append(node)
+            stack.extend(self._parents.get(id(node), []))
+
+            tree_id = self._root_tree_ids.get(id(node))
+            if tree_id is not None:
+                stack.extend(self._reference_nodes.get(tree_id, []))
+                # an affected circumvent tree changes the nodes carrying its control, if the control is active
+                circumvented_control_id = self._circumvented_control_ids.get(tree_id)
+                if circumvented_control_id is not None and self._get_security_control(circumvented_control_id).is_active:
+                    stack.extend(self._control_nodes[circumvented_control_id])
+
+        return dependent_nodes
+
+    def set_control_active(self, control_id: str, is_active: bool) -> list[str]:
+        """
+        Switches a security control on or off and invalidates the feasibilities with controls
+        of the dependent nodes only. The next evaluation re-evaluates just these nodes, so several
+        controls can be switched before the forest is evaluated again. The feasibilities without
+        controls do not depend on the controls and are kept.
+
+        :param control_id: The ID of the security control.
+        :param is_active: The new state of the control.
+        :return: The IDs of the trees whose feasibility has been invalidated, in evaluation order.
+        """
+        control = self._get_security_control(control_id)
+        if control.is_active == is_active:
+            return []
+
+        control.is_active = is_active
+
+        affected_tree_ids = set()
+        for node in self.get_dependent_nodes(control_id):
+            node.cached_feasibility.pop(False, None)
+            tree_id = self._root_tree_ids.get(id(node))
+            if tree_id is not None:
+                affected_tree_ids.add(tree_id)
+
+        feasibilities = self._feasibilities[False]
+        for tree_id in affected_tree_ids:
+            feasibilities.pop(tree_id, None)
+
+        return [tree_id for tree_id in self.evaluation_order if tree_id in affected_tree_ids]
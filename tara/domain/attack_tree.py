@@ -2,7 +2,7 @@ from tara.domain.feasibility import Feasibility
 from tara.domain.asset import Asset
 from tara.domain.security_property import SecurityProperty
 from tara.domain.object_store import ObjectStore
-import copy
+from tara.domain import evaluation_counters
 
 def attack_tree_id(asset: Asset, security_property: SecurityProperty) -> str:
     """
@@ -31,11 +31,23 @@ class AttackTreeNode:
         self.children = []
         self.security_control_ids: list[str] = []
         self.object_store: ObjectStore = object_store
-        self.cached_feasibility: Feasibility = None
+        # Maps the evaluation mode (without_controls) to the cached feasibility,
+        # so that the initial and the residual feasibility can be cached side by side
+        self.cached_feasibility: dict[bool, Feasibility] = {}
 
     def add_child(self, child_node):
         self.children.append(child_node)
 
+    def __getstate__(self):
+        """
+        Pickles the node without its object store and cached feasibilities.
+        The object store has to be set again after unpickling.
+        """
+        state = self.__dict__.copy()
+        state['object_store'] = None
+        state['cached_feasibility'] = {}
+        return state
+
     def get_active_control_ids(self) -> list[str]:
         """
         Returns a list of active circumvent tree IDs associated with this node.
@@ -45,49 +57,150 @@ class AttackTreeNode:
 
     def invalidate_cache(self):
         """
-        Invalidates the cached feasibility of the node.
+        Invalidates the cached feasibilities of the node and its descendants for both evaluation modes.
         This is useful when the node has been modified and the feasibility needs to be recalculated.
         """
-        self.cached_feasibility = None
-        for child in self.children:
-            child.invalidate_cache()
-
-    def get_feasibility(self, without_controls: bool = False):
-        if self.cached_feasibility is not None:
-            return self.cached_feasibility
-
-        if not(without_controls) and self.security_control_ids:
-            active_circumvent_trees = [self.object_store.get(circumvent_tree_id(control_id)) for control_id in self.get_active_control_ids()]
-            if not all(circumvent_tree for circumvent_tree in active_circumvent_trees):
-                raise ValueError("One or more referenced circumvent trees do not exist in the object store.")
-            and_node = AttackTreeAndNode(self.object_store)
-            and_node.add_child(self.without_controls())
-            for circumvent_tree in active_circumvent_trees:
-                and_node.add_child(circumvent_tree.root_node)
-            
-            self.cached_feasibility = and_node.get_feasibility(without_controls)
-            return self.cached_feasibility
-
-        self.cached_feasibility = self.get_feasibility_without_controls(without_controls)
-        return self.cached_feasibility
-
-    def without_controls(self) -> 'AttackTreeLeafNode':
-        deep_copy = copy.deepcopy(self)
-        deep_copy.security_control_ids = []
-        return deep_copy
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            node.cached_feasibility.clear()
+            stack.extend(node.children)
+
+    def get_feasibility(self, without_controls: bool = False) -> Feasibility:
+        """
+        Returns the feasibility of the node. If without_controls is False, the circumvent trees
+        of the active controls of this node and all nodes it depends on are taken into account.
+
+        The nodes this node depends on (children, referenced trees and circumvent trees) are
+        evaluated in post-order with an explicit stack, so the depth of a tree and of its
+        reference chains is not limited by the recursion limit.
+        """
+        counters = evaluation_counters.active
+        cached_feasibility = self.cached_feasibility.get(without_controls)
+        if cached_feasibility is not None:
+            if counters is not None:
+                counters.cache_hits += 1
+            return cached_feasibility
+
+        # (node, dependencies) pairs, the dependencies are None until the node has been expanded
+        stack: list[tuple[AttackTreeNode, tuple]] = [(self, None)]
+        # IDs of the nodes on the current evaluation path
+        in_progress: set[int] = set()
+
+        while stack:
+            node, dependencies = stack.pop()
+
+            if dependencies is not None:
+                uncontrolled_dependencies, circumvent_roots = dependencies
+                node.cached_feasibility[without_controls] = node._calculate_feasibility(without_controls, uncontrolled_dependencies, circumvent_roots)
+                in_progress.discard(id(node))
+                if counters is not None:
+                    counters.count_evaluation(node)
+                continue
+
+            if without_controls in node.cached_feasibility:
+                if counters is not None:
+                    counters.cache_hits += 1
+                continue
+
+            if id(node) in in_progress:
+                raise ValueError(f"Circular reference detected at node '{node.name}'.")
+
+            in_progress.add(id(node))
+            uncontrolled_dependencies = node._get_uncontrolled_dependencies()
+            circumvent_roots = [tree.root_node for tree in node._get_active_circumvent_trees(without_controls)]
+            stack.append((node, (uncontrolled_dependencies, circumvent_roots)))
+            for dependency in reversed(uncontrolled_dependencies + circumvent_roots):
+                if without_controls not in dependency.cached_feasibility:
+                    stack.append((dependency, None))
+                elif counters is not None:
+                    counters.cache_hits += 1
+
+        return self.cached_feasibility[without_controls]
+
+    def _calculate_feasibility(self, without_controls: bool, uncontrolled_dependencies: list['AttackTreeNode'], circumvent_roots: list['AttackTreeNode']) -> Feasibility:
+        """
+        Calculates the feasibility of the node from the cached feasibilities of its dependencies.
+        """
+        feasibility = self._combine_feasibilities([node.cached_feasibility[without_controls] for node in uncontrolled_dependencies])
+
+        # The controlled feasibility is the uncontrolled feasibility of this node
+        # combined by AND with the feasibilities of all active circumvent trees
+        for circumvent_root in circumvent_roots:
+            feasibility = feasibility.and_feasibility(circumvent_root.cached_feasibility[without_controls])
+
+        return feasibility
+
+    def _get_active_circumvent_trees(self, without_controls: bool) -> list['AttackTree']:
+        """
+        Returns the circumvent trees of the active controls of this node.
+        If without_controls is True, no circumvent trees are applied.
+        """
+        if without_controls or not self.security_control_ids:
+            return []
+
+        active_control_ids = self.get_active_control_ids()
+        counters = evaluation_counters.active
+        if counters is not None:
+            for control_id in active_control_ids:
+                counters.count_circumvent_lookup(control_id)
+
+        active_circumvent_trees = [self.object_store.get(circumvent_tree_id(control_id)) for control_id in active_control_ids]
+        if not all(circumvent_tree for circumvent_tree in active_circumvent_trees):
+            raise ValueError("One or more referenced circumvent trees do not exist in the object store.")
+        for circumvent_tree in active_circumvent_trees:
+            if circumvent_tree.root_node is None:
+                raise ValueError(f"Attack tree with id '{circumvent_tree.id}' has no root node.")
+
+        return active_circumvent_trees
 
     def get_feasibility_without_controls(self, without_controls: bool = False) -> Feasibility:
         """
         Returns the feasibility of the node without considering any controls.
         This is useful for calculating the base feasibility of the node.
         """
+        return self._combine_feasibilities([node.get_feasibility(without_controls) for node in self._get_uncontrolled_dependencies()])
+
+    def _get_uncontrolled_dependencies(self) -> list['AttackTreeNode']:
+        """
+        Returns the nodes whose feasibilities are combined to the uncontrolled feasibility of this node.
+        """
         raise NotImplementedError("This method should be overridden in subclasses.")
-    
+
+    def _combine_feasibilities(self, feasibilities: list[Feasibility]) -> Feasibility:
+        """
+        Combines the feasibilities of the uncontrolled dependencies to the uncontrolled feasibility of this node.
+        """
+        raise NotImplementedError("This method should be overridden in subclasses.")
+
     def get_resolved_node(self) -> 'AttackTreeResolvedNode':
         """
-        Returns a resolved node representation of the attack tree node.
+        Returns a resolved node representation of the attack tree node and all its descendants.
         This is useful for creating a resolved attack tree.
         """
+        resolved_root = None
+        # (node, list to which the resolved node is appended) pairs
+        stack: list[tuple[AttackTreeNode, list]] = [(self, None)]
+        while stack:
+            node, resolved_siblings = stack.pop()
+            resolved_node, outer_node = node._resolve_node()
+
+            if resolved_siblings is None:
+                resolved_root = outer_node
+            else:
+                resolved_siblings.append(outer_node)
+
+            for child in reversed(node.children):
+                stack.append((child, resolved_node.children))
+
+        return resolved_root
+
+    def _resolve_node(self) -> tuple['AttackTreeResolvedNode', 'AttackTreeResolvedNode']:
+        """
+        Resolves this node without its children.
+        Returns the resolved node, to which the resolved children are added, and the outermost
+        resolved node, which is the inserted AND node if the node has active controls.
+        """
 
         control_ids = self.get_active_control_ids()
         circumvent_trees = [self.object_store.get(circumvent_tree_id(control_id)) for control_id in control_ids]
@@ -102,13 +215,12 @@ class AttackTreeNode:
         # if the original node has controls, they are split into an uncontrolled noded and the circumvent trees
         # threrefore the uncontrolled feasibility is shown when there are controls
         resolved_node.feasibility = self.get_feasibility_without_controls() if has_controls else self.get_feasibility()
-        resolved_node.children = [child.get_resolved_node() for child in self.children]
         resolved_node.security_control_ids = control_ids
         # "REF" nodes have the attribute referenced_node_id set to the ID of the referenced node
         resolved_node.referenced_node_id = self.referenced_node_id if hasattr(self, 'referenced_node_id') else None
 
         if not has_controls:
-            return resolved_node
+            return resolved_node, resolved_node
         else:
             # insert an AND node which combines the unmitigated original node and its circumvent trees
             and_node = AttackTreeResolvedNode()
@@ -125,7 +237,7 @@ class AttackTreeNode:
                     raise ValueError("One or more referenced circumvent trees do not exist in the object store.")
                 and_node.children.append(self.circumvent_tree_to_resolved_node(circumvent_tree))
 
-            return and_node
+            return resolved_node, and_node
         
     def circumvent_tree_to_resolved_node(self, circumvent_tree: 'AttackTree') -> 'AttackTreeResolvedNode':
         """
@@ -148,18 +260,21 @@ class AttackTreeAndNode(AttackTreeNode):
         self.name = ""
         self.type = "AND"
 
-    def get_feasibility_without_controls(self, without_controls: bool = False) -> Feasibility:
+    def _get_uncontrolled_dependencies(self) -> list[AttackTreeNode]:
+        return self.children
+
+    def _combine_feasibilities(self, feasibilities: list[Feasibility]) -> Feasibility:
         """
         Returns the feasibility of the AND node.
         The feasibility is calculated as the maximum feasibility of all child nodes.
         """
-        if not self.children:
+        if not feasibilities:
             raise ValueError("AND node has no children.")
         
-        feasibility = self.children[0].get_feasibility(without_controls)
+        feasibility = feasibilities[0]
 
-        for child in self.children[1:]:
-            feasibility = feasibility.and_feasibility(child.get_feasibility(without_controls))
+        for child_feasibility in feasibilities[1:]:
+            feasibility = feasibility.and_feasibility(child_feasibility)
         
         return feasibility
 
@@ -169,18 +284,21 @@ class AttackTreeOrNode(AttackTreeNode):
         self.name = ""
         self.type = "OR"
 
-    def get_feasibility_without_controls(self, without_controls: bool = False) -> Feasibility:
+    def _get_uncontrolled_dependencies(self) -> list[AttackTreeNode]:
+        return self.children
+
+    def _combine_feasibilities(self, feasibilities: list[Feasibility]) -> Feasibility:
         """
         Returns the feasibility of the OR node.
         The feasibility is calculated as the minimum feasibility of all child nodes.
         """
-        if not self.children:
+        if not feasibilities:
             raise ValueError("OR node has no children.")
         
-        feasibility = self.children[0].get_feasibility(without_controls)
+        feasibility = feasibilities[0]
 
-        for child in self.children[1:]:
-            feasibility = feasibility.or_feasibility(child.get_feasibility(without_controls))
+        for child_feasibility in feasibilities[1:]:
+            feasibility = feasibility.or_feasibility(child_feasibility)
         
         return feasibility
 
@@ -191,7 +309,10 @@ class AttackTreeLeafNode(AttackTreeNode):
         self.type = "LEAF"
         self._feasibility = feasibility
 
-    def get_feasibility_without_controls(self, without_controls: bool = False) -> Feasibility:
+    def _get_uncontrolled_dependencies(self) -> list[AttackTreeNode]:
+        return []
+
+    def _combine_feasibilities(self, feasibilities: list[Feasibility]) -> Feasibility:
         """
         Returns the feasibility of the node without considering any controls.
         This is useful for calculating the base feasibility of the node.
@@ -204,19 +325,29 @@ class AttackTreeReferenceNode(AttackTreeNode):
         self.type = "REF"
         self.referenced_node_id: str = None
 
-    def get_feasibility_without_controls(self, without_controls: bool = False) -> Feasibility:
+    def _get_uncontrolled_dependencies(self) -> list[AttackTreeNode]:
         """
-        Returns the feasibility of the referenced node.
-        If the referenced node is not found, raises an error.
+        Returns the root node of the referenced tree.
+        If the referenced tree is not found, raises an error.
         """
         if self.referenced_node_id is None:
             raise ValueError("Referenced node ID is not set.")
         
+        if evaluation_counters.active is not None:
+            evaluation_counters.active.reference_lookups += 1
         referenced_node = self.object_store.get(self.referenced_node_id)
         if referenced_node is None:
             raise ValueError(f"Referenced node with ID {self.referenced_node_id} not found.")
+        if referenced_node.root_node is None:
+            raise ValueError(f"Attack tree with id '{referenced_node.id}' has no root node.")
         
-        return referenced_node.get_feasibility(without_controls)
+        return [referenced_node.root_node]
+
+    def _combine_feasibilities(self, feasibilities: list[Feasibility]) -> Feasibility:
+        """
+        Returns the feasibility of the referenced tree.
+        """
+        return feasibilities[0]
 
 class AttackTreeResolvedNode:
     def __init__(self):
@@ -244,6 +375,38 @@ class AttackTree:
         self.description = ""
         self.root_node: AttackTreeNode = None
 
+    def is_loaded(self) -> bool:
+        """
+        Returns False while the nodes of the tree have not been created, see LazyAttackTree.
+        """
+        return True
+
+    def get_nodes(self) -> list[AttackTreeNode]:
+        """
+        Returns all nodes of the attack tree in pre-order.
+        """
+        nodes = []
+        stack = [self.root_node] if self.root_node else []
+        while stack:
+            node = stack.pop()
+            nodes.append(node)
+            stack.extend(reversed(node.children))
+        return nodes
+
+    def get_referenced_tree_ids(self) -> list[str]:
+        """
+        Returns the IDs of all trees this tree depends on in its feasibility calculation:
+        trees referenced by REF nodes and the circumvent trees of all controls.
+        Each ID is contained once, in order of first occurrence.
+        """
+        referenced_tree_ids = {}
+        for node in self.get_nodes():
+            if getattr(node, 'referenced_node_id', None):
+                referenced_tree_ids[node.referenced_node_id] = None
+            for control_id in node.security_control_ids:
+                referenced_tree_ids[circumvent_tree_id(control_id)] = None
+        return list(referenced_tree_ids)
+
     def invalidate_cache(self):
         """
         Invalidates the cached feasibility of the attack tree.
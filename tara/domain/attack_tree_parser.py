@@ -58,12 +58,12 @@ class AttackTreeParser:
                 elif row_type == "AND":
                     node = AttackTreeAndNode(self.object_store)
                 elif row_type == "LEAF" or row_type == "":
-                    feasibility = Feasibility()
-                    feasibility.time = AttackTreeParser.parse_elapsed_time_static(table.getCell(row, 2), attack_tree_id, self.logger)
-                    feasibility.expertise = AttackTreeParser.parse_expertise_static(table.getCell(row, 3), attack_tree_id, self.logger)
-                    feasibility.knowledge = AttackTreeParser.parse_knowledge_static(table.getCell(row, 4), attack_tree_id, self.logger)
-                    feasibility.window_of_opportunity = AttackTreeParser.parse_window_of_opportunity_static(table.getCell(row, 5), attack_tree_id, self.logger)
-                    feasibility.equipment = AttackTreeParser.parse_equipment_static(table.getCell(row, 6), attack_tree_id, self.logger)
+                    feasibility = Feasibility(
+                        time=AttackTreeParser.parse_elapsed_time_static(table.getCell(row, 2), attack_tree_id, self.logger),
+                        expertise=AttackTreeParser.parse_expertise_static(table.getCell(row, 3), attack_tree_id, self.logger),
+                        knowledge=AttackTreeParser.parse_knowledge_static(table.getCell(row, 4), attack_tree_id, self.logger),
+                        window_of_opportunity=AttackTreeParser.parse_window_of_opportunity_static(table.getCell(row, 5), attack_tree_id, self.logger),
+                        equipment=AttackTreeParser.parse_equipment_static(table.getCell(row, 6), attack_tree_id, self.logger))
                     node = AttackTreeLeafNode(feasibility, self.object_store)
                 elif row_type == "REF":
                     node = AttackTreeReferenceNode(self.object_store)
@@ -0,0 +1,241 @@
+from tara.MarkdownLib.markdown_parser import MarkdownParser, MarkdownDocument, MarkdownTable
+from tara.domain.tara import Tara
+from tara.domain.risk import RiskLevel
+from tara.domain.feasibility import Feasibility
+from tara.domain.attack_tree import AttackTreeAndNode, AttackTreeOrNode, AttackTreeReferenceNode, attack_tree_id, circumvent_tree_id
+from tara.domain.what_if_analysis import WhatIfAnalysis
+from tara.utilities.file_reader import IFileReader
+from tara.utilities.error_logger import IErrorLogger
+
+def read_control_costs(file_reader: IFileReader, file_path: str, logger: IErrorLogger) -> dict[str, float]:
+    """
+    Reads the costs of the security controls from a markdown table with the header | ID | Cost |.
+
+    :return: The cost of each listed control by control ID.
+    """
+    document: MarkdownDocument = MarkdownParser().parse(file_reader.read_file(file_path))
+    table = next((content for content in document.getContent() if isinstance(content, MarkdownTable) and content.hasHeader(["ID", "Cost"])), None)
+    if table is None:
+        logger.log_error(f"Control cost table not found in {file_path}.")
+        return {}
+
+    costs = {}
+    for row in range(table.getRowCount()):
+        control_id = table.getCell(row, 0).strip()
+        try:
+            costs[control_id] = float(table.getCell(row, 1))
+        except ValueError:
+            logger.log_error(f"Invalid cost '{table.getCell(row, 1)}' for control {control_id}.")
+    return costs
+
+class ControlSetOptimizer:
+    """
+    Searches the cheapest set of active security controls which brings the residual risk
+    of every threat scenario to or below a target risk level. Without costs, every control
+    costs 1 and the smallest set is searched.
+
+    The search is a branch and bound over the controls which are used in the attack trees.
+    A greedy solution is the initial upper bound and a branch is pruned if its cost reaches the
+    best cost found so far. Activating a control can raise a residual risk: an OR node can switch
+    to another child and thereby lower the AND of its parent. So a set missing the target says
+    nothing about its subsets or supersets. Instead, a branch leaving out controls is pruned if
+    the target can not be met even in the most favourable case for the controls it may still use,
+    see _can_meet_target. If the target can not be met with any controls, nothing is searched.
+    The bound does not limit every search, so the search stops after max_evaluations control sets
+    and returns the best set found so far with a warning.
+    Every candidate set is evaluated incrementally, so only the nodes depending on the
+    switched controls are re-evaluated.
+    """
+
+    def __init__(self, tara: Tara, costs: dict[str, float] = None, logger: IErrorLogger = None, max_evaluations: int = 10000):
+        """
+        :param tara: The TARA whose controls are optimized.
+        :param costs: The cost of each control by control ID, controls without a cost cost 1.
+        :param logger: Receives a warning if the search is stopped early.
+        :param max_evaluations: The number of control sets the search evaluates at most.
+        """
+        self.analysis = WhatIfAnalysis(tara)
+        self.costs = costs or {}
+        if any(cost < 0 for cost in self.costs.values()):
+            raise ValueError("Control costs must not be negative.")
+        self.logger = logger
+        self.max_evaluations = max_evaluations
+
+        # The controls which can change a feasibility, in the order of the controls table
+        self.control_ids: list[str] = [control.id for control in tara.security_controls if self.analysis.forest.get_dependent_nodes(control.id)]
+        # Maps the evaluated control sets to the residual risks and feasibility scores of the threat scenarios
+        self._evaluations: dict[frozenset, tuple[list[RiskLevel], list[int]]] = {}
+        # Maps the sets of usable controls to the lowest residual risks they can reach, see _get_lowest_risks
+        self._lowest_risks: dict[frozenset, list[RiskLevel]] = {}
+
+    def get_cost(self, control_ids) -> float:
+        """
+        Returns the total cost of the given controls.
+        """
+        return sum(self.get_cost_of(control_id) for control_id in control_ids)
+
+    def get_cost_of(self, control_id: str) -> float:
+        """
+        Returns the cost of a control, 1 if no cost is given.
+        """
+        return self.costs.get(control_id, 1)
+
+    def optimize(self, target: RiskLevel) -> list[str]:
+        """
+        Returns the cheapest set of controls for which every threat scenario has a residual risk
+        at or below the target, or None if no set of controls meets the target.
+        The states of the controls are not changed.
+
+        :param target: The highest acceptable residual risk.
+        :return: The IDs of the controls in the order of the controls table.
+        """
+        original_control_ids = {control.id for control in self.analysis.tara.security_controls if control.is_active}
+        try:
+            best = self._search(target)
+        finally:
+            self.analysis.set_active_controls(original_control_ids)
+
+        return [control_id for control_id in self.control_ids if control_id in best] if best is not None else None
+
+    def _search(self, target: RiskLevel) -> frozenset:
+        if not self._can_meet_target(frozenset(self.control_ids), target):
+            return None
+
+        best = self._find_greedy_solution(target)
+        best_cost = self.get_cost(best) if best is not None else float("inf")
+
+        # Cheap controls are decided first, each branch tries to include the control first
+        order = sorted(self.control_ids, key=self.get_cost_of)
+        # (selected controls, index of the next undecided control in order)
+        stack: list[tuple[frozenset, int]] = [(frozenset(), 0)]
+        evaluation_count = 0
+        while stack:
+            if evaluation_count >= self.max_evaluations:
+                if self.logger is not None:
+                    self.logger.log_warning(f"The search for the cheapest control set was stopped after {evaluation_count} control sets, "
+                                            "a cheaper control set may exist.")
+                break
+
+            selected, index = stack.pop()
+            cost = self.get_cost(selected)
+            if cost >= best_cost:
+                continue
+
+            evaluation_count += 1
+            if self._meets_target(selected, target):
+                best, best_cost = selected, cost
+                continue
+
+            # the controls are ordered by cost, so every extension costs at least the next control
+            if index == len(order) or cost + self.get_cost_of(order[index]) >= best_cost:
+                continue
+
+            if self._can_meet_target(selected | frozenset(order[index + 1:]), target):
+                stack.append((selected, index + 1))
+            stack.append((selected | {order[index]}, index + 1))
+
+        return best
+
+    def _find_greedy_solution(self, target: RiskLevel) -> frozenset:
+        """
+        Adds the control with the best improvement per cost until the target is met,
+        then removes the controls which are not needed, the most expensive first.
+        Returns None if the target is not met after adding all controls.
+        """
+        selected = frozenset()
+        while not self._meets_target(selected, target):
+            penalty = self._get_penalty(selected, target)
+            candidates = [control_id for control_id in self.control_ids if control_id not in selected]
+            if not candidates:
+                return None
+            selected = selected | {max(candidates, key=lambda control_id: self._get_improvement(selected, control_id, penalty, target))}
+
+        for control_id in sorted(selected, key=self.get_cost_of, reverse=True):
+            if self._meets_target(selected - {control_id}, target):
+                selected = selected - {control_id}
+
+        return selected
+
+    def _get_improvement(self, selected: frozenset, control_id: str, penalty: tuple, target: RiskLevel) -> tuple:
+        new_penalty = self._get_penalty(selected | {control_id}, target)
+        cost = max(self.get_cost_of(control_id), 1e-9)
+        return ((penalty[0] - new_penalty[0]) / cost, (penalty[1] - new_penalty[1]) / cost)
+
+    def _get_penalty(self, control_ids: frozenset, target: RiskLevel) -> tuple:
+        """
+        Returns how far the threat scenarios miss the target: the sum of the exceeding risk levels
+        and, to compare sets with the same risks, the negative feasibility scores of the exceeding threat scenarios.
+        """
+        risks, scores = self._evaluate(control_ids)
+        exceeding = [i for i, risk in enumerate(risks) if risk.value > target.value]
+        return (sum(risks[i].value - target.value for i in exceeding), -sum(scores[i] for i in exceeding))
+
+    def _can_meet_target(self, usable_control_ids: frozenset, target: RiskLevel) -> bool:
+        """
+        Returns False if no subset of the usable controls meets the target.
+        """
+        return all(risk.value <= target.value for risk in self._get_lowest_risks(usable_control_ids))
+
+    def _get_lowest_risks(self, usable_control_ids: frozenset) -> list[RiskLevel]:
+        """
+        Returns for each threat scenario a lower bound of its residual risk for all subsets of the usable controls.
+
+        The bound is an upper bound of the feasibility score of each node. The ratings of a node are at most
+        the per rating maximum (the AND) of the upper bounds of the ratings of its dependencies and of the
+        circumvent trees of its usable controls. The score of an OR node is at most the lowest upper bound
+        of the scores of its children, as it selects the child with the lowest score.
+        """
+        lowest_risks = self._lowest_risks.get(usable_control_ids)
+        if lowest_risks is not None:
+            return lowest_risks
+
+        forest = self.analysis.forest
+        # Maps the tree IDs to the upper bound of the ratings and a feasibility with the upper bound of the score of the root
+        tree_bounds: dict[str, tuple[Feasibility, Feasibility]] = {}
+        for tree_id in forest.evaluation_order:
+            root_node = forest.attack_trees[tree_id].root_node
+            if root_node is None:
+                continue
+
+            # the children of a node come after the node in pre-order, so they are bounded first in reverse order
+            node_bounds: dict[int, tuple[Feasibility, Feasibility]] = {}
+            for node in reversed(forest.attack_trees[tree_id].get_nodes()):
+                if isinstance(node, AttackTreeReferenceNode):
+                    ratings, score_bound = tree_bounds[node.referenced_node_id]
+                elif isinstance(node, (AttackTreeAndNode, AttackTreeOrNode)):
+                    child_bounds = [node_bounds[id(child)] for child in node.children]
+                    ratings = child_bounds[0][0]
+                    for child_ratings, _child_score_bound in child_bounds[1:]:
+                        ratings = ratings.and_feasibility(child_ratings)
+                    score_bound = ratings if isinstance(node, AttackTreeAndNode) else \
+                        min((child_score_bound for _child_ratings, child_score_bound in child_bounds), key=Feasibility.calculate_feasibility_score)
+                else:
+                    ratings = score_bound = node.get_feasibility_without_controls()
+
+                for control_id in node.security_control_ids:
+                    circumvent_bounds = tree_bounds.get(circumvent_tree_id(control_id))
+                    if control_id in usable_control_ids and circumvent_bounds is not None:
+                        ratings = score_bound = ratings.and_feasibility(circumvent_bounds[0])
+
+                node_bounds[id(node)] = (ratings, score_bound)
+            tree_bounds[tree_id] = node_bounds[id(root_node)]
+
+        lowest_risks = []
+        for threat_scenario in self.analysis.threat_scenarios:
+            bounds = tree_bounds.get(attack_tree_id(threat_scenario.asset, threat_scenario.security_property))
+            lowest_risks.append(threat_scenario.get_risk(bounds[1] if bounds is not None else Feasibility()))
+        self._lowest_risks[usable_control_ids] = lowest_risks
+        return lowest_risks
+
+    def _meets_target(self, control_ids: frozenset, target: RiskLevel) -> bool:
+        risks, _scores = self._evaluate(control_ids)
+        return all(risk.value <= target.value for risk in risks)
+
+    def _evaluate(self, control_ids: frozenset) -> tuple[list[RiskLevel], list[int]]:
+        evaluation = self._evaluations.get(control_ids)
+        if evaluation is None:
+            self.analysis.set_active_controls(control_ids)
+            scores = [feasibility.calculate_feasibility_score() for feasibility in self.analysis.evaluate_residual_feasibilities()]
+            evaluation = (self.analysis.evaluate_residual_risks(), scores)
+            self._evaluations[control_ids] = evaluation
+        return evaluation
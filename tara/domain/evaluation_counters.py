@@ -0,0 +1,79 @@
+class EvaluationCounters:
+    """
+    Counts the work done while evaluating attack trees: the feasibility cache hits,
+    the node evaluations, the lookups of referenced and circumvent trees and the
+    calls of ObjectStore.get.
+
+    The counters are opt-in, see enable. While they are disabled, the instrumented
+    code only checks a module attribute for None.
+    """
+
+    def __init__(self):
+        # Nodes whose feasibility was taken from the cache instead of being evaluated
+        self.cache_hits = 0
+        # Maps the node IDs (id(node)) to the number of evaluations of the node
+        self.node_evaluations: dict[int, int] = {}
+        # Lookups of the trees referenced by REF nodes
+        self.reference_lookups = 0
+        # Maps a control ID to the number of lookups of its circumvent tree
+        self.circumvent_lookups: dict[str, int] = {}
+        self.object_store_gets = 0
+
+    def count_evaluation(self, node) -> None:
+        self.node_evaluations[id(node)] = self.node_evaluations.get(id(node), 0) + 1
+
+    def count_circumvent_lookup(self, control_id: str) -> None:
+        self.circumvent_lookups[control_id] = self.circumvent_lookups.get(control_id, 0) + 1
+
+    def get_evaluation_count(self) -> int:
+        """
+        Returns the total number of node evaluations, i.e. the cache misses.
+        """
+        return sum(self.node_evaluations.values())
+
+    def get_evaluations_per_tree(self, attack_trees: list) -> dict[str, int]:
+        """
+        Returns the number of node evaluations of each of the given trees by tree ID.
+        """
+        return {tree.id: sum(self.node_evaluations.get(id(node), 0) for node in tree.get_nodes()) for tree in attack_trees}
+
+    def format_summary(self, attack_trees: list, top: int = 10) -> str:
+        """
+        Returns a summary of the totals and of the trees and controls causing the most work.
+
+        :param attack_trees: The evaluated attack trees.
+        :param top: The number of trees and controls listed.
+        """
+        lines = [
+            "Evaluation counters:",
+            f"  node evaluations (cache misses): {self.get_evaluation_count()}",
+            f"  cache hits: {self.cache_hits}",
+            f"  REF lookups: {self.reference_lookups}",
+            f"  CIRC lookups: {sum(self.circumvent_lookups.values())}",
+            f"  ObjectStore.get calls: {self.object_store_gets}",
+        ]
+
+        evaluations_per_tree = sorted(self.get_evaluations_per_tree(attack_trees).items(), key=lambda item: item[1], reverse=True)
+        lines.append("  trees with the most node evaluations:")
+        lines += [f"    {tree_id}: {count}" for tree_id, count in evaluations_per_tree[:top] if count > 0]
+
+        circumvent_lookups = sorted(self.circumvent_lookups.items(), key=lambda item: item[1], reverse=True)
+        lines.append("  controls with the most circumvent tree lookups:")
+        lines += [f"    {control_id}: {count}" for control_id, count in circumvent_lookups[:top]]
+
+        return "\n".join(lines)
+
+# The enabled counters, None while counting is disabled
+active: EvaluationCounters = None
+
+def enable() -> EvaluationCounters:
+    """
+    Enables counting with new counters and returns them.
+    """
+    global active
+    active = EvaluationCounters()
+    return active
+
+def disable() -> None:
+    global active
+    active = None
@@ -1,4 +1,5 @@
 from enum import Enum
+from itertools import product
 
 class ComparableEnum(Enum):
     def __lt__(self, other):
@@ -56,15 +57,57 @@ class FeasibilityLevel(ComparableEnum):
     VeryLow = 0     #     > 25: very low feasibility
 
 class Feasibility:
-    def __init__(self):
-        self.time: ElapsedTime = ElapsedTime.OneWeek
-        self.expertise: Expertise = Expertise.Layman
-        self.knowledge: Knowledge = Knowledge.Public
-        self.window_of_opportunity: WindowOfOpportunity = WindowOfOpportunity.Unlimited
-        self.equipment: Equipment = Equipment.Standard
-        
+    """
+    An immutable vector of the five attack feasibility ratings.
+
+    There are only 5 * 4 * 4 * 4 * 4 = 1280 distinct rating vectors, so all of them
+    are created once and interned: constructing a Feasibility with the same ratings
+    always returns the same shared object. Every vector has a unique vector_id
+    and its score is precomputed.
+    """
+
+    __slots__ = ("time", "expertise", "knowledge", "window_of_opportunity", "equipment", "vector_id", "_score")
+
+    def __new__(cls,
+                time: ElapsedTime = ElapsedTime.OneWeek,
+                expertise: Expertise = Expertise.Layman,
+                knowledge: Knowledge = Knowledge.Public,
+                window_of_opportunity: WindowOfOpportunity = WindowOfOpportunity.Unlimited,
+                equipment: Equipment = Equipment.Standard) -> 'Feasibility':
+        try:
+            vector_id = _to_vector_id(time, expertise, knowledge, window_of_opportunity, equipment)
+        except KeyError as e:
+            raise ValueError(f"Invalid feasibility rating: {e}")
+        return _interned_feasibilities[vector_id]
+
+    @classmethod
+    def from_vector_id(cls, vector_id: int) -> 'Feasibility':
+        """
+        Returns the interned feasibility with the given vector ID.
+        """
+        return _interned_feasibilities[vector_id]
+
+    @classmethod
+    def _create(cls, vector_id: int, ratings: tuple) -> 'Feasibility':
+        feasibility = object.__new__(cls)
+        for name, rating in zip(Feasibility.__slots__[:5], ratings):
+            object.__setattr__(feasibility, name, rating)
+        object.__setattr__(feasibility, "vector_id", vector_id)
+        object.__setattr__(feasibility, "_score", sum(rating.value for rating in ratings))
+        return feasibility
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Feasibility is immutable.")
+
+    def __delattr__(self, name):
+        raise AttributeError("Feasibility is immutable.")
+
+    def __reduce__(self):
+        # unpickling and copying yield the interned instance
+        return (Feasibility.from_vector_id, (self.vector_id,))
+
     def calculate_feasibility_level(self) -> FeasibilityLevel:
-        total_score = self.calculate_feasibility_score()
+        total_score = self._score
         
         if total_score <= 13:
             return FeasibilityLevel.High
@@ -76,58 +119,95 @@ class Feasibility:
             return FeasibilityLevel.VeryLow
 
     def calculate_feasibility_score(self) -> int:
-        return (self.time.value + self.expertise.value +
-                self.knowledge.value + self.window_of_opportunity.value +
-                self.equipment.value)
+        return self._score
 
     def or_feasibility(self, other: 'Feasibility') -> 'Feasibility':
         if not isinstance(other, Feasibility):
             raise ValueError("Can only combine with another Feasibility instance")
         
-        if self.calculate_feasibility_score() <= other.calculate_feasibility_score():
-            return self.get_deep_copy()
-        else:
-            return other.get_deep_copy()
+        row = _or_table[self.vector_id]
+        if row is None:
+            row = _build_or_row(self.vector_id)
+        return row[other.vector_id]
         
     def and_feasibility(self, other: 'Feasibility') -> 'Feasibility':
         if not isinstance(other, Feasibility):
             raise ValueError("Can only combine with another Feasibility instance")
         
-        new_feasibility = Feasibility()
-        new_feasibility.time = max(self.time, other.time)
-        new_feasibility.expertise = max(self.expertise, other.expertise)
-        new_feasibility.knowledge = max(self.knowledge, other.knowledge)
-        new_feasibility.window_of_opportunity = max(self.window_of_opportunity, other.window_of_opportunity)
-        new_feasibility.equipment = max(self.equipment, other.equipment)
-        
-        return new_feasibility
-
-    def get_deep_copy(self) -> 'Feasibility':
-        new_feasibility = Feasibility()
-        new_feasibility.time = self.time
-        new_feasibility.expertise = self.expertise
-        new_feasibility.knowledge = self.knowledge
-        new_feasibility.window_of_opportunity = self.window_of_opportunity
-        new_feasibility.equipment = self.equipment
-        return new_feasibility
+        row = _and_table[self.vector_id]
+        if row is None:
+            row = _build_and_row(self.vector_id)
+        return row[other.vector_id]
 
     def __eq__(self, other):
-        if not isinstance(other, Feasibility):
-            return False
-        
-        if self.time != other.time:
-            return False
-        if self.expertise != other.expertise:
-            return False
-        if self.knowledge != other.knowledge:
-            return False
-        if self.window_of_opportunity != other.window_of_opportunity:
-            return False
-        if self.equipment != other.equipment:
-            return False
-        
-        return True
+        # all feasibilities are interned, so equal ratings imply identity
+        return self is other
+
+    def __hash__(self):
+        return self.vector_id
 
     def __repr__(self):
         return (f"Feasibility(time={self.time}, expertise={self.expertise}, knowledge={self.knowledge}, "
-                f"window_of_opportunity={self.window_of_opportunity}, equipment={self.equipment})")
\ No newline at end of file
+                f"window_of_opportunity={self.window_of_opportunity}, equipment={self.equipment})")
+
+# The rating enums in the order of their digits in a vector ID
+_RATING_TYPES = (ElapsedTime, Expertise, Knowledge, WindowOfOpportunity, Equipment)
+_RATING_ORDINALS = [{rating: ordinal for ordinal, rating in enumerate(rating_type)} for rating_type in _RATING_TYPES]
+
+def _to_vector_id(time: ElapsedTime, expertise: Expertise, knowledge: Knowledge,
+                  window_of_opportunity: WindowOfOpportunity, equipment: Equipment) -> int:
+    """
+    Packs the ordinals of the five ratings into a mixed radix number.
+    """
+    vector_id = 0
+    for ordinals, rating in zip(_RATING_ORDINALS, (time, expertise, knowledge, window_of_opportunity, equipment)):
+        vector_id = vector_id * len(ordinals) + ordinals[rating]
+    return vector_id
+
+def _build_interned_feasibilities() -> list[Feasibility]:
+    feasibilities = []
+    for ratings in product(*_RATING_TYPES):
+        feasibilities.append(Feasibility._create(len(feasibilities), ratings))
+    return feasibilities
+
+_interned_feasibilities: list[Feasibility] = _build_interned_feasibilities()
+
+# The number of distinct feasibility vectors, the vector IDs are 0 to VECTOR_COUNT - 1
+VECTOR_COUNT = len(_interned_feasibilities)
+
+# The ordinal digits of every vector, indexed by vector ID
+_vector_digits: list[tuple] = [
+    tuple(ordinals[rating] for ordinals, rating in zip(_RATING_ORDINALS, (f.time, f.expertise, f.knowledge, f.window_of_opportunity, f.equipment)))
+    for f in _interned_feasibilities
+]
+
+# Combine tables for AND and OR indexed by [left vector ID][right vector ID].
+# A full table has 1280 x 1280 entries, so each row is only built when a vector
+# is used as left operand for the first time.
+_and_table: list[list[Feasibility]] = [None] * len(_interned_feasibilities)
+_or_table: list[list[Feasibility]] = [None] * len(_interned_feasibilities)
+
+def _build_and_row(vector_id: int) -> list[Feasibility]:
+    """
+    Builds the AND row of a vector. The rating values grow with their ordinals,
+    so the per rating maximum of the values is the per digit maximum of the ordinals.
+    """
+    left_digits = _vector_digits[vector_id]
+    radices = [len(ordinals) for ordinals in _RATING_ORDINALS]
+    row = []
+    for right_digits in _vector_digits:
+        combined_id = 0
+        for radix, left_digit, right_digit in zip(radices, left_digits, right_digits):
+            combined_id = combined_id * radix + (left_digit if left_digit >= right_digit else right_digit)
+        row.append(_interned_feasibilities[combined_id])
+    _and_table[vector_id] = row
+    return row
+
+def _build_or_row(vector_id: int) -> list[Feasibility]:
+    """
+    Builds the OR row of a vector. On equal scores the left operand wins.
+    """
+    left = _interned_feasibilities[vector_id]
+    row = [left if left._score <= right._score else right for right in _interned_feasibilities]
+    _or_table[vector_id] = row
+    return row
@@ -0,0 +1,284 @@
+from array import array
+from tara.domain.attack_tree import AttackTree, AttackTreeNode, AttackTreeAndNode, AttackTreeOrNode, AttackTreeLeafNode, AttackTreeReferenceNode, circumvent_tree_id
+from tara.domain.attack_forest import strongly_connected_components, cycles_of, describe_cycles
+from tara.domain.feasibility import Feasibility
+from tara.domain.object_store import ObjectStore
+
+# Node type codes stored in FlatAttackForest.node_type
+NODE_TYPES = ["AND", "OR", "LEAF", "REF"]
+AND_NODE, OR_NODE, LEAF_NODE, REF_NODE = range(len(NODE_TYPES))
+
+# Marks a missing node, string or feasibility in the index arrays
+NONE = -1
+
+class FlatAttackForest:
+    """
+    A compact representation of all attack trees of a TARA in parallel arrays.
+
+    Each node is identified by its index into the node arrays. The nodes of a tree are
+    stored contiguously in pre-order, so every child has a larger index than its parent
+    and a reverse sweep over the nodes of a tree visits all children before their parents.
+    Children are linked by first child / next sibling indexes.
+    Names, reasonings, comments, referenced tree IDs and control IDs are interned
+    in a single string table; leaf feasibilities are stored as vector IDs.
+
+    The forest is a layout for evaluating and storing the trees, not a replacement of the object
+    model: the parser still creates AttackTree objects and from_attack_trees converts them, so
+    while both exist the memory is that of the object model plus the arrays. It evaluates whole
+    control sets for the what-if analysis (whatif --evaluator flat) and is the layout of snapshots.
+    """
+
+    def __init__(self):
+        # string table
+        self.strings: list[str] = []
+        self._string_indexes: dict[str, int] = {}
+
+        # trees: the nodes of tree t are the indexes tree_node_start[t] to tree_node_start[t + 1] - 1
+        self.tree_ids: list[str] = []
+        self.tree_descriptions = array('i')
+        self.tree_node_start = array('i', [0])
+        self._tree_indexes: dict[str, int] = {}
+
+        # nodes
+        self.node_type = array('b')
+        self.parent = array('i')
+        self.first_child = array('i')
+        self.next_sibling = array('i')
+        self.feasibility_id = array('h')
+        self.name = array('i')
+        self.reasoning = array('i')
+        self.comment = array('i')
+        self.referenced_tree = array('i')
+        # the control IDs of node n are control_ids[control_start[n]:control_start[n + 1]]
+        self.control_start = array('i', [0])
+        self.control_ids = array('i')
+
+        # the tree indexes in evaluation order, computed on the first evaluation and reset when a tree is added
+        self._evaluation_order: list[int] = None
+
+    @classmethod
+    def from_attack_trees(cls, attack_trees: list[AttackTree]) -> 'FlatAttackForest':
+        """
+        Creates a flat forest from parsed attack trees.
+        """
+        forest = cls()
+        for tree in attack_trees:
+            forest.add_tree(tree)
+        return forest
+
+    def intern(self, string: str) -> int:
+        """
+        Returns the index of the string in the string table, adding it if necessary.
+        """
+        if string is None:
+            return NONE
+
+        index = self._string_indexes.get(string)
+        if index is None:
+            index = len(self.strings)
+            self.strings.append(string)
+            self._string_indexes[string] = index
+        return index
+
+    def get_string(self, index: int) -> str:
+        return self.strings[index] if index != NONE else None
+
+    def add_tree(self, tree: AttackTree) -> None:
+        """
+        Appends the nodes of an attack tree in pre-order.
+        """
+        self._evaluation_order = None
+        self._tree_indexes[tree.id] = len(self.tree_ids)
+        self.tree_ids.append(tree.id)
+        self.tree_descriptions.append(self.intern(tree.description))
+
+        # (node, parent index) pairs
+        stack: list[tuple[AttackTreeNode, int]] = [(tree.root_node, NONE)] if tree.root_node else []
+        # index of the previously added child for each parent index
+        last_child: dict[int, int] = {}
+        while stack:
+            node, parent_index = stack.pop()
+            index = len(self.node_type)
+
+            self.node_type.append(NODE_TYPES.index(node.type))
+            self.parent.append(parent_index)
+            self.first_child.append(NONE)
+            self.next_sibling.append(NONE)
+            self.feasibility_id.append(node.get_feasibility_without_controls().vector_id if isinstance(node, AttackTreeLeafNode) else NONE)
+            self.name.append(self.intern(node.name))
+            self.reasoning.append(self.intern(node.reasoning))
+            self.comment.append(self.intern(node.comment))
+            self.referenced_tree.append(self.intern(node.referenced_node_id) if isinstance(node, AttackTreeReferenceNode) else NONE)
+            for control_id in node.security_control_ids:
+                self.control_ids.append(self.intern(control_id))
+            self.control_start.append(len(self.control_ids))
+
+            if parent_index != NONE:
+                if parent_index in last_child:
+                    self.next_sibling[last_child[parent_index]] = index
+                else:
+                    self.first_child[parent_index] = index
+                last_child[parent_index] = index
+
+            for child in reversed(node.children):
+                stack.append((child, index))
+
+        self.tree_node_start.append(len(self.node_type))
+
+    def to_attack_trees(self, object_store: ObjectStore) -> list[AttackTree]:
+        """
+        Creates the attack trees of the forest, e.g. after loading a snapshot.
+        """
+        return [self.to_attack_tree(tree_index, object_store) for tree_index in range(len(self.tree_ids))]
+
+    def to_attack_tree(self, tree_index: int, object_store: ObjectStore) -> AttackTree:
+        """
+        Creates the attack tree with the given index, its nodes refer to the object store.
+        """
+        tree = AttackTree(self.tree_ids[tree_index])
+        tree.description = self.get_string(self.tree_descriptions[tree_index])
+
+        nodes: dict[int, AttackTreeNode] = {}
+        for node_index in range(self.tree_node_start[tree_index], self.tree_node_start[tree_index + 1]):
+            node_type = self.node_type[node_index]
+            if node_type == AND_NODE:
+                node = AttackTreeAndNode(object_store)
+            elif node_type == OR_NODE:
+                node = AttackTreeOrNode(object_store)
+            elif node_type == LEAF_NODE:
+                node = AttackTreeLeafNode(Feasibility.from_vector_id(self.feasibility_id[node_index]), object_store)
+            else:
+                node = AttackTreeReferenceNode(object_store)
+                node.referenced_node_id = self.get_string(self.referenced_tree[node_index])
+
+            node.name = self.get_string(self.name[node_index])
+            node.reasoning = self.get_string(self.reasoning[node_index])
+            node.comment = self.get_string(self.comment[node_index])
+            node.security_control_ids = self.get_control_ids(node_index)
+            nodes[node_index] = node
+
+            # the nodes are stored in pre-order, so the parent exists and the children are appended in order
+            parent_index = self.parent[node_index]
+            if parent_index == NONE:
+                tree.root_node = node
+            else:
+                nodes[parent_index].add_child(node)
+
+        return tree
+
+    def get_tree_index(self, tree_id: str) -> int:
+        return self._tree_indexes.get(tree_id, NONE)
+
+    def get_root(self, tree_index: int) -> int:
+        """
+        Returns the node index of the root of a tree or NONE if the tree has no nodes.
+        """
+        start = self.tree_node_start[tree_index]
+        return start if start < self.tree_node_start[tree_index + 1] else NONE
+
+    def get_children(self, node_index: int) -> list[int]:
+        children = []
+        child = self.first_child[node_index]
+        while child != NONE:
+            children.append(child)
+            child = self.next_sibling[child]
+        return children
+
+    def get_control_ids(self, node_index: int) -> list[str]:
+        return [self.get_string(i) for i in self.control_ids[self.control_start[node_index]:self.control_start[node_index + 1]]]
+
+    def get_dependencies(self) -> dict[str, list[str]]:
+        """
+        Returns the IDs of the existing trees each tree references through REF nodes and controls.
+        """
+        dependencies = {}
+        for tree_index, tree_id in enumerate(self.tree_ids):
+            referenced_tree_ids = {}
+            for node_index in range(self.tree_node_start[tree_index], self.tree_node_start[tree_index + 1]):
+                if self.referenced_tree[node_index] != NONE:
+                    referenced_tree_ids[self.get_string(self.referenced_tree[node_index])] = None
+                for control_id in self.get_control_ids(node_index):
+                    referenced_tree_ids[circumvent_tree_id(control_id)] = None
+            dependencies[tree_id] = [referenced_id for referenced_id in referenced_tree_ids if referenced_id in self._tree_indexes]
+        return dependencies
+
+    def get_evaluation_order(self) -> list[int]:
+        """
+        Returns the tree indexes such that every tree comes after all trees it references.
+        The order is computed once per forest.
+        Raises a ValueError if the references are circular.
+        """
+        if self._evaluation_order is not None:
+            return self._evaluation_order
+
+        dependencies = self.get_dependencies()
+        components = strongly_connected_components(dependencies)
+        cycles = cycles_of(components, dependencies)
+        if cycles:
+            raise ValueError(" ".join(describe_cycles(cycles)))
+
+        self._evaluation_order = [self._tree_indexes[tree_id] for component in components for tree_id in component]
+        return self._evaluation_order
+
+    def evaluate(self, active_control_ids: set[str], without_controls: bool = False) -> list[Feasibility]:
+        """
+        Evaluates the feasibilities of all nodes in one linear sweep over the node arrays.
+        The trees are swept in topological order and the nodes of each tree in reverse
+        pre-order, so all dependencies of a node are known when it is evaluated.
+
+        :param active_control_ids: The IDs of the active security controls.
+        :param without_controls: If True, no circumvent trees are applied.
+        :return: The feasibility of each node, indexed by node index.
+        """
+        feasibilities: list[Feasibility] = [None] * len(self.node_type)
+
+        def root_feasibility(tree_id: str) -> Feasibility:
+            tree_index = self._tree_indexes.get(tree_id, NONE)
+            if tree_index == NONE:
+                raise ValueError(f"Referenced node with ID {tree_id} not found.")
+            root = self.get_root(tree_index)
+            if root == NONE:
+                raise ValueError(f"Attack tree with id '{tree_id}' has no root node.")
+            return feasibilities[root]
+
+        for tree_index in self.get_evaluation_order():
+            for node_index in range(self.tree_node_start[tree_index + 1] - 1, self.tree_node_start[tree_index] - 1, -1):
+                node_type = self.node_type[node_index]
+
+                if node_type == LEAF_NODE:
+                    feasibility = Feasibility.from_vector_id(self.feasibility_id[node_index])
+                elif node_type == REF_NODE:
+                    feasibility = root_feasibility(self.get_string(self.referenced_tree[node_index]))
+                else:
+                    child = self.first_child[node_index]
+                    if child == NONE:
+                        raise ValueError(f"{NODE_TYPES[node_type]} node has no children.")
+                    feasibility = feasibilities[child]
+                    child = self.next_sibling[child]
+                    while child != NONE:
+                        if node_type == AND_NODE:
+                            feasibility = feasibility.and_feasibility(feasibilities[child])
+                        else:
+                            feasibility = feasibility.or_feasibility(feasibilities[child])
+                        child = self.next_sibling[child]
+
+                if not without_controls:
+                    for control_index in self.control_ids[self.control_start[node_index]:self.control_start[node_index + 1]]:
+                        control_id = self.get_string(control_index)
+                        if control_id in active_control_ids:
+                            feasibility = feasibility.and_feasibility(root_feasibility(circumvent_tree_id(control_id)))
+
+                feasibilities[node_index] = feasibility
+
+        return feasibilities
+
+    def evaluate_trees(self, active_control_ids: set[str], without_controls: bool = False) -> dict[str, Feasibility]:
+        """
+        Evaluates all trees and returns the feasibilities of their root nodes by tree ID.
+        """
+        feasibilities = self.evaluate(active_control_ids, without_controls)
+        return {
+            tree_id: feasibilities[self.get_root(tree_index)]
+            for tree_index, tree_id in enumerate(self.tree_ids)
+            if self.get_root(tree_index) != NONE
+        }
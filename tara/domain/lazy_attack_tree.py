@@ -0,0 +1,39 @@
+from tara.domain.attack_tree import AttackTree, AttackTreeNode
+from tara.domain.flat_attack_forest import FlatAttackForest
+from tara.domain.object_store import ObjectStore
+
+class LazyAttackTree(AttackTree):
+    """
+    An attack tree whose nodes are created from a flat forest on the first access of root_node,
+    e.g. from a memory-mapped snapshot.
+
+    Only the ID and the description are read up front. Trees referenced by REF nodes and
+    circumvent trees are looked up in the object store during the evaluation, so evaluating
+    a tree only creates the nodes of the trees it depends on.
+    """
+
+    def __init__(self, forest: FlatAttackForest, tree_index: int, object_store: ObjectStore):
+        self.id = forest.tree_ids[tree_index]
+        self.description = forest.get_string(forest.tree_descriptions[tree_index])
+        self._forest = forest
+        self._tree_index = tree_index
+        self._object_store = object_store
+        self._root_node: AttackTreeNode = None
+        self._is_loaded = False
+
+    @property
+    def root_node(self) -> AttackTreeNode:
+        if not self._is_loaded:
+            self._load()
+        return self._root_node
+
+    @root_node.setter
+    def root_node(self, root_node: AttackTreeNode):
+        self._root_node = root_node
+        self._is_loaded = True
+
+    def is_loaded(self) -> bool:
+        return self._is_loaded
+
+    def _load(self) -> None:
+        self.root_node = self._forest.to_attack_tree(self._tree_index, self._object_store).root_node
@@ -0,0 +1,183 @@
+from tara.domain.attack_tree import circumvent_tree_id
+from tara.domain.feasibility import Feasibility, VECTOR_COUNT
+from tara.domain.flat_attack_forest import FlatAttackForest, AND_NODE, OR_NODE, LEAF_NODE, REF_NODE, NONE
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None
+
+class NumpyForestEvaluator:
+    """
+    Evaluates all nodes of a flat attack forest with batched NumPy operations.
+
+    The feasibility of a node is stored as a row of the five rating values.
+    AND is the element-wise maximum over the rows of the children and OR selects
+    the first child row with the lowest score, as in the attack tree evaluation.
+
+    The nodes are grouped into levels: a node's level is higher than the levels
+    of all its children, referenced trees and circumvent trees. All nodes of a level
+    are evaluated together, so a whole forest is evaluated in a few operations per level.
+    The levels only depend on the structure of the forest, so one evaluator can be reused
+    for any set of active controls.
+
+    The what-if analysis uses it with whatif --evaluator numpy.
+    Requires numpy, which can be installed with 'pip install taratool[numpy]'.
+    """
+
+    def __init__(self, forest: FlatAttackForest):
+        if np is None:
+            raise ImportError("The NumPy forest evaluator requires numpy. Install it with 'pip install taratool[numpy]'.")
+
+        self.forest = forest
+        node_count = len(forest.node_type)
+
+        # the rating values of each feasibility vector, indexed by vector ID
+        vectors = [Feasibility.from_vector_id(vector_id) for vector_id in range(VECTOR_COUNT)]
+        self._vector_ratings = np.array(
+            [[f.time.value, f.expertise.value, f.knowledge.value, f.window_of_opportunity.value, f.equipment.value] for f in vectors],
+            dtype=np.int16)
+        self._vector_ids = {tuple(int(rating) for rating in ratings): vector_id for vector_id, ratings in enumerate(self._vector_ratings)}
+
+        roots = [forest.get_root(tree_index) for tree_index in range(len(forest.tree_ids))]
+
+        def root_of(tree_id: str) -> int:
+            tree_index = forest.get_tree_index(tree_id)
+            return roots[tree_index] if tree_index != NONE else NONE
+
+        # the IDs of all controls and for each (node, control) pair the root of the circumvent tree
+        self.control_ids: list[str] = []
+        control_indexes: dict[str, int] = {}
+        control_pairs: list[tuple[int, int, int]] = []
+
+        # determine the dependencies and the level of each node
+        levels = [0] * node_count
+        reference_roots = [NONE] * node_count
+        for tree_index in forest.get_evaluation_order():
+            for node_index in range(forest.tree_node_start[tree_index + 1] - 1, forest.tree_node_start[tree_index] - 1, -1):
+                node_type = forest.node_type[node_index]
+                level = 0
+
+                if node_type == REF_NODE:
+                    referenced_tree_id = forest.get_string(forest.referenced_tree[node_index])
+                    reference_root = root_of(referenced_tree_id)
+                    if reference_root == NONE:
+                        raise ValueError(f"Referenced node with ID {referenced_tree_id} not found.")
+                    reference_roots[node_index] = reference_root
+                    level = levels[reference_root] + 1
+                elif node_type != LEAF_NODE:
+                    children = forest.get_children(node_index)
+                    if not children:
+                        raise ValueError(f"{'AND' if node_type == AND_NODE else 'OR'} node has no children.")
+                    level = max(levels[child] for child in children) + 1
+
+                for control_id in forest.get_control_ids(node_index):
+                    if control_id not in control_indexes:
+                        control_indexes[control_id] = len(self.control_ids)
+                        self.control_ids.append(control_id)
+                    circumvent_root = root_of(circumvent_tree_id(control_id))
+                    control_pairs.append((node_index, control_indexes[control_id], circumvent_root))
+                    if circumvent_root != NONE:
+                        level = max(level, levels[circumvent_root] + 1)
+
+                levels[node_index] = level
+
+        levels = np.array(levels, dtype=np.int64)
+        self._level_count = int(levels.max()) + 1 if node_count else 0
+
+        node_types = np.frombuffer(forest.node_type, dtype=np.int8) if node_count else np.zeros(0, dtype=np.int8)
+        leaf_nodes = np.flatnonzero(node_types == LEAF_NODE)
+        self._leaf_nodes = leaf_nodes
+        self._leaf_ratings = self._vector_ratings[np.array([forest.feasibility_id[i] for i in leaf_nodes], dtype=np.int64)] if len(leaf_nodes) else np.zeros((0, 5), dtype=np.int16)
+
+        # group the nodes and the control pairs by level
+        order = np.argsort(levels, kind="stable")
+        level_starts = np.searchsorted(levels[order], np.arange(self._level_count + 1))
+        pairs_by_level: list[list[tuple[int, int, int]]] = [[] for _ in range(self._level_count)]
+        for pair in control_pairs:
+            pairs_by_level[levels[pair[0]]].append(pair)
+
+        # per level: the AND and OR nodes with their concatenated children, the REF nodes and the control pairs
+        self._levels = []
+        for level in range(self._level_count):
+            nodes_of_level = order[level_starts[level]:level_starts[level + 1]]
+            types_of_level = node_types[nodes_of_level]
+            ref_nodes = nodes_of_level[types_of_level == REF_NODE]
+            pairs = pairs_by_level[level]
+            self._levels.append({
+                "and": self._build_segments(nodes_of_level[types_of_level == AND_NODE]),
+                "or": self._build_segments(nodes_of_level[types_of_level == OR_NODE]),
+                "ref_nodes": ref_nodes,
+                "ref_roots": np.array([reference_roots[n] for n in ref_nodes], dtype=np.int64),
+                "control_nodes": np.array([pair[0] for pair in pairs], dtype=np.int64),
+                "control_indexes": np.array([pair[1] for pair in pairs], dtype=np.int64),
+                "control_roots": np.array([pair[2] for pair in pairs], dtype=np.int64),
+            })
+
+    def _build_segments(self, nodes: 'np.ndarray') -> tuple:
+        """
+        Returns the nodes, their concatenated children, the start offset and the number of the children of each node.
+        """
+        children = [self.forest.get_children(int(node)) for node in nodes]
+        counts = np.array([len(c) for c in children], dtype=np.int64)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int64) if len(nodes) else np.zeros(0, dtype=np.int64)
+        concatenated = np.array([child for c in children for child in c], dtype=np.int64)
+        return nodes, concatenated, starts, counts
+
+    def evaluate(self, active_control_ids: set[str], without_controls: bool = False) -> 'np.ndarray':
+        """
+        Evaluates all nodes of the forest.
+
+        :param active_control_ids: The IDs of the active security controls.
+        :param without_controls: If True, no circumvent trees are applied.
+        :return: An array with one row of the five rating values per node.
+        """
+        ratings = np.zeros((len(self.forest.node_type), 5), dtype=np.int16)
+        ratings[self._leaf_nodes] = self._leaf_ratings
+        active = np.array([control_id in active_control_ids for control_id in self.control_ids], dtype=bool)
+
+        for level_data in self._levels:
+            nodes, children, starts, _counts = level_data["and"]
+            if len(nodes):
+                ratings[nodes] = np.maximum.reduceat(ratings[children], starts, axis=0)
+
+            nodes, children, starts, counts = level_data["or"]
+            if len(nodes):
+                child_ratings = ratings[children]
+                scores = child_ratings.sum(axis=1, dtype=np.int32)
+                minimum_scores = np.minimum.reduceat(scores, starts)
+                positions = np.arange(len(children))
+                # the first child with the minimal score wins
+                candidates = np.where(scores == np.repeat(minimum_scores, counts), positions, len(children))
+                ratings[nodes] = child_ratings[np.minimum.reduceat(candidates, starts)]
+
+            if len(level_data["ref_nodes"]):
+                ratings[level_data["ref_nodes"]] = ratings[level_data["ref_roots"]]
+
+            if not without_controls and len(level_data["control_nodes"]):
+                is_active = active[level_data["control_indexes"]]
+                control_roots = level_data["control_roots"][is_active]
+                if np.any(control_roots == NONE):
+                    raise ValueError("One or more referenced circumvent trees do not exist in the object store.")
+                np.maximum.at(ratings, level_data["control_nodes"][is_active], ratings[control_roots])
+
+        return ratings
+
+    def evaluate_trees(self, active_control_ids: set[str], without_controls: bool = False) -> dict[str, Feasibility]:
+        """
+        Evaluates all trees and returns the feasibilities of their root nodes by tree ID,
+        matching AttackTree.get_feasibility.
+        """
+        ratings = self.evaluate(active_control_ids, without_controls)
+        feasibilities = {}
+        for tree_index, tree_id in enumerate(self.forest.tree_ids):
+            root = self.forest.get_root(tree_index)
+            if root != NONE:
+                feasibilities[tree_id] = self.to_feasibility(ratings[root])
+        return feasibilities
+
+    def to_feasibility(self, ratings: 'np.ndarray') -> Feasibility:
+        """
+        Converts a row of rating values to the interned feasibility.
+        """
+        return Feasibility.from_vector_id(self._vector_ids[tuple(int(rating) for rating in ratings)])
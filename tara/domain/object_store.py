@@ -1,9 +1,20 @@
 from tara.utilities.error_logger import IErrorLogger
+from tara.domain import evaluation_counters
 
 class ObjectStore:
+    """
+    Stores the objects of a TARA by their ID.
+
+    Besides the lookup by ID, the objects are partitioned by their type, so all objects
+    of a type can be iterated without scanning the store. The dependencies between the
+    attack tree nodes are indexed by AttackForest.
+    """
+
     def __init__(self, logger: IErrorLogger):
         self._store: dict[str, object] = {}
         self.logger = logger
+        # Maps each type to its objects by ID, in the order they were added
+        self._partitions: dict[type, dict[str, object]] = {}
 
     def add(self, obj):
         if hasattr(obj, 'id') and obj.id:
@@ -11,14 +22,30 @@ class ObjectStore:
                 self.logger.log_error(f"Duplicate ID found: {obj.id}")
                 return
             self._store[obj.id] = obj
+            self._partitions.setdefault(type(obj), {})[obj.id] = obj
         else:
             raise ValueError("Object does not have a valid ID.")
 
-    def get(self, obj_id):
-        return self._store.get(obj_id)
+    def get(self, obj_id, obj_type: type = None):
+        """
+        Returns the object with the given ID or None.
+        If a type is given, None is also returned if the object is not of this type.
+        """
+        if evaluation_counters.active is not None:
+            evaluation_counters.active.object_store_gets += 1
+        obj = self._store.get(obj_id)
+        if obj_type is not None and not isinstance(obj, obj_type):
+            return None
+        return obj
 
     def has(self, obj_id):
         return obj_id in self._store
 
     def items(self):
         return self._store.items()
+
+    def get_all(self, obj_type: type) -> list:
+        """
+        Returns all objects of the given type, including subclasses, in the order they were added per type.
+        """
+        return [obj for partition_type, partition in self._partitions.items() if issubclass(partition_type, obj_type) for obj in partition.values()]
@@ -2,6 +2,7 @@ from tara.domain.asset import Asset
 from tara.domain.assumption import Assumption
 from tara.domain.damage_scenario import DamageScenario
 from tara.domain.attack_tree import AttackTree
+from tara.domain.attack_forest import AttackForest
 from tara.domain.security_control import SecurityControl
 
 class Tara:
@@ -11,3 +12,31 @@ class Tara:
         self.damage_scenarios: list[DamageScenario] = []
         self.attack_trees: list[AttackTree] = []
         self.security_controls: list[SecurityControl] = []
+        # The forest over the attack trees and the lists it was built from, see get_forest
+        self._forest: AttackForest = None
+        self._forest_sources: tuple[list, list] = None
+
+    def damage_scenarios_by_id(self) -> dict[str, DamageScenario]:
+        """
+        Returns an index of the damage scenarios by ID for constant time lookups.
+        The index is built on each call, so build it once before looking up many IDs.
+        """
+        return {damage_scenario.id: damage_scenario for damage_scenario in self.damage_scenarios}
+
+    def attack_trees_by_id(self) -> dict[str, AttackTree]:
+        """
+        Returns an index of the attack trees by ID for constant time lookups.
+        The index is built on each call, so build it once before looking up many IDs.
+        """
+        return {attack_tree.id: attack_tree for attack_tree in self.attack_trees}
+
+    def get_forest(self) -> AttackForest:
+        """
+        Returns the forest over the attack trees with their topological evaluation order.
+        The parser builds it when it checks the trees for circular references, and all evaluations reuse it.
+        It is built again if the list of attack trees or of security controls has been replaced.
+        """
+        if self._forest is None or self._forest_sources[0] is not self.attack_trees or self._forest_sources[1] is not self.security_controls:
+            self._forest = AttackForest(self.attack_trees, self.security_controls)
+            self._forest_sources = (self.attack_trees, self.security_controls)
+        return self._forest
@@ -1,34 +1,102 @@
+from typing import Iterator
 from tara.utilities.error_logger import ErrorLogger
 from tara.MarkdownLib.markdown_document import *
 from tara.MarkdownLib.markdown_document_builder import *
 from tara.domain.tara import Tara
 from tara.domain.damage_scenario import DamageScenario
+from tara.domain.threat_scenario import ThreatScenario
 from tara.domain.attack_tree import attack_tree_id, AttackTree, AttackTreeResolvedNode
 from tara.domain.feasibility import Feasibility
 from tara.domain.risk import RiskLevel
+from tara.domain.what_if_analysis import WhatIfAnalysis
 from tara.domain.feasibility_conversion import *
+from tara.utilities.phase_timer import PhaseTimer
 
 class TaraDocumentGenerator:
-    def __init__(self, error_logger: ErrorLogger):
+    def __init__(self, error_logger: ErrorLogger, timer: PhaseTimer = None, control_sensitivity: bool = False):
+        """
+        :param error_logger: Receives the errors found while generating the report.
+        :param timer: Measures the phases of the generation, disabled by default.
+        :param control_sensitivity: If True, the report contains the control sensitivity section.
+            It switches every active control off once and re-evaluates the nodes depending on it,
+            the states of the controls are restored afterwards.
+        """
         self.error_logger = error_logger
+        self.timer = timer or PhaseTimer(enabled=False)
+        self.control_sensitivity = control_sensitivity
 
     def generate(self, tara: Tara) -> MarkdownDocument:
+        document_builder = self._add_summary(MarkdownDocumentBuilder(), tara)
+        for attack_tree in tara.attack_trees:
+            document_builder = self._add_attack_tree(document_builder, attack_tree)
+
+        return document_builder.build()
+
+    def generate_parts(self, tara: Tara) -> Iterator[MarkdownDocument]:
+        """
+        Generates the same report as generate, split into parts which can be written one after another:
+        the threat scenarios and the optional control sensitivity up to the heading of the attack trees,
+        then one part per attack tree. Each part is only built when the previous one has been consumed,
+        so the memory for the report does not grow with the number of attack trees.
+        The phases are timed with the timer of the generator, the time of the consumer is not included.
+        """
+        yield self._add_summary(MarkdownDocumentBuilder(), tara).build()
+        for attack_tree in tara.attack_trees:
+            with self.timer.phase("resolving attack trees and building the report"):
+                part = self._add_attack_tree(MarkdownDocumentBuilder(), attack_tree).build()
+            yield part
+
+    def _add_summary(self, document_builder: MarkdownDocumentBuilder, tara: Tara) -> MarkdownDocumentBuilder:
         title_level = 0
         h1 = 1
-        h2 = 2
 
-        document_builder = MarkdownDocumentBuilder() \
-            .withSection("Threat Analysis And Risk Assessment (TARA) Report", title_level) \
-            .withSection("Threat Scenarios", h1) \
-            .withTable(self._build_threat_scenario_table(tara)) \
-            .withSection("Attack Trees", h1)
-        
-        for attack_tree in tara.attack_trees:
+        # The sensitivity analysis switches the controls and restores their states afterwards, so it runs
+        # before the evaluation for the current states. This evaluation only re-evaluates the nodes depending
+        # on the switched controls, and all tables of the report are built from its cached feasibilities.
+        control_sensitivity_table = None
+        if self.control_sensitivity:
+            with self.timer.phase("evaluating feasibilities"):
+                analysis = WhatIfAnalysis(tara)
+            with self.timer.phase("analysing control sensitivities"):
+                control_sensitivity_table = self._build_control_sensitivity_table(analysis)
+            forest = analysis.forest
+        else:
+            forest = tara.get_forest()
+        with self.timer.phase("evaluating feasibilities"):
+            forest.evaluate()
+
+        with self.timer.phase("resolving attack trees and building the report"):
             document_builder = document_builder \
-                .withSection(attack_tree.id, h2) \
-                .withTable(self._build_resolved_attack_tree_table(attack_tree))
+                .withSection("Threat Analysis And Risk Assessment (TARA) Report", title_level) \
+                .withSection("Threat Scenarios", h1) \
+                .withTable(self._build_threat_scenario_table(tara))
+            if control_sensitivity_table is not None:
+                document_builder = document_builder \
+                    .withSection("Control Sensitivity", h1) \
+                    .withTable(control_sensitivity_table)
+            return document_builder.withSection("Attack Trees", h1)
+
+    def _add_attack_tree(self, document_builder: MarkdownDocumentBuilder, attack_tree: AttackTree) -> MarkdownDocumentBuilder:
+        h2 = 2
+        return document_builder \
+            .withSection(attack_tree.id, h2) \
+            .withTable(self._build_resolved_attack_tree_table(attack_tree))
 
-        return document_builder.build()
+    def _build_control_sensitivity_table(self, analysis: WhatIfAnalysis) -> MarkdownTable:
+        """
+        Lists for each active control the threat scenarios whose residual risk changes
+        when the control alone is turned off and how the feasibility scores change.
+        """
+        builder = MarkdownTableBuilder() \
+            .withHeader("ID", "Name", "Changed Risks", "Threat Scenarios", "Total Score Change", "Largest Score Change")
+
+        for sensitivity in analysis.evaluate_control_sensitivities():
+            threat_scenarios = ", ".join(f"TS-{i + 1}" for i in sensitivity.changed_risks)
+            largest_score_change = max(sensitivity.score_changes, key=abs, default=0)
+            builder.withRow(sensitivity.control.id, sensitivity.control.name, f"{len(sensitivity.changed_risks)}", threat_scenarios,
+                            f"{sum(sensitivity.score_changes)}", f"{largest_score_change}")
+
+        return builder.build()
 
     def _build_resolved_attack_tree_table(self, attack_tree: AttackTree) -> MarkdownTable:
         resolved_tree = attack_tree.get_resolved_tree()
@@ -36,13 +104,19 @@ class TaraDocumentGenerator:
         builder = MarkdownTableBuilder() \
             .withHeader("Attack Tree", "Node", "ET", "Ex", "Kn", "WoO", "Eq", "Feasibility", "Reasoning", "Control", "Comment")
 
-        self._add_attack_tree_node_to_table_recursive(builder, resolved_tree.root_node, 0)
+        # add the nodes in pre-order together with their depth in the tree
+        stack = [(resolved_tree.root_node, 0)]
+        while stack:
+            node, recursion_level = stack.pop()
+            self._add_attack_tree_node_to_table(builder, node, recursion_level)
+            for child in reversed(node.children):
+                stack.append((child, recursion_level + 1))
 
         return builder.build()
 
-    def _add_attack_tree_node_to_table_recursive(self, builder: MarkdownTableBuilder, node: AttackTreeResolvedNode, recursion_level: int) -> None:
+    def _add_attack_tree_node_to_table(self, builder: MarkdownTableBuilder, node: AttackTreeResolvedNode, recursion_level: int) -> None:
         """
-        Recursively adds nodes of the attack tree to the table builder.
+        Adds a single node of the attack tree to the table builder.
         """
         indent_str = f"{recursion_level * '--'} " if recursion_level > 0 else ""
         security_controls_str = " ".join(node.security_control_ids) if node.security_control_ids else ""
@@ -70,42 +144,38 @@ class TaraDocumentGenerator:
             node.comment
         )
 
-        for child in node.children:
-            self._add_attack_tree_node_to_table_recursive(builder, child, recursion_level + 1)
-
     def _build_threat_scenario_table(self, tara: Tara) -> MarkdownTable:
         builder = MarkdownTableBuilder() \
             .withHeader("ID", "Threat Scenario", "Impact", "Feasibility", "Risk")
 
+        damage_scenarios = tara.damage_scenarios_by_id()
+        attack_trees = tara.attack_trees_by_id()
+
         i = 1
         for asset in tara.assets:
             for security_property, damage_scenario_ids in asset.damage_scenarios.items():
                 for ds_id in damage_scenario_ids:
-                    damage_scenario: DamageScenario = self._find_by_id(tara.damage_scenarios, ds_id)
-                    damage_scenario_name = damage_scenario.name if damage_scenario else "Unknown"
+                    damage_scenario: DamageScenario = self._find_by_id(damage_scenarios, ds_id)
                     impact = damage_scenario.get_impact() if damage_scenario else None
                     impact_name = impact.name if impact else "Unknown"
 
                     at_id = attack_tree_id(asset, security_property)
-                    attack_tree: AttackTree = self._find_by_id(tara.attack_trees, at_id)
+                    attack_tree: AttackTree = self._find_by_id(attack_trees, at_id)
                     feasibility = attack_tree.get_feasibility() if attack_tree else Feasibility()
                     feasibility_level = feasibility.calculate_feasibility_level()
                     linked_feasibility = f"[{feasibility_level.name}](#{at_id.lower()})"
 
                     risk = RiskLevel.look_up(impact, feasibility_level)
 
-                    attack_description: str = security_property.to_attack_description().lower()
-
-                    threat_scenario = f"{damage_scenario_name} caused by {attack_description} of {asset.name}"
+                    threat_scenario = ThreatScenario(asset, security_property, damage_scenario, feasibility)
 
-                    builder.withRow(f"TS-{i}", threat_scenario, impact_name, linked_feasibility, risk.name)
+                    builder.withRow(f"TS-{i}", threat_scenario.get_description(), impact_name, linked_feasibility, risk.name)
                     i += 1
 
         return builder.build()
     
-    def _find_by_id(self, items, item_id) -> object:
-        for item in items:
-            if item.id == item_id:
-                return item
-        self.error_logger.log_error(f"Item with ID {item_id} not found.")
-        return None
\ No newline at end of file
+    def _find_by_id(self, items: dict, item_id) -> object:
+        item = items.get(item_id)
+        if item is None:
+            self.error_logger.log_error(f"Item with ID {item_id} not found.")
+        return item
\ No newline at end of file
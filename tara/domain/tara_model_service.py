@@ -0,0 +1,228 @@
+from tara.domain.tara import Tara
+from tara.domain.tara_parser import TaraParser
+from tara.domain.attack_tree import attack_tree_id
+from tara.domain.feasibility import Feasibility
+from tara.domain.risk import RiskLevel
+from tara.domain.threat_scenario import ThreatScenario, iterate_threat_scenarios
+from tara.domain.security_property import SecurityProperty
+from tara.domain.what_if_analysis import WhatIfAnalysis
+from tara.domain.tara_snapshot import open_snapshot
+from tara.utilities.file_reader import IFileReader
+from tara.utilities.error_logger import MemoryErrorLogger
+from tara.utilities.parse_cache import MemoryParseCache
+
+class TaraModelService:
+    """
+    Keeps a parsed TARA in memory and answers queries on it, e.g. for the serve command.
+
+    The results are plain dicts and lists, so they can be sent as JSON directly.
+    Threat scenarios are identified by their IDs in the reports (TS-1, TS-2, ...).
+    Switching a control only changes the state in memory, the controls table is not written.
+    A reload parses the directory again; unchanged attack tree files are not parsed again.
+    With a snapshot path, the TARA is loaded from the snapshot instead of the directory. The snapshot
+    is memory-mapped and the attack trees are loaded on first access, so until the first request
+    needing all trees (e.g. all threat scenarios or switching a control), a request for an attack tree
+    or a threat scenario only loads the trees it depends on.
+    """
+
+    def __init__(self, file_reader: IFileReader, directory: str, snapshot_path: str = None):
+        self.file_reader = file_reader
+        self.directory = directory
+        self.snapshot_path = snapshot_path
+        self.cache = MemoryParseCache()
+        self.reload()
+
+    def reload(self) -> dict:
+        """
+        Parses the TARA again and resets the states of the controls to the controls table.
+
+        :return: The validation results, see get_validation.
+        """
+        self.logger = MemoryErrorLogger()
+        self.tara: Tara = self._load()
+        # The analysis of all trees is created by the first request needing it, see _get_analysis
+        self.analysis: WhatIfAnalysis = None
+        return self.get_validation()
+
+    def _load(self) -> Tara:
+        if self.snapshot_path is None:
+            return TaraParser(self.file_reader, self.logger, self.cache).parse(self.directory)
+
+        try:
+            return open_snapshot(self.snapshot_path, self.logger)
+        except (OSError, ValueError) as e:
+            self.logger.log_error(f"Could not read the snapshot {self.snapshot_path}: {e}")
+            return Tara()
+
+    def handle(self, method: str, path: str, body: object) -> tuple[int, object]:
+        """
+        Answers a request.
+
+        GET /validation: the errors and warnings of the last parse
+        GET /attack-trees/<ID>: the feasibility of an attack tree without and with the controls
+        GET /threat-scenarios: the risks of all threat scenarios
+        GET /threat-scenarios/<ID>: the risk of a threat scenario
+        GET /controls: the security controls and their states
+        PUT /controls/<ID> with {"active": true|false}: switches a control, returns the threat scenarios whose residual risk changed
+        POST /reload: parses the TARA or reads the snapshot again
+
+        :param method: The HTTP method.
+        :param path: The path of the request, e.g. "/controls/C-1".
+        :param body: The parsed JSON body of the request or None.
+        :return: The HTTP status and the response.
+        """
+        parts = [part for part in path.split("/") if part]
+        try:
+            if method == "GET" and parts == ["validation"]:
+                return 200, self.get_validation()
+            if method == "GET" and len(parts) == 2 and parts[0] == "attack-trees":
+                return 200, self.get_attack_tree(parts[1])
+            if method == "GET" and parts == ["threat-scenarios"]:
+                return 200, self.get_threat_scenarios()
+            if method == "GET" and len(parts) == 2 and parts[0] == "threat-scenarios":
+                return 200, self.get_threat_scenario(parts[1])
+            if method == "GET" and parts == ["controls"]:
+                return 200, self.get_controls()
+            if method == "PUT" and len(parts) == 2 and parts[0] == "controls":
+                if not isinstance(body, dict) or not isinstance(body.get("active"), bool):
+                    raise ValueError('The request body must be {"active": true} or {"active": false}.')
+                return 200, self.set_control_active(parts[1], body["active"])
+            if method == "POST" and parts == ["reload"]:
+                return 200, self.reload()
+        except LookupError as e:
+            return 404, {"error": str(e.args[0])}
+        except ValueError as e:
+            return 400, {"error": str(e)}
+
+        return 404, {"error": f"Unknown request: {method} {path}"}
+
+    def get_validation(self) -> dict:
+        """
+        Returns the errors and warnings of the last parse.
+        """
+        return {"errors": list(self.logger.get_errors()), "warnings": list(self.logger.get_warnings())}
+
+    def get_attack_tree(self, tree_id: str) -> dict:
+        """
+        Returns the feasibility of an attack tree without controls and with the active controls.
+        """
+        self._check_validity()
+        attack_tree = self.tara.attack_trees_by_id().get(tree_id)
+        if attack_tree is None:
+            raise LookupError(f"Attack tree with id '{tree_id}' not found.")
+
+        return {
+            "id": tree_id,
+            "feasibility": self._describe_feasibility(self._get_feasibility(tree_id, without_controls=True)),
+            "residual_feasibility": self._describe_feasibility(self._get_feasibility(tree_id)),
+        }
+
+    def get_threat_scenarios(self) -> list[dict]:
+        """
+        Returns the initial and residual risk of each threat scenario in the order of the threat scenario table.
+        """
+        analysis = self._get_analysis()
+        initial_risks = analysis.get_initial_risks()
+        residual_feasibilities = analysis.evaluate_residual_feasibilities()
+        residual_risks = analysis.evaluate_residual_risks()
+
+        return [
+            self._describe_threat_scenario(i, threat_scenario, initial_risks[i], residual_risks[i], residual_feasibilities[i])
+            for i, threat_scenario in enumerate(analysis.threat_scenarios)
+        ]
+
+    def get_threat_scenario(self, threat_scenario_id: str) -> dict:
+        """
+        Returns the initial and residual risk of a threat scenario.
+        Only the attack tree of the threat scenario and the trees it depends on are evaluated.
+        """
+        self._check_validity()
+        for i, (asset, security_property, damage_scenario) in enumerate(iterate_threat_scenarios(self.tara)):
+            if f"TS-{i + 1}" == threat_scenario_id:
+                tree_id = attack_tree_id(asset, security_property)
+                threat_scenario = ThreatScenario(asset, security_property, damage_scenario, self._get_feasibility(tree_id, without_controls=True))
+                residual_feasibility = self._get_feasibility(tree_id)
+                return self._describe_threat_scenario(i, threat_scenario, threat_scenario.get_risk(threat_scenario.feasibility),
+                                                      threat_scenario.get_risk(residual_feasibility), residual_feasibility)
+
+        raise LookupError(f"Threat scenario with id '{threat_scenario_id}' not found.")
+
+    def get_controls(self) -> list[dict]:
+        """
+        Returns the security controls and their states in the order of the controls table.
+        """
+        return [
+            {"id": control.id, "name": control.name, "security_goal": control.security_goal, "active": control.is_active}
+            for control in self.tara.security_controls
+        ]
+
+    def set_control_active(self, control_id: str, is_active: bool) -> dict:
+        """
+        Switches a security control on or off. Only the nodes depending on the control are re-evaluated.
+
+        :return: The IDs of the threat scenarios whose residual risk changed.
+        """
+        analysis = self._get_analysis()
+        if control_id not in {control.id for control in self.tara.security_controls}:
+            raise LookupError(f"Security control with id '{control_id}' not found.")
+
+        risks = analysis.evaluate_residual_risks()
+        analysis.forest.set_control_active(control_id, is_active)
+        changed_risks = [
+            f"TS-{i + 1}" for i, (risk, new_risk) in enumerate(zip(risks, analysis.evaluate_residual_risks())) if risk != new_risk
+        ]
+        return {"id": control_id, "active": is_active, "changed_risks": changed_risks}
+
+    def _check_validity(self) -> None:
+        # The evaluation needs a valid TARA, e.g. it can not evaluate circular references
+        if self.logger.has_errors():
+            raise ValueError("The TARA has errors, see /validation.")
+
+    def _get_analysis(self) -> WhatIfAnalysis:
+        """
+        Returns the analysis of all threat scenarios, creating it on the first call.
+        Creating it evaluates all attack trees, so all trees of a snapshot are loaded.
+        """
+        self._check_validity()
+        if self.analysis is None:
+            self.analysis = WhatIfAnalysis(self.tara)
+        return self.analysis
+
+    def _get_feasibility(self, tree_id: str, without_controls: bool = False) -> Feasibility:
+        """
+        Returns the feasibility of an attack tree, Feasibility() if the tree does not exist like in the reports.
+        Before the analysis exists, the controls have not been switched, so the tree is evaluated directly.
+        """
+        if self.analysis is not None:
+            if tree_id not in self.analysis.forest.attack_trees:
+                return Feasibility()
+            return self.analysis.forest.get_feasibility(tree_id, without_controls)
+
+        attack_tree = self.tara.attack_trees_by_id().get(tree_id)
+        return attack_tree.get_feasibility(without_controls) if attack_tree is not None else Feasibility()
+
+    def _describe_threat_scenario(self, i: int, threat_scenario: ThreatScenario, initial_risk: RiskLevel,
+                                  residual_risk: RiskLevel, residual_feasibility: Feasibility) -> dict:
+        return {
+            "id": f"TS-{i + 1}",
+            "description": threat_scenario.get_description(),
+            "asset": threat_scenario.asset.id,
+            "security_property": SecurityProperty.to_attack_id(threat_scenario.security_property),
+            "damage_scenario": threat_scenario.damage_scenario.id if threat_scenario.damage_scenario else None,
+            "attack_tree": attack_tree_id(threat_scenario.asset, threat_scenario.security_property),
+            "initial_risk": initial_risk.name,
+            "residual_risk": residual_risk.name,
+            "feasibility": self._describe_feasibility(threat_scenario.feasibility),
+            "residual_feasibility": self._describe_feasibility(residual_feasibility),
+        }
+
+    def _describe_feasibility(self, feasibility: Feasibility) -> dict:
+        return {
+            "time": feasibility.time.name,
+            "expertise": feasibility.expertise.name,
+            "knowledge": feasibility.knowledge.name,
+            "window_of_opportunity": feasibility.window_of_opportunity.name,
+            "equipment": feasibility.equipment.name,
+            "score": feasibility.calculate_feasibility_score(),
+            "level": feasibility.calculate_feasibility_level().name,
+        }
@@ -1,4 +1,6 @@
 import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from tara.domain.tara import Tara
 from tara.domain.file_stubs import FileType
 from tara.domain.assumption import Assumption
@@ -9,68 +11,75 @@ from tara.domain.security_property import SecurityProperty
 from tara.domain.attack_tree_parser import AttackTreeParser
 from tara.domain.feasibility import *
 from tara.utilities.file_reader import IFileReader
-from tara.utilities.error_logger import IErrorLogger
+from tara.utilities.error_logger import IErrorLogger, BufferedErrorLogger
+from tara.utilities.parse_cache import ParseCache
+from tara.utilities.phase_timer import PhaseTimer
 from tara.MarkdownLib.markdown_parser import MarkdownParser, MarkdownDocument, MarkdownTable
-from tara.domain.attack_tree import AttackTreeNode, AttackTreeOrNode, AttackTreeAndNode, AttackTreeReferenceNode, circumvent_tree_id
+from tara.domain.attack_tree import AttackTree, AttackTreeNode, AttackTreeOrNode, AttackTreeAndNode, AttackTreeReferenceNode, circumvent_tree_id
 from tara.domain.object_store import ObjectStore
 
 class TaraParser:
-    def __init__(self, file_reader: IFileReader, logger: IErrorLogger):
+    def __init__(self, file_reader: IFileReader, logger: IErrorLogger, cache: ParseCache = None, timer: PhaseTimer = None):
         self.file_reader = file_reader
         self.logger = logger
         self.object_store = ObjectStore(self.logger)
+        # Optional cache for the parsed attack tree files, a ParseCache or a MemoryParseCache
+        self.cache = cache
+        # Measures the phases of parsing, disabled by default
+        self.timer = timer or PhaseTimer(enabled=False)
 
-    def parse(self, directory: str) -> Tara:
+    def parse(self, directory: str, jobs: int = 1) -> Tara:
         """
         Parses the TARA documents in the specified directory and returns a Tara object.
         
         :param directory: The directory containing the TARA documents.
+        :param jobs: The number of processes parsing the attack tree files.
         :return: A Tara object populated with parsed data.
         """
 
         tara = Tara()
         assumptions_table = self.read_table(FileType.ASSUMPTIONS, directory)
-        tara.assumptions = self.extract_assumptions(assumptions_table)
+        with self.timer.phase("extracting tables"):
+            tara.assumptions = self.extract_assumptions(assumptions_table)
 
         damage_scenarios_table = self.read_table(FileType.DAMAGE_SCENARIOS, directory)
-        tara.damage_scenarios = self.extract_damage_scenarios(damage_scenarios_table)
+        with self.timer.phase("extracting tables"):
+            tara.damage_scenarios = self.extract_damage_scenarios(damage_scenarios_table)
 
         assets_table = self.read_table(FileType.ASSETS, directory)
-        tara.assets = self.extract_assets(assets_table)
+        with self.timer.phase("extracting tables"):
+            tara.assets = self.extract_assets(assets_table)
 
         # Parse security controls (security goals)
         controls_table = self.read_table(FileType.CONTROLS, directory)
-        tara.security_controls = self.extract_security_controls(controls_table)
+        with self.timer.phase("extracting tables"):
+            tara.security_controls = self.extract_security_controls(controls_table)
 
         # parse all attack trees
-        attack_tree_parser = AttackTreeParser(self.logger, self.object_store)
         attack_tree_dir = os.path.join(directory, "AttackTrees")
         attack_tree_files = [f for f in self.file_reader.listdir(attack_tree_dir) if f.endswith('.md')]
-        
-        for file_name in attack_tree_files:
-            attack_tree_table = self.read_table(FileType.ATTACK_TREE, attack_tree_dir, file_name)
-            if attack_tree_table is None:
-                self.logger.log_error(f"No attack tree table found in file {file_name}. Is the table header correct?")
-                continue
-            att_id = file_name.replace('.md', '')  # Extract the attack tree ID from the file name
-            attack_tree = attack_tree_parser.parse_attack_tree(attack_tree_table, att_id)       
-            tara.attack_trees.append(attack_tree)
+        tara.attack_trees = self.parse_attack_tree_files(attack_tree_dir, attack_tree_files, jobs)
 
         # register all objects by their ID
-        self.add_ids(tara.assumptions)
-        self.add_ids(tara.damage_scenarios)
-        self.add_ids(tara.assets)
-        self.add_ids(tara.attack_trees)
-        self.add_ids(tara.security_controls)
+        with self.timer.phase("registering IDs"):
+            self.add_ids(tara.assumptions)
+            self.add_ids(tara.damage_scenarios)
+            self.add_ids(tara.assets)
+            self.add_ids(tara.attack_trees)
+            self.add_ids(tara.security_controls)
 
         # check rules
-        self.check_damage_scenario_references_in_assets(tara)
-        self.check_all_attack_trees_are_present(tara)
+        with self.timer.phase("rule check_damage_scenario_references_in_assets"):
+            self.check_damage_scenario_references_in_assets(tara)
+        with self.timer.phase("rule check_all_attack_trees_are_present"):
+            self.check_all_attack_trees_are_present(tara)
         self.check_attack_tree_rules(tara, [
-            self.check_and_or_nodes_have_children,
-            self.check_referenced_trees_exist,
-            self.check_referenced_controls_exist
+            self.timer.wrap("rule check_and_or_nodes_have_children", self.check_and_or_nodes_have_children),
+            self.timer.wrap("rule check_referenced_trees_exist", self.check_referenced_trees_exist),
+            self.timer.wrap("rule check_referenced_controls_exist", self.check_referenced_controls_exist)
         ])
+        with self.timer.phase("rule check_attack_trees_are_acyclic"):
+            self.check_attack_trees_are_acyclic(tara)
 
         return tara
     def extract_security_controls(self, table: MarkdownTable) -> list:
@@ -95,6 +104,85 @@ class TaraParser:
             controls.append(control)
         return controls
 
+    def parse_attack_tree_files(self, attack_tree_dir: str, file_names: list[str], jobs: int = 1) -> list[AttackTree]:
+        """
+        Parses the attack tree files in the given order.
+
+        With more than one job the files are read and parsed in a process pool. The errors and
+        warnings of each file are recorded in the worker and logged here in the order of the files,
+        so the parsed trees and the messages are the same as with a single job.
+
+        :param attack_tree_dir: The directory containing the attack tree files.
+        :param file_names: The names of the attack tree files.
+        :param jobs: The number of processes to use.
+        :return: The parsed attack trees.
+        """
+        if jobs <= 1 or len(file_names) <= 1:
+            attack_trees = [self.parse_attack_tree_file(attack_tree_dir, file_name) for file_name in file_names]
+            return [attack_tree for attack_tree in attack_trees if attack_tree is not None]
+
+        attack_trees = []
+        # the phases of the workers are not measured
+        with self.timer.phase(f"parsing attack tree files in {jobs} processes"), ProcessPoolExecutor(max_workers=jobs) as executor:
+            chunk_size = max(1, len(file_names) // (jobs * 4))
+            results = executor.map(_parse_attack_tree_file_in_worker, repeat(self.file_reader), repeat(self.cache), repeat(attack_tree_dir), file_names, chunksize=chunk_size)
+            for attack_tree, logger in results:
+                logger.replay(self.logger)
+                if attack_tree is None:
+                    continue
+                # unpickled nodes have no object store
+                self._set_object_store(attack_tree)
+                attack_trees.append(attack_tree)
+
+        return attack_trees
+
+    def parse_attack_tree_file(self, attack_tree_dir: str, file_name: str) -> AttackTree:
+        """
+        Reads and parses a single attack tree file.
+        If a cache is set, the attack tree and the logged errors and warnings of an unchanged file are taken from the cache.
+
+        :return: The attack tree or None if the file contains no attack tree table.
+        """
+        file_path = os.path.join(attack_tree_dir, file_name)
+        with self.timer.phase("reading files"):
+            content = self.file_reader.read_file(file_path)
+        if self.cache is None:
+            return self._parse_attack_tree_content(content, file_name, self.logger)
+
+        with self.timer.phase("reading the parse cache"):
+            cached_result = self.cache.get(file_path, content)
+        if cached_result is not None:
+            attack_tree, logger = cached_result
+            if attack_tree is not None:
+                self._set_object_store(attack_tree)
+                # a tree shared with an earlier parse may have been evaluated with other controls
+                if attack_tree.root_node is not None:
+                    attack_tree.invalidate_cache()
+        else:
+            logger = BufferedErrorLogger()
+            attack_tree = self._parse_attack_tree_content(content, file_name, logger)
+            with self.timer.phase("writing the parse cache"):
+                self.cache.put(file_path, content, (attack_tree, logger))
+
+        logger.replay(self.logger)
+        return attack_tree
+
+    def _parse_attack_tree_content(self, content: str, file_name: str, logger: IErrorLogger) -> AttackTree:
+        attack_tree_table = self.find_table(FileType.ATTACK_TREE, content, logger)
+        if attack_tree_table is None:
+            logger.log_error(f"No attack tree table found in file {file_name}. Is the table header correct?")
+            return None
+        att_id = file_name.replace('.md', '')  # Extract the attack tree ID from the file name
+        with self.timer.phase("parsing attack trees"):
+            return AttackTreeParser(logger, self.object_store).parse_attack_tree(attack_tree_table, att_id)
+
+    def _set_object_store(self, attack_tree: AttackTree) -> None:
+        """
+        Sets the object store of all nodes of an attack tree taken from a worker process or a cache.
+        """
+        for node in attack_tree.get_nodes():
+            node.object_store = self.object_store
+
     def add_ids(self, objects: list[object]) -> None:
         """
         Adds IDs to a list of objects and registers them in the id_to_object map.
@@ -118,10 +206,8 @@ class TaraParser:
                 for ds_id in damage_scenario_ids:
                     if not self.object_store.has(ds_id):
                         self.logger.log_error(f"Damage scenario {ds_id} referenced by asset {asset.id} does not exist.")
-                    else:
-                        ds = self.object_store.get(ds_id)
-                        if not isinstance(ds, DamageScenario):
-                            self.logger.log_error(f"ID {ds_id} referenced by asset {asset.id} is not a damage scenario.")
+                    elif self.object_store.get(ds_id, DamageScenario) is None:
+                        self.logger.log_error(f"ID {ds_id} referenced by asset {asset.id} is not a damage scenario.")
 
     def check_all_attack_trees_are_present(self, tara: Tara) -> None:
         """
@@ -141,6 +227,18 @@ class TaraParser:
                 self.logger.log_error(f"No attack tree found for ID {attack_tree_id}.")
 
 
+    def check_attack_trees_are_acyclic(self, tara: Tara) -> None:
+        """
+        Checks that attack trees do not reference each other circularly,
+        neither through REF nodes nor through the circumvent trees of their controls.
+        All cycles are reported. The forest is kept by the TARA, so the evaluations
+        reuse its topological order, see Tara.get_forest.
+        
+        :param tara: The Tara object containing attack trees.
+        """
+        for description in tara.get_forest().describe_cycles():
+            self.logger.log_error(description)
+
     def check_attack_tree_rules(self, tara: Tara, rules: list) -> None:
         """
         Checks if all attack tree nodes of type AND and OR have at least one child.
@@ -148,19 +246,15 @@ class TaraParser:
         :param tara: The Tara object containing attack trees.
         :param rules: A list of lambda functions rule(node, attack_tree_id) implementing rules to check against.
         """
-        def check_recursively(attack_tree_id: str, node: AttackTreeNode, logger: IErrorLogger, rules: list) -> None:
-            for rule in rules:
-                rule(node, attack_tree_id)
-
-            for child in node.children:
-                check_recursively(attack_tree_id, child, logger, rules)
-
         for tree in tara.attack_trees:
             if tree.root_node is None:
                 self.logger.log_error(f"Attack tree {tree.id} has no root node.")
                 continue
             
-            check_recursively(tree.id, tree.root_node, self.logger, rules)
+            # the nodes are visited in pre-order, i.e. in the order of the table rows
+            for node in tree.get_nodes():
+                for rule in rules:
+                    rule(node, tree.id)
 
     def check_and_or_nodes_have_children(self, node: AttackTreeNode, attack_tree_id: str) -> None:
         """
@@ -208,15 +302,23 @@ class TaraParser:
         if file_name is None:
             file_name = FileType.to_path(file_type)
 
-        content = self.file_reader.read_file(os.path.join(directory, file_name))
+        with self.timer.phase("reading files"):
+            content = self.file_reader.read_file(os.path.join(directory, file_name))
+        return self.find_table(file_type, content, self.logger)
+
+    def find_table(self, file_type: FileType, content: str, logger: IErrorLogger) -> MarkdownTable:
+        """
+        Parses the markdown content and returns the table with the header of the file type.
+        """
         parser = MarkdownParser()
-        document: MarkdownDocument = parser.parse(content)
+        with self.timer.phase("parsing markdown"):
+            document: MarkdownDocument = parser.parse(content)
 
         for content in document.getContent():
             if isinstance(content, MarkdownTable) and content.hasHeader(FileType.get_header(file_type)):
                 return content
 
-        self.logger.log_error(f"{file_type} table not found in the document.")
+        logger.log_error(f"{file_type} table not found in the document.")
         return None
 
     def extract_assumptions(self, table: MarkdownTable) -> list[Assumption]:
@@ -339,3 +441,11 @@ class TaraParser:
         
         return damage_scenarios
 
+def _parse_attack_tree_file_in_worker(file_reader: IFileReader, cache: ParseCache, attack_tree_dir: str, file_name: str) -> tuple[AttackTree, BufferedErrorLogger]:
+    """
+    Parses a single attack tree file in a worker process of TaraParser.parse_attack_tree_files.
+    Returns the attack tree and the recorded errors and warnings.
+    """
+    logger = BufferedErrorLogger()
+    attack_tree = TaraParser(file_reader, logger, cache).parse_attack_tree_file(attack_tree_dir, file_name)
+    return attack_tree, logger
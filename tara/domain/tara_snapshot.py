@@ -0,0 +1,294 @@
+import mmap
+import struct
+import sys
+from array import array
+from tara.domain.tara import Tara
+from tara.domain.assumption import Assumption
+from tara.domain.damage_scenario import DamageScenario
+from tara.domain.asset import Asset
+from tara.domain.security_control import SecurityControl
+from tara.domain.security_property import SecurityProperty
+from tara.domain.impacts import ImpactCategory, Impact
+from tara.domain.flat_attack_forest import FlatAttackForest, NONE
+from tara.domain.lazy_attack_tree import LazyAttackTree
+from tara.domain.object_store import ObjectStore
+from tara.utilities.error_logger import IErrorLogger
+
+# The first bytes of every snapshot file
+MAGIC = b"TARASNAP"
+# Changes whenever the layout of the sections changes, old snapshots are rejected
+SNAPSHOT_VERSION = 1
+
+# magic, version, section count
+_HEADER = struct.Struct("<8sII")
+# name, array type code, item count, offset of the data from the start of the file
+_SECTION_ENTRY = struct.Struct("<32scxxxxxxxQQ")
+# The data of each section starts at a multiple of this, so it can be mapped as an array
+_ALIGNMENT = 8
+
+# The order of the damage scenarios of an asset and of the impacts of a damage scenario in the snapshot
+_SECURITY_PROPERTIES = [SecurityProperty.Availability, SecurityProperty.Integrity, SecurityProperty.Confidentiality]
+_IMPACT_CATEGORIES = [ImpactCategory.Safety, ImpactCategory.Operational, ImpactCategory.Financial, ImpactCategory.Privacy]
+
+# The node arrays of FlatAttackForest with their type codes
+_FOREST_ARRAYS = {
+    "tree_descriptions": 'i',
+    "tree_node_start": 'i',
+    "node_type": 'b',
+    "parent": 'i',
+    "first_child": 'i',
+    "next_sibling": 'i',
+    "feasibility_id": 'h',
+    "name": 'i',
+    "reasoning": 'i',
+    "comment": 'i',
+    "referenced_tree": 'i',
+    "control_start": 'i',
+    "control_ids": 'i',
+}
+
+def write_snapshot(tara: Tara, file_path: str) -> None:
+    """
+    Writes a parsed TARA to a binary snapshot file, which can be loaded without the markdown files.
+
+    The file starts with a table of contents of named sections, each holding one array.
+    All strings are interned in one string table, the other sections hold indexes into it.
+    The attack trees are stored as the arrays of a FlatAttackForest: the nodes of each tree
+    are contiguous and tree_node_start is the index of the trees' nodes, so single trees
+    can be read without reading the whole forest.
+    Feasibilities are stored as their vector IDs.
+    """
+    forest = FlatAttackForest.from_attack_trees(tara.attack_trees)
+    sections: dict[str, array] = {name: getattr(forest, name) for name in _FOREST_ARRAYS}
+    sections["tree_ids"] = array('i', [forest.intern(tree_id) for tree_id in forest.tree_ids])
+
+    sections["assumptions"] = array('i', [forest.intern(value) for assumption in tara.assumptions
+                                          for value in (assumption.id, assumption.name, assumption.security_claim, assumption.comment)])
+
+    damage_scenarios = array('i')
+    for damage_scenario in tara.damage_scenarios:
+        damage_scenarios.extend(forest.intern(value) for value in (damage_scenario.id, damage_scenario.name, damage_scenario.reasoning, damage_scenario.comment))
+        damage_scenarios.extend(damage_scenario.impacts[category].value for category in _IMPACT_CATEGORIES)
+    sections["damage_scenarios"] = damage_scenarios
+
+    assets = array('i')
+    # the damage scenario IDs of asset a and security property p are asset_damage_scenarios[start[3a + p]:start[3a + p + 1]]
+    asset_damage_scenario_start = array('i', [0])
+    asset_damage_scenarios = array('i')
+    for asset in tara.assets:
+        assets.extend(forest.intern(value) for value in (asset.id, asset.name, asset.description, asset.reasoning))
+        for security_property in _SECURITY_PROPERTIES:
+            asset_damage_scenarios.extend(forest.intern(ds_id) for ds_id in asset.damage_scenarios[security_property])
+            asset_damage_scenario_start.append(len(asset_damage_scenarios))
+    sections["assets"] = assets
+    sections["asset_damage_scenario_start"] = asset_damage_scenario_start
+    sections["asset_damage_scenarios"] = asset_damage_scenarios
+
+    sections["security_controls"] = array('i', [value for control in tara.security_controls for value in (
+        forest.intern(control.id), forest.intern(control.name), forest.intern(control.security_goal), int(bool(control.is_active)))])
+
+    # the string table is complete once all other sections have been built
+    string_data = array('B')
+    string_offsets = array('q', [0])
+    for string in forest.strings:
+        string_data.frombytes(string.encode("utf-8"))
+        string_offsets.append(len(string_data))
+    sections["string_offsets"] = string_offsets
+    sections["string_data"] = string_data
+
+    _write_sections(file_path, sections)
+
+def read_snapshot(file_path: str, logger: IErrorLogger) -> Tara:
+    """
+    Loads a TARA from a snapshot file written by write_snapshot.
+    All objects are registered in a new object store, like after parsing.
+    Raises a ValueError if the file is not a snapshot of this version.
+    """
+    with open(file_path, 'rb') as f:
+        sections = read_sections(f.read())
+    return SnapshotContent(sections).to_tara(ObjectStore(logger))
+
+def open_snapshot(file_path: str, logger: IErrorLogger) -> Tara:
+    """
+    Opens a snapshot file for queries touching only a few attack trees, e.g. by the serve command.
+
+    The file is memory-mapped and the attack trees are LazyAttackTrees, which create their
+    nodes from the mapped arrays on first access. So only the touched parts of the file are
+    read and only the nodes of the touched trees are kept in memory. The other objects are
+    created up front, they are small compared to the attack trees.
+    The file must not be changed while the TARA is in use.
+    Raises a ValueError if the file is not a snapshot of this version.
+    """
+    with open(file_path, 'rb') as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return SnapshotContent(read_sections(mapping)).to_tara(ObjectStore(logger), lazy=True)
+
+def read_sections(buffer) -> dict[str, memoryview]:
+    """
+    Reads the table of contents of a snapshot and returns the data of each section as a typed memoryview into the buffer.
+    The buffer can be bytes or a memory-mapped file. On big-endian machines the sections are copied and byte-swapped.
+    """
+    if len(buffer) < _HEADER.size:
+        raise ValueError("The file is not a TARA snapshot.")
+    magic, version, section_count = _HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError("The file is not a TARA snapshot.")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"The snapshot has version {version}, but version {SNAPSHOT_VERSION} is required. Please create it again.")
+
+    view = memoryview(buffer)
+    sections = {}
+    for i in range(section_count):
+        name, type_code, count, offset = _SECTION_ENTRY.unpack_from(buffer, _HEADER.size + i * _SECTION_ENTRY.size)
+        type_code = type_code.decode("ascii")
+        size = count * array(type_code).itemsize
+        if offset + size > len(buffer):
+            raise ValueError("The snapshot is truncated.")
+
+        data = view[offset:offset + size]
+        if sys.byteorder == "big" and array(type_code).itemsize > 1:
+            swapped = array(type_code, data.tobytes())
+            swapped.byteswap()
+            data = memoryview(swapped.tobytes())
+        sections[name.rstrip(b"\0").decode("ascii")] = data.cast(type_code)
+    return sections
+
+class SnapshotContent:
+    """
+    Creates the objects of a TARA from the sections of a snapshot.
+    """
+
+    def __init__(self, sections: dict[str, memoryview]):
+        self.sections = sections
+        self._string_offsets = sections["string_offsets"]
+        self._string_data = sections["string_data"]
+
+    def get_string(self, index: int) -> str:
+        if index == NONE:
+            return None
+        return bytes(self._string_data[self._string_offsets[index]:self._string_offsets[index + 1]]).decode("utf-8")
+
+    def get_strings(self) -> list[str]:
+        return [self.get_string(index) for index in range(len(self._string_offsets) - 1)]
+
+    def to_tara(self, object_store: ObjectStore, lazy: bool = False) -> Tara:
+        """
+        Creates all objects of the TARA and registers them in the object store.
+
+        :param lazy: If True, the attack trees are LazyAttackTrees on the sections instead of being created up front.
+        """
+        tara = Tara()
+        tara.assumptions = self.get_assumptions()
+        tara.damage_scenarios = self.get_damage_scenarios()
+        tara.assets = self.get_assets()
+        tara.security_controls = self.get_security_controls()
+        if lazy:
+            forest = MappedAttackForest(self)
+            tara.attack_trees = [LazyAttackTree(forest, tree_index, object_store) for tree_index in range(len(forest.tree_ids))]
+        else:
+            tara.attack_trees = self.get_forest().to_attack_trees(object_store)
+
+        for objects in [tara.assumptions, tara.damage_scenarios, tara.assets, tara.attack_trees, tara.security_controls]:
+            for obj in objects:
+                object_store.add(obj)
+        return tara
+
+    def get_assumptions(self) -> list[Assumption]:
+        values = self.sections["assumptions"]
+        assumptions = []
+        for i in range(0, len(values), 4):
+            assumption = Assumption()
+            assumption.id, assumption.name, assumption.security_claim, assumption.comment = (self.get_string(index) for index in values[i:i + 4])
+            assumptions.append(assumption)
+        return assumptions
+
+    def get_damage_scenarios(self) -> list[DamageScenario]:
+        values = self.sections["damage_scenarios"]
+        damage_scenarios = []
+        for i in range(0, len(values), 8):
+            damage_scenario = DamageScenario()
+            damage_scenario.id, damage_scenario.name, damage_scenario.reasoning, damage_scenario.comment = (self.get_string(index) for index in values[i:i + 4])
+            damage_scenario.impacts = {category: Impact(value) for category, value in zip(_IMPACT_CATEGORIES, values[i + 4:i + 8])}
+            damage_scenarios.append(damage_scenario)
+        return damage_scenarios
+
+    def get_assets(self) -> list[Asset]:
+        values = self.sections["assets"]
+        start = self.sections["asset_damage_scenario_start"]
+        damage_scenario_ids = self.sections["asset_damage_scenarios"]
+        assets = []
+        for asset_index, i in enumerate(range(0, len(values), 4)):
+            asset = Asset()
+            asset.id, asset.name, asset.description, asset.reasoning = (self.get_string(index) for index in values[i:i + 4])
+            for property_index, security_property in enumerate(_SECURITY_PROPERTIES):
+                range_index = asset_index * len(_SECURITY_PROPERTIES) + property_index
+                asset.damage_scenarios[security_property] = [self.get_string(index) for index in damage_scenario_ids[start[range_index]:start[range_index + 1]]]
+            assets.append(asset)
+        return assets
+
+    def get_security_controls(self) -> list[SecurityControl]:
+        values = self.sections["security_controls"]
+        controls = []
+        for i in range(0, len(values), 4):
+            control = SecurityControl()
+            control.id, control.name, control.security_goal = (self.get_string(index) for index in values[i:i + 3])
+            control.is_active = values[i + 3] == 1
+            controls.append(control)
+        return controls
+
+    def get_forest(self) -> FlatAttackForest:
+        """
+        Returns the flat forest of all attack trees.
+        """
+        forest = FlatAttackForest()
+        for string in self.get_strings():
+            forest.intern(string)
+        forest.tree_ids = [self.get_string(index) for index in self.sections["tree_ids"]]
+        forest._tree_indexes = {tree_id: tree_index for tree_index, tree_id in enumerate(forest.tree_ids)}
+        for name, type_code in _FOREST_ARRAYS.items():
+            setattr(forest, name, array(type_code, self.sections[name]))
+        return forest
+
+class MappedAttackForest(FlatAttackForest):
+    """
+    A read-only flat forest whose node arrays are the sections of a snapshot, e.g. views into a
+    memory-mapped file. Only the tree IDs are decoded up front, other strings when they are requested.
+    """
+
+    def __init__(self, content: SnapshotContent):
+        super().__init__()
+        self._content = content
+        self.tree_ids = [content.get_string(index) for index in content.sections["tree_ids"]]
+        self._tree_indexes = {tree_id: tree_index for tree_index, tree_id in enumerate(self.tree_ids)}
+        for name in _FOREST_ARRAYS:
+            setattr(self, name, content.sections[name])
+
+    def intern(self, string: str) -> int:
+        raise TypeError("A mapped attack forest can not be changed.")
+
+    def get_string(self, index: int) -> str:
+        return self._content.get_string(index)
+
+def _write_sections(file_path: str, sections: dict[str, array]) -> None:
+    offset = _HEADER.size + len(sections) * _SECTION_ENTRY.size
+    entries = []
+    for name, data in sections.items():
+        if len(name) > 32:
+            raise ValueError(f"The section name {name} is too long.")
+        offset = _align(offset)
+        entries.append(_SECTION_ENTRY.pack(name.encode("ascii"), data.typecode.encode("ascii"), len(data), offset))
+        offset += len(data) * data.itemsize
+
+    with open(file_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, SNAPSHOT_VERSION, len(sections)))
+        for entry in entries:
+            f.write(entry)
+        for data in sections.values():
+            f.write(b"\0" * (_align(f.tell()) - f.tell()))
+            if sys.byteorder == "big" and data.itemsize > 1:
+                data = array(data.typecode, data)
+                data.byteswap()
+            data.tofile(f)
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
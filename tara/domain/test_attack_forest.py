@@ -0,0 +1,157 @@
+import unittest
+from tara.domain.feasibility import *
+from tara.domain.attack_forest import AttackForest
+from tara.domain.util_attack_tree_test_case import AttackTreeTestCase
+
+class TestAttackForest(unittest.TestCase):
+    def setUp(self):
+        self.t = AttackTreeTestCase()
+        self.c1 = self.t.register_control("C-1", True)
+
+        tree = """# ATT-1
+
+| Attack Tree                       | Node | ET  | Ex  | Kn  | WoO | Eq  | Reasoning   | Control | Comment   |
+| --------------------------------- | ---- | --- | --- | --- | --- | --- | ----------- | ------- | --------- |
+| Root Threat                       | AND  |     |     |     |     |     |             |         |           |
+| -- [Technical Tree](./TAT-1.md)   | REF  |     |     |     |     |     |             | C-1     |           |
+| -- [Technical Tree](./TAT-1.md)   | REF  |     |     |     |     |     |             |         |           |
+"""
+
+        technical_tree = """# TAT-1
+
+| Attack Tree | Node | ET  | Ex  | Kn  | WoO | Eq  | Reasoning   | Control | Comment   |
+| ----------- | ---- | --- | --- | --- | --- | --- | ----------- | ------- | --------- |
+| Threat 1    |      | 1m  | P   | R   | E   | SP  |             |         |           |
+"""
+
+        circ_c1 = """# CIRC_C-1
+
+| Attack Tree         | Node | ET  | Ex  | Kn  | WoO | Eq  | Reasoning   | Control | Comment   |
+| ------------------- | ---- | --- | --- | --- | --- | --- | ----------- | ------- | --------- |
+| Circumvent Threat 1 |      | 6m  | E   | P   | D   | ST  |             |         |           |
+"""
+
+        self.tree = self.t.parse_attack_tree(tree, "ATT-1")
+        self.technical_tree = self.t.parse_attack_tree(technical_tree, "TAT-1")
+        self.circ_c1 = self.t.parse_attack_tree(circ_c1, "CIRC_C-1")
+
+    def test_referenced_trees_are_evaluated_first(self):
+        forest = AttackForest([self.tree, self.technical_tree, self.circ_c1])
+
+        self.assertEqual(forest.dependencies["ATT-1"], ["TAT-1", "CIRC_C-1"])
+        self.assertEqual(forest.evaluation_order, ["TAT-1", "CIRC_C-1", "ATT-1"])
+
+    def test_the_forest_evaluates_all_trees_in_both_modes(self):
+        forest = AttackForest([self.tree, self.technical_tree, self.circ_c1])
+
+        # Act
+        residual_feasibilities = forest.evaluate()
+        initial_feasibilities = forest.evaluate(without_controls=True)
+
+        # Assert
+        self.assertEqual(self.t.logger.get_errors(), [])
+
+        technical_feasibility = Feasibility(ElapsedTime.OneMonth, Expertise.Proficient, Knowledge.Restricted, WindowOfOpportunity.Easy, Equipment.Specialized)
+        self.assertEqual(initial_feasibilities["ATT-1"], technical_feasibility)
+        self.assertEqual(residual_feasibilities["ATT-1"], technical_feasibility.and_feasibility(self.circ_c1.get_feasibility()))
+        self.assertEqual(forest.get_feasibility("TAT-1"), technical_feasibility)
+
+    def test_circular_references_are_rejected(self):
+        circular_tree = """# TAT-2
+
+| Attack Tree                   | Node | ET  | Ex  | Kn  | WoO | Eq  | Reasoning   | Control | Comment   |
+| ----------------------------- | ---- | --- | --- | --- | --- | --- | ----------- | ------- | --------- |
+| Root Threat                   | OR   |     |     |     |     |     |             |         |           |
+| -- [Other Tree](./TAT-3.md)   | REF  |     |     |     |     |     |             |         |           |
+"""
+        other_tree = """# TAT-3
+
+| Attack Tree                   | Node | ET  | Ex  | Kn  | WoO | Eq  | Reasoning   | Control | Comment   |
+| ----------------------------- | ---- | --- | --- | --- | --- | --- | ----------- | ------- | --------- |
+| Root Threat                   | OR   |     |     |     |     |     |             |         |           |
+| -- [Other Tree](./TAT-2.md)   | REF  |     |     |     |     |     |             |         |           |
+"""
+        tat_2 = self.t.parse_attack_tree(circular_tree, "TAT-2")
+        tat_3 = self.t.parse_attack_tree(other_tree, "TAT-3")
+
+        forest = AttackForest([self.tree, tat_2, tat_3])
+
+        self.assertEqual(forest.cycles, [["TAT-2", "TAT-3"]])
+        with self.assertRaises(ValueError):
+            forest.evaluate()
+
+    def test_self_references_are_cycles(self):
+        self_referencing_tree = """# TAT-2
+
+| Attack Tree                   | Node | ET  | Ex  | Kn  | WoO | Eq  | Reasoning   | Control | Comment   |
+| ----------------------------- | ---- | --- | --- | --- | --- | --- | ----------- | ------- | --------- |
+| Root Threat                   | OR   |     |     |     |     |     |             |         |           |
+| -- [Same Tree](./TAT-2.md)    | REF  |     |     |     |     |     |             |         |           |
+"""
+        tat_2 = self.t.parse_attack_tree(self_referencing_tree, "TAT-2")
+
+        forest = AttackForest([self.tree, self.technical_tree, self.circ_c1, tat_2])
+
+        self.assertEqual(forest.cycles, [["TAT-2"]])
+
+    def test_switching_a_control_re_evaluates_the_dependent_trees(self):
+        forest = AttackForest([self.tree, self.technical_tree, self.circ_c1], [self.c1])
+        initial_feasibilities = dict(forest.evaluate(without_controls=True))
+        technical_root = self.technical_tree.root_node
+
+        # Act
+        affected_tree_ids = forest.set_control_active("C-1", False)
+
+        # Assert
+        self.assertEqual(affected_tree_ids, ["ATT-1"])
+        self.assertFalse(self.t.object_store.get("C-1").is_active)
+        self.assertEqual(forest.get_feasibility("ATT-1"), initial_feasibilities["ATT-1"])
+        self.assertEqual(forest.evaluate(without_controls=True), initial_feasibilities)
+        # the referenced tree does not depend on the control and keeps its cached feasibility
+        self.assertIn(False, technical_root.cached_feasibility)
+
+        # Act
+        forest.set_control_active("C-1", True)
+
+        # Assert
+        self.assertEqual(forest.get_feasibility("ATT-1"), initial_feasibilities["ATT-1"].and_feasibility(self.circ_c1.get_feasibility()))
+
+    def test_changes_of_circumvent_trees_propagate_to_the_controlled_nodes(self):
+        c2 = self.t.register_control("C-2", True)
+        circ_c2 = """# CIRC_C-2
+
+| Attack Tree         | Node | ET  | Ex  | Kn  | WoO | Eq  | Reasoning   | Control | Comment   |
+| ------------------- | ---- | --- | --- | --- | --- | --- | ----------- | ------- | --------- |
+| Circumvent Threat 2 |      | >3y | ME  | SC  | D   | MB  |             |         |           |
+"""
+        circ_c2 = self.t.parse_attack_tree(circ_c2, "CIRC_C-2")
+        self.circ_c1.root_node.security_control_ids = ["C-2"]
+        forest = AttackForest([self.tree, self.technical_tree, self.circ_c1, circ_c2], [self.c1, c2])
+        forest.evaluate()
+
+        # Act
+        affected_tree_ids = forest.set_control_active("C-2", False)
+
+        # Assert
+        self.assertEqual(affected_tree_ids, ["CIRC_C-1", "ATT-1"])
+        self.assertEqual(len(forest.get_dependent_nodes("C-2")), 3)
+        self.assertEqual(forest.get_feasibility("ATT-1"), self.technical_tree.get_feasibility().and_feasibility(self.circ_c1.get_feasibility()))
+        self.assertEqual(self.circ_c1.get_feasibility(), self.circ_c1.get_feasibility(without_controls=True))
+
+    def test_controls_can_be_switched_in_a_forest_without_trees(self):
+        forest = AttackForest([], [self.c1])
+
+        # Act
+        affected_tree_ids = forest.set_control_active("C-1", False)
+
+        # Assert
+        self.assertEqual(affected_tree_ids, [])
+        self.assertFalse(self.c1.is_active)
+        self.assertEqual(forest.get_dependent_nodes("C-1"), [])
+        self.assertEqual(forest.evaluate(), {})
+
+    def test_unknown_controls_are_rejected(self):
+        forest = AttackForest([self.tree, self.technical_tree, self.circ_c1], [self.c1])
+
+        with self.assertRaises(ValueError):
+            forest.set_control_active("C-3", False)
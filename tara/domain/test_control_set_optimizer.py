@@ -0,0 +1,154 @@
+import unittest, os
+from tara.domain.risk import RiskLevel
+from tara.domain.security_property import SecurityProperty
+from tara.domain.what_if_analysis import WhatIfAnalysis
+from tara.domain.control_set_optimizer import ControlSetOptimizer, read_control_costs
+from tara.domain.test_tara_report_generator import TestCase
+from tara.domain.file_stubs import FileType
+from tara.utilities.file_reader import MockFileReader
+from tara.utilities.error_logger import MemoryErrorLogger
+
+class TestControlSetOptimizer(unittest.TestCase):
+    def setUp(self):
+        self.t = TestCase()
+        self.tara = self.t.parser.parse(self.t.directory)
+        self.assertEqual(self.t.logger.errors, [])
+
+    def test_the_smallest_control_set_meeting_the_target_is_found(self):
+        optimizer = ControlSetOptimizer(self.tara)
+
+        self.assertEqual(optimizer.optimize(RiskLevel.High), [])
+        self.assertEqual(optimizer.optimize(RiskLevel.Medium), ["C-1"])
+        self.assertTrue(all(control.is_active for control in self.tara.security_controls))
+
+    def test_unreachable_targets_have_no_solution(self):
+        optimizer = ControlSetOptimizer(self.tara)
+
+        self.assertIsNone(optimizer.optimize(RiskLevel.Low))
+
+    def test_unreachable_targets_are_recognized_without_a_search(self):
+        t = TestCase()
+        control_count = 20
+        t.mock_reader.setup_file(os.path.join(t.directory, FileType.to_path(FileType.ASSETS)),
+"""# Assets
+
+| ID  | Name    | Availability | Integrity | Confidentiality | Reasoning   | Description   |
+| --- | ------- | ------------ | --------- | --------------- | ----------- | ------------- |
+| A-1 | Asset 1 |              | DS-1      |                 | Reasoning 1 | Description 1 |
+""")
+        t.mock_reader.setup_file(os.path.join(t.directory, FileType.to_path(FileType.CONTROLS)),
+"""# Controls
+
+| ID  | Name      | Security Goal | Active |
+| --- | --------- | ------------- | ------ |
+""" + "".join(f"| C-{i} | Control {i} | Goal-1 | x |\n" for i in range(1, control_count + 1)))
+        t.mock_reader.unset_files_in_directory(os.path.join(t.directory, "AttackTrees"))
+        header = """# {0}
+
+| Attack Tree | Node | ET  | Ex  | Kn  | WoO | Eq  | Reasoning | Control | Comment |
+| ----------- | ---- | --- | --- | --- | --- | --- | --------- | ------- | ------- |
+"""
+        # every control makes one attack harder, but the uncontrolled attack stays easy
+        attack_trees = {"AT_A-1_MAN": "| Manipulation of Asset 1 | OR | | | | | | | | |\n"
+                                      "| -- Uncontrolled attack | LEAF | 1w | L | P | U | ST | | | |\n"
+                                      + "".join(f"| -- Attack {i} | LEAF | 1w | L | P | U | ST | | C-{i} | |\n" for i in range(1, control_count + 1))}
+        for i in range(1, control_count + 1):
+            attack_trees[f"CIRC_C-{i}"] = f"| Circumvent Control {i} | LEAF | >3y | ME | SC | D | MB | | | |\n"
+        for tree_id, rows in attack_trees.items():
+            t.mock_reader.setup_file(os.path.join(t.directory, "AttackTrees", f"{tree_id}.md"), header.format(tree_id) + rows)
+        tara = t.parser.parse(t.directory)
+        self.assertEqual(t.logger.errors, [])
+        logger = MemoryErrorLogger()
+        optimizer = ControlSetOptimizer(tara, logger=logger)
+        self.assertEqual(len(optimizer.control_ids), control_count)
+
+        # Act
+        control_ids = optimizer.optimize(RiskLevel.Low)
+
+        # Assert
+        # a search over all 2^20 control sets would not finish, and it was not stopped by the limit either
+        self.assertIsNone(control_ids)
+        self.assertEqual(logger.warnings, [])
+
+    def test_the_search_stops_after_the_maximum_number_of_evaluations(self):
+        logger = MemoryErrorLogger()
+        # C-2 is cheaper than C-1, so the sets with C-2 are searched after the greedy solution
+        optimizer = ControlSetOptimizer(self.tara, {"C-1": 3, "C-2": 1}, logger, max_evaluations=1)
+
+        # Act
+        control_ids = optimizer.optimize(RiskLevel.Medium)
+
+        # Assert
+        # the greedy solution is the best set found so far
+        self.assertEqual(control_ids, ["C-1"])
+        self.assertEqual(len(logger.warnings), 1)
+
+    def test_the_cheapest_control_set_is_found(self):
+        # only the manipulation of asset 2 which is controlled by C-1 and C-2
+        self.tara.assets = [self.tara.assets[1]]
+        self.tara.assets[0].damage_scenarios[SecurityProperty.Confidentiality] = []
+
+        self.assertEqual(ControlSetOptimizer(self.tara, {"C-1": 1, "C-2": 5}).optimize(RiskLevel.Low), ["C-1"])
+        self.assertEqual(ControlSetOptimizer(self.tara, {"C-1": 5, "C-2": 1}).optimize(RiskLevel.Low), ["C-2"])
+        self.assertEqual(ControlSetOptimizer(self.tara, {"C-1": 1, "C-2": 5}).optimize(RiskLevel.VeryLow), ["C-2"])
+
+    def test_controls_raising_a_risk_are_left_out(self):
+        t = TestCase()
+        t.mock_reader.setup_file(os.path.join(t.directory, FileType.to_path(FileType.ASSETS)),
+"""# Assets
+
+| ID  | Name    | Availability | Integrity | Confidentiality | Reasoning   | Description   |
+| --- | ------- | ------------ | --------- | --------------- | ----------- | ------------- |
+| A-1 | Asset 1 |              | DS-1      |                 | Reasoning 1 | Description 1 |
+| A-2 | Asset 2 |              | DS-1      |                 | Reasoning 2 | Description 2 |
+""")
+        t.mock_reader.unset_files_in_directory(os.path.join(t.directory, "AttackTrees"))
+        header = """# {0}
+
+| Attack Tree | Node | ET  | Ex  | Kn  | WoO | Eq  | Reasoning | Control | Comment |
+| ----------- | ---- | --- | --- | --- | --- | --- | --------- | ------- | ------- |
+"""
+        attack_trees = {
+            # C-1 makes the expert attack harder, so the OR switches to the long attack, which adds nothing to the long preparation
+            "AT_A-1_MAN": """| Manipulation of Asset 1 | AND  |     |     |     |     |     |           |         |         |
+| -- Attack               | OR   |     |     |     |     |     |           |         |         |
+| ---- Expert attack      | LEAF | 1w  | ME  | P   | U   | ST  |           | C-1     |         |
+| ---- Long attack        | LEAF | >3y | L   | P   | U   | ST  |           |         |         |
+| -- Long preparation     | LEAF | >3y | L   | P   | U   | ST  |           |         |         |
+""",
+            "AT_A-2_MAN": """| Manipulation of Asset 2 | LEAF | >3y | L   | P   | U   | ST  |           | C-2     |         |
+""",
+            "CIRC_C-1": """| Circumvent Control 1 | LEAF | 1w  | L   | SC  | U   | MB  |           |         |         |
+""",
+            "CIRC_C-2": """| Circumvent Control 2 | LEAF | 1w  | ME  | P   | U   | ST  |           |         |         |
+""",
+        }
+        for tree_id, rows in attack_trees.items():
+            t.mock_reader.setup_file(os.path.join(t.directory, "AttackTrees", f"{tree_id}.md"), header.format(tree_id) + rows)
+        tara = t.parser.parse(t.directory)
+        self.assertEqual(t.logger.errors, [])
+        optimizer = ControlSetOptimizer(tara)
+
+        # Act
+        control_ids = optimizer.optimize(RiskLevel.Low)
+
+        # Assert
+        # with all controls the first threat scenario misses the target, but C-2 alone meets it
+        self.assertEqual(WhatIfAnalysis(tara).evaluate([{"C-1", "C-2"}]), [[RiskLevel.High], [RiskLevel.Low]])
+        self.assertEqual(control_ids, ["C-2"])
+
+    def test_control_costs_can_be_read_from_a_table(self):
+        reader = MockFileReader()
+        reader.setup_file("costs.md", """# Control Costs
+
+| ID  | Cost |
+| --- | ---- |
+| C-1 | 2.5  |
+| C-2 | abc  |
+""")
+        logger = MemoryErrorLogger()
+
+        costs = read_control_costs(reader, "costs.md", logger)
+
+        self.assertEqual(costs, {"C-1": 2.5})
+        self.assertEqual(len(logger.errors), 1)
@@ -0,0 +1,59 @@
+import unittest
+from tara.domain import evaluation_counters
+from tara.domain.attack_forest import AttackForest
+from tara.domain.attack_tree import AttackTreeReferenceNode
+from tara.domain.test_tara_report_generator import TestCase
+
+class TestEvaluationCounters(unittest.TestCase):
+    def setUp(self):
+        t = TestCase()
+        self.tara = t.parser.parse(t.directory)
+        self.assertEqual(t.logger.errors, [])
+
+    def tearDown(self):
+        evaluation_counters.disable()
+
+    def test_each_node_is_evaluated_once_per_mode(self):
+        counters = evaluation_counters.enable()
+        forest = AttackForest(self.tara.attack_trees)
+        nodes = [node for tree in self.tara.attack_trees for node in tree.get_nodes()]
+
+        # Act
+        forest.evaluate(without_controls=True)
+
+        # Assert
+        self.assertEqual(counters.get_evaluation_count(), len(nodes))
+        self.assertEqual(counters.circumvent_lookups, {})
+        self.assertEqual(counters.reference_lookups, len([node for node in nodes if isinstance(node, AttackTreeReferenceNode)]))
+        self.assertEqual(counters.get_evaluations_per_tree(self.tara.attack_trees), {tree.id: len(tree.get_nodes()) for tree in self.tara.attack_trees})
+
+        # after invalidating, all nodes are evaluated again
+        forest.invalidate_cache()
+        forest.evaluate(without_controls=True)
+        self.assertEqual(counters.get_evaluation_count(), 2 * len(nodes))
+
+        # an evaluated tree is answered from the cache
+        hits = counters.cache_hits
+        self.tara.attack_trees[0].get_feasibility(without_controls=True)
+        self.assertEqual(counters.get_evaluation_count(), 2 * len(nodes))
+        self.assertEqual(counters.cache_hits, hits + 1)
+
+    def test_circumvent_lookups_are_counted_per_control(self):
+        counters = evaluation_counters.enable()
+
+        # Act
+        AttackForest(self.tara.attack_trees).evaluate()
+
+        # Assert
+        self.assertEqual(set(counters.circumvent_lookups), {control.id for control in self.tara.security_controls if control.is_active})
+        self.assertGreater(counters.object_store_gets, 0)
+        self.assertIn("CIRC lookups", counters.format_summary(self.tara.attack_trees))
+
+    def test_nothing_is_counted_while_disabled(self):
+        counters = evaluation_counters.enable()
+        evaluation_counters.disable()
+
+        AttackForest(self.tara.attack_trees).evaluate()
+
+        self.assertEqual(counters.get_evaluation_count(), 0)
+        self.assertEqual(counters.object_store_gets, 0)
@@ -1,3 +1,4 @@
+import sys
 import unittest
 
 from tara.domain.feasibility import *
@@ -21,12 +22,12 @@ class TestFeasibilityCalculation(unittest.TestCase):
         for elapsed_time, expertise, knowledge, window_of_opportunity, equipment, expected_level, expected_score in border_test_cases:
             with self.subTest(elapsed_time=elapsed_time, expertise=expertise, knowledge=knowledge,
                               window_of_opportunity=window_of_opportunity, equipment=equipment):
-                feasibility = Feasibility()
-                feasibility.time = elapsed_time
-                feasibility.expertise = expertise
-                feasibility.knowledge = knowledge
-                feasibility.window_of_opportunity = window_of_opportunity
-                feasibility.equipment = equipment
+                feasibility = Feasibility(
+                    time=elapsed_time,
+                    expertise=expertise,
+                    knowledge=knowledge,
+                    window_of_opportunity=window_of_opportunity,
+                    equipment=equipment)
                 
                 # Act
                 score = feasibility.calculate_feasibility_score()
@@ -38,19 +39,19 @@ class TestFeasibilityCalculation(unittest.TestCase):
 
     def test_applying_OR_to_feasibilities_returns_the_feasibility_with_the_lowest_score(self):
         # Arrange
-        medium_feasibility = Feasibility()
-        medium_feasibility.time = ElapsedTime.SixMonths
-        medium_feasibility.expertise = Expertise.Proficient
-        medium_feasibility.knowledge = Knowledge.Restricted
-        medium_feasibility.window_of_opportunity = WindowOfOpportunity.Moderate
-        medium_feasibility.equipment = Equipment.Specialized
+        medium_feasibility = Feasibility(
+            time=ElapsedTime.SixMonths,
+            expertise=Expertise.Proficient,
+            knowledge=Knowledge.Restricted,
+            window_of_opportunity=WindowOfOpportunity.Moderate,
+            equipment=Equipment.Specialized)
         
-        easier_feasibility = Feasibility()
-        easier_feasibility.time = ElapsedTime.SixMonths
-        easier_feasibility.expertise = Expertise.Proficient
-        easier_feasibility.knowledge = Knowledge.Restricted
-        easier_feasibility.window_of_opportunity = WindowOfOpportunity.Easy
-        easier_feasibility.equipment = Equipment.Specialized
+        easier_feasibility = Feasibility(
+            time=ElapsedTime.SixMonths,
+            expertise=Expertise.Proficient,
+            knowledge=Knowledge.Restricted,
+            window_of_opportunity=WindowOfOpportunity.Easy,
+            equipment=Equipment.Specialized)
         
         # Act
         combined_feasibility = medium_feasibility.or_feasibility(easier_feasibility)
@@ -62,19 +63,19 @@ class TestFeasibilityCalculation(unittest.TestCase):
 
     def test_applying_AND_to_feasibilities_returns_a_feasibility_with_per_field_max(self):
         # Arrange
-        feasibility_1 = Feasibility()
-        feasibility_1.time = ElapsedTime.SixMonths
-        feasibility_1.expertise = Expertise.Proficient
-        feasibility_1.knowledge = Knowledge.Restricted
-        feasibility_1.window_of_opportunity = WindowOfOpportunity.Moderate
-        feasibility_1.equipment = Equipment.Specialized
+        feasibility_1 = Feasibility(
+            time=ElapsedTime.SixMonths,
+            expertise=Expertise.Proficient,
+            knowledge=Knowledge.Restricted,
+            window_of_opportunity=WindowOfOpportunity.Moderate,
+            equipment=Equipment.Specialized)
         
-        feasibility_2 = Feasibility()
-        feasibility_2.time = ElapsedTime.ThreeYears
-        feasibility_2.expertise = Expertise.Layman
-        feasibility_2.knowledge = Knowledge.Confidential
-        feasibility_2.window_of_opportunity = WindowOfOpportunity.Difficult
-        feasibility_2.equipment = Equipment.Bespoke
+        feasibility_2 = Feasibility(
+            time=ElapsedTime.ThreeYears,
+            expertise=Expertise.Layman,
+            knowledge=Knowledge.Confidential,
+            window_of_opportunity=WindowOfOpportunity.Difficult,
+            equipment=Equipment.Bespoke)
         
         # Act
         combined_feasibility = feasibility_1.and_feasibility(feasibility_2)
@@ -89,6 +90,43 @@ class TestFeasibilityCalculation(unittest.TestCase):
 
         self.assertEqual(other_combined_feasibility, combined_feasibility)       
 
+    def test_combine_tables_match_the_per_rating_definition(self):
+        for left_id in range(0, 1280, 37):
+            left = Feasibility.from_vector_id(left_id)
+            for right_id in range(1280):
+                right = Feasibility.from_vector_id(right_id)
+
+                expected_and = Feasibility(max(left.time, right.time),
+                                           max(left.expertise, right.expertise),
+                                           max(left.knowledge, right.knowledge),
+                                           max(left.window_of_opportunity, right.window_of_opportunity),
+                                           max(left.equipment, right.equipment))
+                expected_or = left if left.calculate_feasibility_score() <= right.calculate_feasibility_score() else right
+
+                self.assertIs(left.and_feasibility(right), expected_and)
+                self.assertIs(left.or_feasibility(right), expected_or)
+
+    def test_feasibilities_with_equal_ratings_are_the_same_object(self):
+        # Arrange
+        feasibility_1 = Feasibility(ElapsedTime.SixMonths, Expertise.Proficient, Knowledge.Restricted, WindowOfOpportunity.Moderate, Equipment.Specialized)
+        feasibility_2 = Feasibility(ElapsedTime.OneWeek, Expertise.Expert, Knowledge.Restricted, WindowOfOpportunity.Easy, Equipment.Specialized)
+
+        # Act
+        combined_feasibility = feasibility_1.and_feasibility(feasibility_2)
+
+        # Assert
+        self.assertIs(combined_feasibility, Feasibility(ElapsedTime.SixMonths, Expertise.Expert, Knowledge.Restricted, WindowOfOpportunity.Moderate, Equipment.Specialized))
+        self.assertIs(Feasibility.from_vector_id(combined_feasibility.vector_id), combined_feasibility)
+        self.assertIs(feasibility_1.or_feasibility(feasibility_2), feasibility_2)
+
+    def test_feasibilities_are_immutable(self):
+        feasibility = Feasibility()
+
+        with self.assertRaises(AttributeError):
+            feasibility.time = ElapsedTime.ThreeYears
+
+        self.assertEqual(feasibility.time, ElapsedTime.OneWeek)
+
 class TestFeasibilityForAttackTrees(unittest.TestCase):
     def test_feasibility_of_a_whole_tree_is_calculated_correctly(self):
         attack_tree_description = """# ATT-1
@@ -122,12 +160,12 @@ class TestFeasibilityForAttackTrees(unittest.TestCase):
         # so the result contains the max values of the ratings of Threat 1 and Threat 4:
         self.assertEqual(t.logger.get_errors(), [])
 
-        expected_feasibility = Feasibility()
-        expected_feasibility.time = ElapsedTime.OneMonth
-        expected_feasibility.expertise = Expertise.Proficient
-        expected_feasibility.knowledge = Knowledge.Confidential
-        expected_feasibility.window_of_opportunity = WindowOfOpportunity.Easy
-        expected_feasibility.equipment = Equipment.Bespoke
+        expected_feasibility = Feasibility(
+            time=ElapsedTime.OneMonth,
+            expertise=Expertise.Proficient,
+            knowledge=Knowledge.Confidential,
+            window_of_opportunity=WindowOfOpportunity.Easy,
+            equipment=Equipment.Bespoke)
 
         self.assertEqual(feasibility, expected_feasibility)
 
@@ -161,12 +199,12 @@ class TestFeasibilityForAttackTrees(unittest.TestCase):
         # Assert
         self.assertEqual(t.logger.get_errors(), [])
 
-        expected_feasibility = Feasibility()
-        expected_feasibility.time = ElapsedTime.OneMonth
-        expected_feasibility.expertise = Expertise.Proficient
-        expected_feasibility.knowledge = Knowledge.Confidential
-        expected_feasibility.window_of_opportunity = WindowOfOpportunity.Easy
-        expected_feasibility.equipment = Equipment.Bespoke
+        expected_feasibility = Feasibility(
+            time=ElapsedTime.OneMonth,
+            expertise=Expertise.Proficient,
+            knowledge=Knowledge.Confidential,
+            window_of_opportunity=WindowOfOpportunity.Easy,
+            equipment=Equipment.Bespoke)
 
         self.assertEqual(feasibility, expected_feasibility)
 
@@ -208,12 +246,12 @@ class TestFeasibilityForAttackTrees(unittest.TestCase):
         self.assertEqual(t.logger.get_errors(), [])
 
         # Feasibility(Threat 1 with control) should be = Feasibility(Threat 1 without control) AND Feasibility(Circumvent Control 1)
-        expected_feasibility = Feasibility()
-        expected_feasibility.time = ElapsedTime.OneMonth
-        expected_feasibility.expertise = Expertise.Expert
-        expected_feasibility.knowledge = Knowledge.Restricted
-        expected_feasibility.window_of_opportunity = WindowOfOpportunity.Difficult
-        expected_feasibility.equipment = Equipment.Specialized
+        expected_feasibility = Feasibility(
+            time=ElapsedTime.OneMonth,
+            expertise=Expertise.Expert,
+            knowledge=Knowledge.Restricted,
+            window_of_opportunity=WindowOfOpportunity.Difficult,
+            equipment=Equipment.Specialized)
 
         self.assertEqual(feasibility, expected_feasibility)
 
@@ -255,12 +293,12 @@ class TestFeasibilityForAttackTrees(unittest.TestCase):
         self.assertEqual(t.logger.get_errors(), [])
 
         # Feasibility(Threat 1 with control) should be = Feasibility(Threat 1 without control) AND Feasibility(Circumvent Control 1)
-        expected_feasibility = Feasibility()
-        expected_feasibility.time = ElapsedTime.OneMonth
-        expected_feasibility.expertise = Expertise.Proficient
-        expected_feasibility.knowledge = Knowledge.Restricted
-        expected_feasibility.window_of_opportunity = WindowOfOpportunity.Easy
-        expected_feasibility.equipment = Equipment.Specialized
+        expected_feasibility = Feasibility(
+            time=ElapsedTime.OneMonth,
+            expertise=Expertise.Proficient,
+            knowledge=Knowledge.Restricted,
+            window_of_opportunity=WindowOfOpportunity.Easy,
+            equipment=Equipment.Specialized)
 
         self.assertEqual(feasibility, expected_feasibility)
 
@@ -310,12 +348,12 @@ class TestFeasibilityForAttackTrees(unittest.TestCase):
         self.assertEqual(t.logger.get_errors(), [])
 
         # Feasibility(Threat 1 with control) should be = Feasibility(Threat 1 without control) AND Feasibility(Circumvent Control 1) AND Feasibility(Circumvent Control 2)
-        expected_feasibility = Feasibility()
-        expected_feasibility.time = ElapsedTime.SixMonths
-        expected_feasibility.expertise = Expertise.Layman
-        expected_feasibility.knowledge = Knowledge.Public
-        expected_feasibility.window_of_opportunity = WindowOfOpportunity.Unlimited
-        expected_feasibility.equipment = Equipment.MultipleBespoke
+        expected_feasibility = Feasibility(
+            time=ElapsedTime.SixMonths,
+            expertise=Expertise.Layman,
+            knowledge=Knowledge.Public,
+            window_of_opportunity=WindowOfOpportunity.Unlimited,
+            equipment=Equipment.MultipleBespoke)
 
         self.assertEqual(feasibility, expected_feasibility)
 
@@ -359,12 +397,12 @@ class TestFeasibilityForAttackTrees(unittest.TestCase):
         self.assertEqual(t.logger.get_errors(), [])
 
         # Feasibility(Threat 1 with control) should be = Feasibility(Threat 1 without control) AND Feasibility(Circumvent Control 1) AND Feasibility(Circumvent Control 2)
-        expected_feasibility = Feasibility()
-        expected_feasibility.time = ElapsedTime.SixMonths
-        expected_feasibility.expertise = Expertise.Layman
-        expected_feasibility.knowledge = Knowledge.Public
-        expected_feasibility.window_of_opportunity = WindowOfOpportunity.Unlimited
-        expected_feasibility.equipment = Equipment.MultipleBespoke
+        expected_feasibility = Feasibility(
+            time=ElapsedTime.SixMonths,
+            expertise=Expertise.Layman,
+            knowledge=Knowledge.Public,
+            window_of_opportunity=WindowOfOpportunity.Unlimited,
+            equipment=Equipment.MultipleBespoke)
 
         self.assertEqual(feasibility, expected_feasibility)
 
@@ -427,12 +465,12 @@ class TestFeasibilityForAttackTrees(unittest.TestCase):
         self.assertEqual(t.logger.get_errors(), [])
 
         # Feasibility(Threat 1 with control) should be = Feasibility(Threat 1 without control) AND Feasibility(Circumvent Control 1)
-        expected_feasibility = Feasibility()
-        expected_feasibility.time = ElapsedTime.SixMonths
-        expected_feasibility.expertise = Expertise.Proficient
-        expected_feasibility.knowledge = Knowledge.Confidential
-        expected_feasibility.window_of_opportunity = WindowOfOpportunity.Easy
-        expected_feasibility.equipment = Equipment.MultipleBespoke
+        expected_feasibility = Feasibility(
+            time=ElapsedTime.SixMonths,
+            expertise=Expertise.Proficient,
+            knowledge=Knowledge.Confidential,
+            window_of_opportunity=WindowOfOpportunity.Easy,
+            equipment=Equipment.MultipleBespoke)
 
         self.assertEqual(feasibility, expected_feasibility)
 
@@ -468,12 +506,12 @@ class TestFeasibilityForAttackTrees(unittest.TestCase):
         self.assertEqual(t.logger.get_errors(), [])
 
         # The attack feasibility should be the same as if no control was applied
-        expected_feasibility = Feasibility()
-        expected_feasibility.time = ElapsedTime.OneMonth
-        expected_feasibility.expertise = Expertise.Proficient
-        expected_feasibility.knowledge = Knowledge.Restricted
-        expected_feasibility.window_of_opportunity = WindowOfOpportunity.Easy
-        expected_feasibility.equipment = Equipment.Specialized
+        expected_feasibility = Feasibility(
+            time=ElapsedTime.OneMonth,
+            expertise=Expertise.Proficient,
+            knowledge=Knowledge.Restricted,
+            window_of_opportunity=WindowOfOpportunity.Easy,
+            equipment=Equipment.Specialized)
 
         self.assertEqual(feasibility, expected_feasibility)
 
@@ -531,21 +569,94 @@ class TestFeasibilityForAttackTrees(unittest.TestCase):
         self.assertEqual(t.logger.get_errors(), [])
 
         # Feasibility(Threat 1 with control) should be = Feasibility(Threat 1 without control) AND Feasibility(Circumvent Control 1)
-        expected_feasibility_with_controls = Feasibility()
-        expected_feasibility_with_controls.time = ElapsedTime.SixMonths
-        expected_feasibility_with_controls.expertise = Expertise.MultipleExperts
-        expected_feasibility_with_controls.knowledge = Knowledge.Confidential
-        expected_feasibility_with_controls.window_of_opportunity = WindowOfOpportunity.Difficult
-        expected_feasibility_with_controls.equipment = Equipment.MultipleBespoke
+        expected_feasibility_with_controls = Feasibility(
+            time=ElapsedTime.SixMonths,
+            expertise=Expertise.MultipleExperts,
+            knowledge=Knowledge.Confidential,
+            window_of_opportunity=WindowOfOpportunity.Difficult,
+            equipment=Equipment.MultipleBespoke)
 
         self.assertEqual(feasibility_with_controls, expected_feasibility_with_controls)
 
         # Feasibility(Threat 1 without control) should be = Feasibility(Threat 1 without control) AND Feasibility(Circumvent Control 1 without control)
-        expected_feasibility_without_controls = Feasibility()
-        expected_feasibility_without_controls.time = ElapsedTime.OneWeek
-        expected_feasibility_without_controls.expertise = Expertise.Layman
-        expected_feasibility_without_controls.knowledge = Knowledge.Public
-        expected_feasibility_without_controls.window_of_opportunity = WindowOfOpportunity.Unlimited
-        expected_feasibility_without_controls.equipment = Equipment.Standard
-
-        self.assertEqual(feasibility_without_controls, expected_feasibility_without_controls)
\ No newline at end of file
+        expected_feasibility_without_controls = Feasibility(
+            time=ElapsedTime.OneWeek,
+            expertise=Expertise.Layman,
+            knowledge=Knowledge.Public,
+            window_of_opportunity=WindowOfOpportunity.Unlimited,
+            equipment=Equipment.Standard)
+
+        self.assertEqual(feasibility_without_controls, expected_feasibility_without_controls)
+
+    def test_deep_trees_and_reference_chains_do_not_exceed_the_recursion_limit(self):
+        t = AttackTreeTestCase()
+        depth = 3 * sys.getrecursionlimit()
+        leaf_feasibility = Feasibility(ElapsedTime.OneMonth, Expertise.Proficient, Knowledge.Restricted, WindowOfOpportunity.Easy, Equipment.Specialized)
+
+        # a chain of trees, each referencing the next one
+        for i in range(depth):
+            tree = AttackTree(f"TAT-{i}")
+            if i == depth - 1:
+                tree.root_node = AttackTreeLeafNode(leaf_feasibility, t.object_store)
+            else:
+                tree.root_node = AttackTreeReferenceNode(t.object_store)
+                tree.root_node.referenced_node_id = f"TAT-{i + 1}"
+            t.object_store.add(tree)
+
+        # a single tree with deeply nested AND nodes
+        deep_tree = AttackTree("ATT-1")
+        deep_tree.root_node = AttackTreeAndNode(t.object_store)
+        node = deep_tree.root_node
+        for _ in range(depth):
+            child = AttackTreeAndNode(t.object_store)
+            node.add_child(child)
+            node = child
+        node.add_child(AttackTreeLeafNode(leaf_feasibility, t.object_store))
+
+        # Act
+        chain_feasibility = t.object_store.get("TAT-0").get_feasibility()
+        deep_feasibility = deep_tree.get_feasibility()
+        resolved_tree = deep_tree.get_resolved_tree()
+        deep_tree.invalidate_cache()
+
+        # Assert
+        self.assertEqual(chain_feasibility, leaf_feasibility)
+        self.assertEqual(deep_feasibility, leaf_feasibility)
+        self.assertEqual(resolved_tree.root_node.feasibility, leaf_feasibility)
+        self.assertEqual(deep_tree.root_node.cached_feasibility, {})
+
+    def test_both_evaluation_modes_are_cached_separately(self):
+        t = AttackTreeTestCase()
+        
+        t.register_control("C-1", True)
+
+        tree = """# ATT-1
+
+| Attack Tree | Node | ET  | Ex  | Kn  | WoO | Eq  | Reasoning   | Control | Comment   |
+| ----------- | ---- | --- | --- | --- | --- | --- | ----------- | ------- | --------- |
+| Threat 1    | OR   |     |     |     |     |     |             |         |           |
+| -- Threat 2 |      | 1w  | L   | P   | U   | ST  |             | C-1     |           |
+"""
+
+        circ_c1 = """# CIRC_C-1
+
+| Attack Tree         | Node | ET  | Ex  | Kn  | WoO | Eq  | Reasoning   | Control | Comment   |
+| ------------------- | ---- | --- | --- | --- | --- | --- | ----------- | ------- | --------- |
+| Circumvent Threat 1 |      | 6m  | ME  | C   | D   | MB  |             |         |           |
+"""
+
+        tree_obj = t.parse_attack_tree(tree, "ATT-1")
+        circ_c1_obj = t.parse_attack_tree(circ_c1, "CIRC_C-1")
+
+        self.assertEqual(t.logger.get_errors(), [])
+
+        # Act
+        # Both modes are evaluated alternately without invalidating the cache in between
+        feasibility_with_controls = tree_obj.get_feasibility()
+        feasibility_without_controls = tree_obj.get_feasibility(without_controls=True)
+        feasibility_with_controls_again = tree_obj.get_feasibility()
+
+        # Assert
+        self.assertEqual(feasibility_with_controls, circ_c1_obj.get_feasibility())
+        self.assertEqual(feasibility_without_controls, Feasibility())
+        self.assertEqual(feasibility_with_controls_again, feasibility_with_controls)
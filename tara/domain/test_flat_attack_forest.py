@@ -0,0 +1,101 @@
+import unittest
+from tara.domain.feasibility import *
+from tara.domain.attack_forest import AttackForest
+from tara.domain.flat_attack_forest import FlatAttackForest, AND_NODE, OR_NODE, LEAF_NODE, REF_NODE, NONE
+from tara.domain.util_attack_tree_test_case import AttackTreeTestCase
+
+class TestFlatAttackForest(unittest.TestCase):
+    def setUp(self):
+        self.t = AttackTreeTestCase()
+        self.t.register_control("C-1", True)
+        self.t.register_control("C-2", False)
+
+        tree = """# ATT-1
+
+| Attack Tree                       | Node | ET  | Ex  | Kn  | WoO | Eq  | Reasoning   | Control | Comment   |
+| --------------------------------- | ---- | --- | --- | --- | --- | --- | ----------- | ------- | --------- |
+| Root Threat                       | AND  |     |     |     |     |     | Reasoning 0 |         | Comment 0 |
+| -- Threat 1                       | OR   |     |     |     |     |     | Reasoning 1 | C-2     | Comment 1 |
+| ---- Threat 2                     |      | 1w  | L   | C   | E   | B   | Reasoning 2 |         | Comment 2 |
+| ---- Threat 3                     |      | 1w  | L   | C   | D   | B   | Reasoning 3 | C-1     | Comment 3 |
+| -- [Technical Tree](./TAT-1.md)   | REF  |     |     |     |     |     | Reasoning 4 | C-1     | Comment 4 |
+"""
+
+        technical_tree = """# TAT-1
+
+| Attack Tree | Node | ET  | Ex  | Kn  | WoO | Eq  | Reasoning   | Control | Comment   |
+| ----------- | ---- | --- | --- | --- | --- | --- | ----------- | ------- | --------- |
+| Threat 5    |      | 1m  | P   | R   | E   | SP  |             |         |           |
+"""
+
+        circ_c1 = """# CIRC_C-1
+
+| Attack Tree         | Node | ET  | Ex  | Kn  | WoO | Eq  | Reasoning   | Control | Comment   |
+| ------------------- | ---- | --- | --- | --- | --- | --- | ----------- | ------- | --------- |
+| Circumvent Threat 1 |      | 6m  | E   | P   | D   | ST  |             |         |           |
+"""
+
+        circ_c2 = """# CIRC_C-2
+
+| Attack Tree         | Node | ET  | Ex  | Kn  | WoO | Eq  | Reasoning   | Control | Comment   |
+| ------------------- | ---- | --- | --- | --- | --- | --- | ----------- | ------- | --------- |
+| Circumvent Threat 2 |      | >3y | ME  | SC  | D   | MB  |             |         |           |
+"""
+
+        self.trees = [
+            self.t.parse_attack_tree(tree, "ATT-1"),
+            self.t.parse_attack_tree(technical_tree, "TAT-1"),
+            self.t.parse_attack_tree(circ_c1, "CIRC_C-1"),
+            self.t.parse_attack_tree(circ_c2, "CIRC_C-2"),
+        ]
+
+    def test_the_trees_are_stored_in_pre_order(self):
+        forest = FlatAttackForest.from_attack_trees(self.trees)
+
+        self.assertEqual(self.t.logger.get_errors(), [])
+        self.assertEqual(forest.tree_ids, ["ATT-1", "TAT-1", "CIRC_C-1", "CIRC_C-2"])
+        self.assertEqual(list(forest.tree_node_start), [0, 5, 6, 7, 8])
+
+        self.assertEqual(list(forest.node_type[0:5]), [AND_NODE, OR_NODE, LEAF_NODE, LEAF_NODE, REF_NODE])
+        self.assertEqual(list(forest.parent[0:5]), [NONE, 0, 1, 1, 0])
+        self.assertEqual(forest.get_children(0), [1, 4])
+        self.assertEqual(forest.get_children(1), [2, 3])
+        self.assertEqual([forest.get_string(i) for i in forest.name[0:5]], ["Root Threat", "Threat 1", "Threat 2", "Threat 3", "Technical Tree"])
+        self.assertEqual(forest.get_string(forest.reasoning[3]), "Reasoning 3")
+        self.assertEqual(forest.get_string(forest.referenced_tree[4]), "TAT-1")
+        self.assertEqual(forest.get_control_ids(1), ["C-2"])
+        self.assertEqual(forest.get_control_ids(2), [])
+        self.assertEqual(Feasibility.from_vector_id(forest.feasibility_id[5]), self.trees[1].get_feasibility())
+
+    def test_the_flat_evaluation_matches_the_attack_tree_evaluation(self):
+        forest = FlatAttackForest.from_attack_trees(self.trees)
+        attack_forest = AttackForest(self.trees)
+
+        for without_controls in [False, True]:
+            with self.subTest(without_controls=without_controls):
+                # Act
+                feasibilities = forest.evaluate_trees({"C-1"}, without_controls)
+
+                # Assert
+                self.assertEqual(feasibilities, attack_forest.evaluate(without_controls))
+
+    def test_the_evaluation_order_is_computed_once(self):
+        forest = FlatAttackForest.from_attack_trees(self.trees[:-1])
+        order = forest.get_evaluation_order()
+
+        # Act
+        forest.evaluate({"C-1"})
+
+        # Assert
+        self.assertIs(forest.get_evaluation_order(), order)
+
+        # adding a tree computes the order again
+        forest.add_tree(self.trees[-1])
+        self.assertEqual(sorted(forest.get_evaluation_order()), list(range(len(self.trees))))
+
+    def test_circular_references_are_rejected(self):
+        self.trees[1].root_node = self.trees[0].root_node.children[1]
+        forest = FlatAttackForest.from_attack_trees(self.trees)
+
+        with self.assertRaises(ValueError):
+            forest.evaluate(set())
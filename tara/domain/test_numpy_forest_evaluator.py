@@ -0,0 +1,80 @@
+import unittest
+from tara.domain.attack_forest import AttackForest
+from tara.domain.flat_attack_forest import FlatAttackForest
+from tara.domain.numpy_forest_evaluator import NumpyForestEvaluator, np
+from tara.domain.util_attack_tree_test_case import AttackTreeTestCase
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestNumpyForestEvaluator(unittest.TestCase):
+    def setUp(self):
+        self.t = AttackTreeTestCase()
+        self.t.register_control("C-1", True)
+        self.t.register_control("C-2", False)
+
+        tree = """# ATT-1
+
+| Attack Tree                       | Node | ET  | Ex  | Kn  | WoO | Eq  | Reasoning | Control | Comment |
+| --------------------------------- | ---- | --- | --- | --- | --- | --- | --------- | ------- | ------- |
+| Root Threat                       | OR   |     |     |     |     |     |           |         |         |
+| -- Threat 1                       | AND  |     |     |     |     |     |           | C-2     |         |
+| ---- Threat 2                     |      | 1w  | L   | C   | E   | B   |           |         |         |
+| ---- Threat 3                     |      | 1w  | L   | C   | D   | B   |           | C-1     |         |
+| -- Threat 4                       |      | 1m  | P   | R   | E   | SP  |           |         |         |
+| -- [Technical Tree](./TAT-1.md)   | REF  |     |     |     |     |     |           | C-1     |         |
+"""
+
+        technical_tree = """# TAT-1
+
+| Attack Tree | Node | ET  | Ex  | Kn  | WoO | Eq  | Reasoning | Control | Comment |
+| ----------- | ---- | --- | --- | --- | --- | --- | --------- | ------- | ------- |
+| Threat 5    |      | 1w  | P   | R   | E   | SP  |           |         |         |
+"""
+
+        circ_c1 = """# CIRC_C-1
+
+| Attack Tree         | Node | ET  | Ex  | Kn  | WoO | Eq  | Reasoning | Control | Comment |
+| ------------------- | ---- | --- | --- | --- | --- | --- | --------- | ------- | ------- |
+| Circumvent Threat 1 |      | 6m  | E   | P   | D   | ST  |           |         |         |
+"""
+
+        circ_c2 = """# CIRC_C-2
+
+| Attack Tree         | Node | ET  | Ex  | Kn  | WoO | Eq  | Reasoning | Control | Comment |
+| ------------------- | ---- | --- | --- | --- | --- | --- | --------- | ------- | ------- |
+| Circumvent Threat 2 |      | >3y | ME  | SC  | D   | MB  |           |         |         |
+"""
+
+        self.trees = [
+            self.t.parse_attack_tree(tree, "ATT-1"),
+            self.t.parse_attack_tree(technical_tree, "TAT-1"),
+            self.t.parse_attack_tree(circ_c1, "CIRC_C-1"),
+            self.t.parse_attack_tree(circ_c2, "CIRC_C-2"),
+        ]
+
+    def test_the_vectorized_evaluation_matches_the_attack_tree_evaluation(self):
+        evaluator = NumpyForestEvaluator(FlatAttackForest.from_attack_trees(self.trees))
+        attack_forest = AttackForest(self.trees)
+
+        self.assertEqual(self.t.logger.get_errors(), [])
+        for without_controls in [False, True]:
+            with self.subTest(without_controls=without_controls):
+                # Act
+                feasibilities = evaluator.evaluate_trees({"C-1"}, without_controls)
+
+                # Assert
+                self.assertEqual(feasibilities, attack_forest.evaluate(without_controls))
+
+    def test_the_evaluator_can_be_reused_for_other_active_controls(self):
+        evaluator = NumpyForestEvaluator(FlatAttackForest.from_attack_trees(self.trees))
+        flat_forest = evaluator.forest
+
+        for active_control_ids in [set(), {"C-1"}, {"C-2"}, {"C-1", "C-2"}]:
+            with self.subTest(active_control_ids=active_control_ids):
+                self.assertEqual(evaluator.evaluate_trees(active_control_ids), flat_forest.evaluate_trees(active_control_ids))
+
+    def test_missing_circumvent_trees_of_active_controls_are_reported(self):
+        evaluator = NumpyForestEvaluator(FlatAttackForest.from_attack_trees(self.trees[:2]))
+
+        self.assertEqual(evaluator.evaluate_trees(set()), FlatAttackForest.from_attack_trees(self.trees[:2]).evaluate_trees(set()))
+        with self.assertRaises(ValueError):
+            evaluator.evaluate({"C-1"})
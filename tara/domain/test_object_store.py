@@ -0,0 +1,60 @@
+import unittest
+from tara.domain.object_store import ObjectStore
+from tara.domain.asset import Asset
+from tara.domain.damage_scenario import DamageScenario
+from tara.domain.security_property import SecurityProperty
+from tara.domain.security_control import SecurityControl
+from tara.domain.attack_tree import AttackTree
+from tara.domain.util_attack_tree_test_case import AttackTreeTestCase
+from tara.utilities.error_logger import MemoryErrorLogger
+
+class TestObjectStore(unittest.TestCase):
+    def setUp(self):
+        self.t = AttackTreeTestCase()
+        self.t.register_control("C-1", True)
+        self.store = self.t.object_store
+
+        tree = """# AT_A-1_MAN
+
+| Attack Tree                       | Node | ET  | Ex  | Kn  | WoO | Eq  | Reasoning   | Control | Comment   |
+| --------------------------------- | ---- | --- | --- | --- | --- | --- | ----------- | ------- | --------- |
+| Root Threat                       | OR   |     |     |     |     |     |             |         |           |
+| -- [Technical Tree](./TAT-1.md)   | REF  |     |     |     |     |     |             | C-1     |           |
+| -- Threat 1                       |      | 1w  | L   | C   | E   | B   |             | C-1     |           |
+"""
+
+        technical_tree = """# TAT-1
+
+| Attack Tree | Node | ET  | Ex  | Kn  | WoO | Eq  | Reasoning   | Control | Comment   |
+| ----------- | ---- | --- | --- | --- | --- | --- | ----------- | ------- | --------- |
+| Threat 2    |      | 1m  | P   | R   | E   | SP  |             |         |           |
+"""
+        self.tree = self.t.parse_attack_tree(tree, "AT_A-1_MAN")
+        self.technical_tree = self.t.parse_attack_tree(technical_tree, "TAT-1")
+
+        damage_scenario = DamageScenario()
+        damage_scenario.id = "DS-1"
+        self.store.add(damage_scenario)
+
+        self.asset = Asset()
+        self.asset.id = "A-1"
+        self.asset.damage_scenarios[SecurityProperty.Integrity] = ["DS-1"]
+        self.asset.damage_scenarios[SecurityProperty.Availability] = ["DS-1"]
+        self.store.add(self.asset)
+
+    def test_objects_can_be_looked_up_by_type(self):
+        self.assertIs(self.store.get("DS-1", DamageScenario), self.store.get("DS-1"))
+        self.assertIsNone(self.store.get("DS-1", Asset))
+        self.assertIsNone(self.store.get("DS-2", DamageScenario))
+
+        self.assertEqual(self.store.get_all(AttackTree), [self.tree, self.technical_tree])
+        self.assertEqual([control.id for control in self.store.get_all(SecurityControl)], ["C-1"])
+        self.assertEqual(len(self.store.get_all(object)), 5)
+
+    def test_duplicate_ids_are_not_added(self):
+        store = ObjectStore(MemoryErrorLogger())
+        store.add(self.tree)
+        store.add(self.tree)
+
+        self.assertEqual(store.get_all(AttackTree), [self.tree])
+        self.assertEqual(len(store.logger.get_errors()), 1)
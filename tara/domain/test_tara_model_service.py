@@ -0,0 +1,73 @@
+import os
+import unittest
+from tara.domain.tara_model_service import TaraModelService
+from tara.domain.test_tara_report_generator import TestCase
+
+class TestTaraModelService(unittest.TestCase):
+    def setUp(self):
+        self.t = TestCase()
+        self.service = TaraModelService(self.t.mock_reader, self.t.directory)
+
+    def test_threat_scenario_risks(self):
+        # Act
+        status, threat_scenarios = self.service.handle("GET", "/threat-scenarios", None)
+
+        # Assert
+        self.assertEqual(status, 200)
+        self.assertEqual([threat_scenario["id"] for threat_scenario in threat_scenarios], ["TS-1", "TS-2", "TS-3", "TS-4"])
+        self.assertEqual([threat_scenario["initial_risk"] for threat_scenario in threat_scenarios], ["High", "Medium", "Medium", "Medium"])
+        self.assertEqual([threat_scenario["residual_risk"] for threat_scenario in threat_scenarios], ["Medium", "Medium", "VeryLow", "Medium"])
+        self.assertEqual(self.service.handle("GET", "/threat-scenarios/TS-3", None), (200, threat_scenarios[2]))
+
+    def test_a_single_threat_scenario_equals_its_entry_in_the_list(self):
+        # the single threat scenarios are evaluated without the analysis of all threat scenarios
+        single_threat_scenarios = [self.service.get_threat_scenario(f"TS-{i}") for i in range(1, 5)]
+
+        self.assertIsNone(self.service.analysis)
+        self.assertEqual(single_threat_scenarios, self.service.get_threat_scenarios())
+
+    def test_attack_tree_feasibility(self):
+        tree_id = self.service.get_threat_scenario("TS-3")["attack_tree"]
+
+        # Act
+        status, attack_tree = self.service.handle("GET", f"/attack-trees/{tree_id}", None)
+
+        # Assert
+        self.assertEqual(status, 200)
+        self.assertEqual(attack_tree["id"], tree_id)
+        self.assertEqual(attack_tree["feasibility"], self.service.get_threat_scenario("TS-3")["feasibility"])
+        self.assertGreater(attack_tree["residual_feasibility"]["score"], attack_tree["feasibility"]["score"])
+
+    def test_switching_a_control_returns_the_changed_risks(self):
+        # Act
+        status, result = self.service.handle("PUT", "/controls/C-2", {"active": False})
+
+        # Assert
+        self.assertEqual(status, 200)
+        self.assertEqual(result["changed_risks"], ["TS-3"])
+        self.assertEqual(self.service.get_threat_scenario("TS-3")["residual_risk"], "Low")
+        self.assertEqual([control["active"] for control in self.service.handle("GET", "/controls", None)[1]], [True, False])
+
+        # switching it back restores the risk
+        self.assertEqual(self.service.set_control_active("C-2", True)["changed_risks"], ["TS-3"])
+        self.assertEqual(self.service.get_threat_scenario("TS-3")["residual_risk"], "VeryLow")
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.service.handle("GET", "/threat-scenarios/TS-99", None)[0], 404)
+        self.assertEqual(self.service.handle("GET", "/attack-trees/AT_UNKNOWN", None)[0], 404)
+        self.assertEqual(self.service.handle("PUT", "/controls/C-99", {"active": True})[0], 404)
+        self.assertEqual(self.service.handle("PUT", "/controls/C-1", {"active": "yes"})[0], 400)
+        self.assertEqual(self.service.handle("DELETE", "/controls/C-1", None)[0], 404)
+
+    def test_reload_reports_the_validation_results(self):
+        self.assertEqual(self.service.handle("GET", "/validation", None), (200, {"errors": [], "warnings": []}))
+        self.t.mock_reader.unset_file(os.path.join(self.t.directory, "AttackTrees", "CIRC_C-2.md"))
+
+        # Act
+        status, validation = self.service.handle("POST", "/reload", None)
+
+        # Assert
+        self.assertEqual(status, 200)
+        self.assertIn("No circumvent tree found for ID CIRC_C-2.", validation["errors"])
+        # the risks can not be evaluated until the errors are fixed
+        self.assertEqual(self.service.handle("GET", "/threat-scenarios", None)[0], 400)
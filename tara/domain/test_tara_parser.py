@@ -1,12 +1,15 @@
-import unittest, os
+import unittest, os, tempfile
 from tara.domain.tara_parser import TaraParser
 from tara.domain.file_stubs import FileType
 from tara.domain.impacts import ImpactCategory, Impact
 from tara.domain.security_property import SecurityProperty
 from tara.domain.feasibility import *
 from tara.domain.attack_tree import *
+from tara.domain.what_if_analysis import WhatIfAnalysis
 from tara.utilities.file_reader import MockFileReader
-from tara.utilities.error_logger import MemoryErrorLogger
+from tara.utilities.error_logger import MemoryErrorLogger, BufferedErrorLogger
+from tara.utilities.parse_cache import ParseCache, MemoryParseCache
+from tara.utilities.phase_timer import PhaseTimer
 
 class TestCase:
     def __init__(self):
@@ -233,13 +236,26 @@ class TaraParserTests(unittest.TestCase):
         self.assertFalse(tara.security_controls[1].is_active)
 
 
+    def test_the_parsed_objects_can_be_looked_up_by_id(self):
+        test_case = TestCase()
+        tara = test_case.parser.parse(test_case.directory)
+
+        damage_scenarios = tara.damage_scenarios_by_id()
+        attack_trees = tara.attack_trees_by_id()
+
+        self.assertEqual(list(damage_scenarios), [damage_scenario.id for damage_scenario in tara.damage_scenarios])
+        self.assertIs(damage_scenarios["DS-2"], tara.damage_scenarios[1])
+        self.assertEqual(len(attack_trees), len(tara.attack_trees))
+        for attack_tree in tara.attack_trees:
+            self.assertIs(attack_trees[attack_tree.id], attack_tree)
+
     def assert_feasibility(self, node: AttackTreeNode, time, expertise, knowledge, woOpportunity, equipement):
-        expected_feasibility = Feasibility()
-        expected_feasibility.time = time
-        expected_feasibility.expertise = expertise
-        expected_feasibility.knowledge = knowledge
-        expected_feasibility.window_of_opportunity = woOpportunity
-        expected_feasibility.equipment = equipement
+        expected_feasibility = Feasibility(
+            time=time,
+            expertise=expertise,
+            knowledge=knowledge,
+            window_of_opportunity=woOpportunity,
+            equipment=equipement)
         
         self.assertEqual(node.get_feasibility(), expected_feasibility)
 
@@ -374,6 +390,58 @@ class TaraParserTests(unittest.TestCase):
 
         self.assertIn("Node Noref in attack tree AT_A-1_BLOCK references non-existing tree NonexistingAT.", default_test_case.logger.get_errors())
 
+    def test_circular_references_between_attack_trees_are_reported(self):
+        # Arrange
+        default_test_case = TestCase()
+        directory = default_test_case.directory
+        default_test_case.mock_reader.setup_file(os.path.join(directory, "AttackTrees", "AT_A-1_BLOCK.md"),
+"""# AT_A-1_BLOCK
+
+| Attack Tree                                      | Node | ET  | Ex  | Kn  | WoO | Eq  | Reasoning   | Control | Comment   |
+| ------------------------------------------------ | ---- | --- | --- | --- | --- | --- | ----------- | ------- | --------- |
+| Blocking of Asset 1                              | OR   |     |     |     |     |     |             |         |           |
+| -- [Manipulation of Asset 1](./AT_A-1_MAN.md)    | REF  |     |     |     |     |     |             |         |           |""")
+
+        default_test_case.mock_reader.setup_file(os.path.join(directory, "AttackTrees", "AT_A-1_MAN.md"),
+"""# AT_A-1_MAN
+
+| Attack Tree                                      | Node | ET  | Ex  | Kn  | WoO | Eq  | Reasoning   | Control | Comment   |
+| ------------------------------------------------ | ---- | --- | --- | --- | --- | --- | ----------- | ------- | --------- |
+| Manipulation of Asset 1                          | OR   |     |     |     |     |     |             |         |           |
+| -- [Blocking of Asset 1](./AT_A-1_BLOCK.md)      | REF  |     |     |     |     |     |             | C-1     |           |""")
+
+        default_test_case.mock_reader.setup_file(os.path.join(directory, "AttackTrees", "CIRC_C-1.md"),
+"""# CIRC_C-1
+
+| Attack Tree                                      | Node | ET  | Ex  | Kn  | WoO | Eq  | Reasoning   | Control | Comment   |
+| ------------------------------------------------ | ---- | --- | --- | --- | --- | --- | ----------- | ------- | --------- |
+| Circumvent Control 1                             | OR   |     |     |     |     |     |             | C-1     |           |
+| -- Sub Threat 1                                  |      | 1w  | L   | P   | U   | ST  |             |         |           |""")
+
+        # Act
+        default_test_case.parser.parse(directory)
+
+        # Assert
+        errors = default_test_case.logger.get_errors()
+        self.assertIn("Circular references between attack trees: AT_A-1_BLOCK, AT_A-1_MAN.", errors)
+        self.assertIn("Circular references between attack trees: CIRC_C-1.", errors)
+
+    def test_the_forest_of_the_cycle_check_is_kept_for_the_evaluation(self):
+        default_test_case = TestCase()
+        tara = default_test_case.parser.parse(default_test_case.directory)
+        forest = tara.get_forest()
+
+        # Act
+        analysis = WhatIfAnalysis(tara)
+
+        # Assert
+        self.assertIs(analysis.forest, forest)
+        self.assertEqual(list(analysis.forest.evaluate()), forest.evaluation_order)
+
+        # a replaced list of attack trees gets a new forest
+        tara.attack_trees = tara.attack_trees[:1]
+        self.assertEqual(list(tara.get_forest().attack_trees), [tara.attack_trees[0].id])
+
     def test_errors_in_attack_tree(self):
         # Arrange: only one Threat Scenario
         default_test_case = TestCase()
@@ -461,6 +529,127 @@ class TaraParserTests(unittest.TestCase):
         self.assertIn("Node Threat 1 is indented too far in attack tree TAT_Wrong_Indentation.", default_test_case.logger.get_errors())
         self.assertIn("Node Threat 2 has an uneven number of indenting dashes in attack tree TAT_Wrong_Indentation.", default_test_case.logger.get_errors())
 
+    def test_parallel_parsing_gives_the_same_result(self):
+        attack_tree = """# AT_A-1_BLOCK
+
+| Attack Tree       | Node | ET  | Ex  | Kn  | WoO | Eq  | Reasoning   | Control | Comment   |
+| ----------------- | ---- | --- | --- | --- | --- | --- | ----------- | ------- | --------- |
+| Root Threat       | OR   |     |     |     |     |     |             |         |           |
+| -- Sub Threat 1   |      | 3w  | wL  |     | w   | me  |             |         |           |
+| -- Threat2        | XOR  |     |     |     |     |     |             |         |           |
+| -- Sub Threat 2   |      | 1w  | L   | P   | U   |     |             |         |           |"""
+
+        def parse(jobs: int):
+            test_case = TestCase()
+            test_case.mock_reader.setup_file(os.path.join(test_case.directory, "AttackTrees", "AT_A-1_BLOCK.md"), attack_tree)
+            test_case.mock_reader.setup_file(os.path.join(test_case.directory, "AttackTrees", "AT_A-1_MAN.md"), "")
+            tara = test_case.parser.parse(test_case.directory, jobs=jobs)
+            return test_case, tara
+
+        sequential_case, sequential_tara = parse(1)
+
+        # Act
+        parallel_case, parallel_tara = parse(3)
+
+        # Assert
+        self.assertNotEqual(sequential_case.logger.get_errors(), [])
+        self.assertEqual(parallel_case.logger.get_errors(), sequential_case.logger.get_errors())
+        self.assertEqual(parallel_case.logger.get_warnings(), sequential_case.logger.get_warnings())
+        self.assertEqual([tree.id for tree in parallel_tara.attack_trees], [tree.id for tree in sequential_tara.attack_trees])
+        for parallel_tree, sequential_tree in zip(parallel_tara.attack_trees, sequential_tara.attack_trees):
+            self.assertEqual([node.name for node in parallel_tree.get_nodes()], [node.name for node in sequential_tree.get_nodes()])
+            for node in parallel_tree.get_nodes():
+                self.assertIs(node.object_store, parallel_case.parser.object_store)
+            if parallel_tree.root_node is not None:
+                self.assertEqual(parallel_tree.get_feasibility(), sequential_tree.get_feasibility())
+
+    def test_unchanged_attack_tree_files_are_taken_from_the_cache(self):
+        with tempfile.TemporaryDirectory() as cache_directory:
+            def parse():
+                test_case = TestCase()
+                test_case.parser.cache = ParseCache(cache_directory)
+                test_case.mock_reader.setup_file(os.path.join(test_case.directory, "AttackTrees", "AT_A-1_MAN.md"), "")
+                tara = test_case.parser.parse(test_case.directory)
+                return test_case, tara
+
+            uncached_case, uncached_tara = parse()
+            entry_count = len(os.listdir(cache_directory))
+
+            # Act
+            cached_case, cached_tara = parse()
+
+            # Assert
+            self.assertEqual(entry_count, len(uncached_tara.attack_trees) + 1)
+            self.assertEqual(len(os.listdir(cache_directory)), entry_count)
+            self.assertEqual(cached_case.logger.get_errors(), uncached_case.logger.get_errors())
+            self.assertEqual(cached_case.logger.get_warnings(), uncached_case.logger.get_warnings())
+            self.assertEqual([tree.id for tree in cached_tara.attack_trees], [tree.id for tree in uncached_tara.attack_trees])
+            for cached_tree, uncached_tree in zip(cached_tara.attack_trees, uncached_tara.attack_trees):
+                self.assertEqual([node.name for node in cached_tree.get_nodes()], [node.name for node in uncached_tree.get_nodes()])
+                for node in cached_tree.get_nodes():
+                    self.assertIs(node.object_store, cached_case.parser.object_store)
+                self.assertEqual(cached_tree.get_feasibility(), uncached_tree.get_feasibility())
+
+            # a cached result is used as long as the file content is unchanged
+            test_case = TestCase()
+            attack_tree_dir = os.path.join(test_case.directory, "AttackTrees")
+            file_path = os.path.join(attack_tree_dir, "AT_A-2_MAN.md")
+            content = test_case.mock_reader.read_file(file_path)
+            ParseCache(cache_directory).put(file_path, content, (AttackTree("AT_CACHED"), BufferedErrorLogger()))
+            test_case.parser.cache = ParseCache(cache_directory)
+            self.assertEqual(test_case.parser.parse_attack_tree_file(attack_tree_dir, "AT_A-2_MAN.md").id, "AT_CACHED")
+
+            test_case.mock_reader.setup_file(file_path, content + "\n")
+            self.assertEqual(test_case.parser.parse_attack_tree_file(attack_tree_dir, "AT_A-2_MAN.md").id, "AT_A-2_MAN")
+
+    def test_unchanged_attack_tree_files_are_kept_in_memory(self):
+        # Arrange
+        cache = MemoryParseCache()
+        first_case = TestCase()
+        first_case.parser.cache = cache
+        first_tara = first_case.parser.parse(first_case.directory)
+
+        second_case = TestCase()
+        second_case.parser.cache = cache
+        changed_file_path = os.path.join(second_case.directory, "AttackTrees", "AT_A-2_MAN.md")
+        second_case.mock_reader.setup_file(changed_file_path, second_case.mock_reader.read_file(changed_file_path).replace("| 1w  | L   |", "| 1m  | L   |"))
+
+        # Act
+        second_tara = second_case.parser.parse(second_case.directory)
+
+        # Assert
+        first_trees = first_tara.attack_trees_by_id()
+        for tree in second_tara.attack_trees:
+            if tree.id == "AT_A-2_MAN":
+                self.assertIsNot(tree, first_trees[tree.id])
+                self.assertEqual(tree.root_node.children[0].get_feasibility(without_controls=True).time, ElapsedTime.OneMonth)
+            else:
+                self.assertIs(tree, first_trees[tree.id])
+            for node in tree.get_nodes():
+                self.assertIs(node.object_store, second_case.parser.object_store)
+        self.assertEqual(second_case.logger.get_errors(), first_case.logger.get_errors())
+        self.assertEqual(second_case.logger.get_warnings(), first_case.logger.get_warnings())
+
+    def test_the_parsing_phases_can_be_timed(self):
+        # Arrange
+        test_case = TestCase()
+        test_case.parser.timer = PhaseTimer()
+
+        # Act
+        tara = test_case.parser.parse(test_case.directory)
+
+        # Assert
+        self.assertEqual(len(tara.attack_trees), 7)
+        statistics = {phase.name: phase for phase in test_case.parser.timer.get_statistics()}
+        self.assertEqual(list(statistics)[:5], ["reading files", "parsing markdown", "extracting tables", "parsing attack trees", "registering IDs"])
+        self.assertEqual(statistics["reading files"].calls, 4 + 7)
+        self.assertEqual(statistics["parsing markdown"].calls, 4 + 7)
+        self.assertEqual(statistics["parsing attack trees"].calls, 7)
+        node_count = sum(len(tree.get_nodes()) for tree in tara.attack_trees)
+        self.assertEqual(statistics["rule check_referenced_controls_exist"].calls, node_count)
+        self.assertIn("rule check_attack_trees_are_acyclic", statistics)
+        self.assertIsNone(statistics["reading files"].peak_memory)
+
     def test_error_missing_attack_tree(self):
         # Arrange
         t = TestCase()
@@ -1,3 +1,4 @@
+import io
 import os
 import unittest
 from tara.utilities.file_reader import MockFileReader
@@ -6,6 +7,10 @@ from tara.domain.file_stubs import FileType
 from tara.domain.tara_parser import TaraParser
 from tara.domain.tara_document_generator import TaraDocumentGenerator
 from tara.domain.threat_scenario_document_generator import ThreatScenarioDocumentGenerator
+from tara.domain import evaluation_counters
+from tara.utilities.phase_timer import PhaseTimer
+from tara.utilities.streaming_markdown_writer import StreamingMarkdownWriter
+from tara.MarkdownLib.markdown_writer import MarkdownWriter
 from tara.MarkdownLib.markdown_document import *
 
 class TestCase:
@@ -225,7 +230,7 @@ class TestTaraReportGenerator(unittest.TestCase):
         self.assertEqual(threat_scenarios.getRow(3), ["TS-4", 
                                                       "Litigation caused by extraction of Asset 2", 
                                                       "Major", "[Medium](#at_a-2_ext)", "Medium"])
-        
+
         # Resolved attack trees section
         
         attack_trees_section: MarkdownSection = next(content_iter)
@@ -293,4 +298,124 @@ class TestTaraReportGenerator(unittest.TestCase):
         
         resolved_tree_a2_man: MarkdownTable = next(content_iter)
         self.assertIsInstance(resolved_tree_a2_man, MarkdownTable)
-        self.assertEqual(resolved_tree_a2_man.getRowCount(), 2)
\ No newline at end of file
+        self.assertEqual(resolved_tree_a2_man.getRowCount(), 2)
+
+    def test_the_control_sensitivity_section_is_added_on_request(self):
+        # Arrange
+        t = TestCase()
+        tara = t.parser.parse(t.directory)
+        generator = TaraDocumentGenerator(t.logger, control_sensitivity=True)
+
+        # Act
+        content = generator.generate(tara).getContent()
+
+        # Assert
+        self.assertEqual(t.logger.errors, [])
+        self.assertEqual(len(content), 20)
+        self.assertTrue(all(control.is_active for control in tara.security_controls))
+
+        control_sensitivity_section: MarkdownSection = content[3]
+        self.assertEqual(control_sensitivity_section.level, 1)
+        self.assertEqual(control_sensitivity_section.title, "Control Sensitivity")
+
+        control_sensitivity: MarkdownTable = content[4]
+        self.assertIsInstance(control_sensitivity, MarkdownTable)
+        self.assertTrue(control_sensitivity.hasHeader(["ID", "Name", "Changed Risks", "Threat Scenarios", "Total Score Change", "Largest Score Change"]))
+        self.assertEqual(control_sensitivity.getRowCount(), 2)
+        self.assertEqual(control_sensitivity.getRow(0), ["C-1", "Control 1", "1", "TS-1", "-7", "-7"])
+        self.assertEqual(control_sensitivity.getRow(1), ["C-2", "Control 2", "1", "TS-3", "-24", "-24"])
+
+        attack_trees_section: MarkdownSection = content[5]
+        self.assertEqual(attack_trees_section.title, "Attack Trees")
+
+    def test_the_report_can_be_generated_in_parts(self):
+        # Arrange
+        t = TestCase()
+        tara = t.parser.parse(t.directory)
+        generator = TaraDocumentGenerator(t.logger)
+        expected_content = generator.generate(tara).getContent()
+
+        # Act
+        parts = list(generator.generate_parts(tara))
+
+        # Assert
+        self.assertEqual(t.logger.errors, [])
+
+        # summary up to the attack trees title + one part per attack tree
+        self.assertEqual(len(parts), 1 + len(tara.attack_trees))
+        self.assertEqual(len(parts[0].getContent()), 4)
+        self.assertTrue(all(len(part.getContent()) == 2 for part in parts[1:]))
+
+        content = [item for part in parts for item in part.getContent()]
+        self.assertEqual(len(content), len(expected_content))
+        for item, expected_item in zip(content, expected_content):
+            self.assertEqual(type(item), type(expected_item))
+            if isinstance(item, MarkdownSection):
+                self.assertEqual((item.title, item.level), (expected_item.title, expected_item.level))
+            else:
+                self.assertEqual([item.getRow(row) for row in range(item.getRowCount())],
+                                 [expected_item.getRow(row) for row in range(expected_item.getRowCount())])
+
+    def test_the_streamed_report_equals_the_rendered_report(self):
+        # Arrange
+        t = TestCase()
+        tara = t.parser.parse(t.directory)
+        generator = TaraDocumentGenerator(t.logger)
+        expected_text = MarkdownWriter().write(generator.generate(tara))
+        file = io.StringIO()
+
+        # Act
+        writer = StreamingMarkdownWriter(file)
+        for part in generator.generate_parts(tara):
+            writer.write(part)
+
+        # Assert
+        self.assertEqual(t.logger.errors, [])
+        self.assertEqual(file.getvalue(), expected_text)
+
+    def test_the_attack_trees_of_the_report_are_built_from_one_evaluation(self):
+        # Arrange
+        t = TestCase()
+        tara = t.parser.parse(t.directory)
+        control_states = [(control.id, control.is_active) for control in tara.security_controls]
+        parts = TaraDocumentGenerator(t.logger, control_sensitivity=True).generate_parts(tara)
+        next(parts)
+        counters = evaluation_counters.enable()
+
+        # Act
+        try:
+            list(parts)
+        finally:
+            evaluation_counters.disable()
+
+        # Assert
+        self.assertEqual(t.logger.errors, [])
+        self.assertEqual(counters.get_evaluation_count(), 0)
+        self.assertEqual([(control.id, control.is_active) for control in tara.security_controls], control_states)
+
+    def test_the_report_generation_can_be_timed(self):
+        # Arrange
+        t = TestCase()
+        tara = t.parser.parse(t.directory)
+        timer = PhaseTimer()
+
+        # Act
+        parts = list(TaraDocumentGenerator(t.logger, timer, control_sensitivity=True).generate_parts(tara))
+
+        # Assert
+        statistics = {statistics.name: statistics for statistics in timer.get_statistics()}
+        self.assertEqual(list(statistics), ["evaluating feasibilities", "analysing control sensitivities", "resolving attack trees and building the report"])
+        self.assertEqual(statistics["evaluating feasibilities"].calls, 2)
+        self.assertEqual(statistics["resolving attack trees and building the report"].calls, len(parts))
+
+    def test_the_default_report_does_not_analyse_the_control_sensitivities(self):
+        # Arrange
+        t = TestCase()
+        tara = t.parser.parse(t.directory)
+        timer = PhaseTimer()
+
+        # Act
+        list(TaraDocumentGenerator(t.logger, timer).generate_parts(tara))
+
+        # Assert
+        self.assertEqual([statistics.name for statistics in timer.get_statistics()], ["evaluating feasibilities", "resolving attack trees and building the report"])
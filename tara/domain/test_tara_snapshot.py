@@ -0,0 +1,83 @@
+import unittest, os, tempfile
+from tara.domain.tara_snapshot import write_snapshot, read_snapshot, open_snapshot
+from tara.domain.tara_document_generator import TaraDocumentGenerator
+from tara.domain.attack_forest import AttackForest
+from tara.domain.tara_model_service import TaraModelService
+from tara.domain.test_tara_report_generator import TestCase
+from tara.utilities.error_logger import MemoryErrorLogger
+from tara.MarkdownLib.markdown_writer import MarkdownWriter
+
+class TestTaraSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.test_case = TestCase()
+        self.tara = self.test_case.parser.parse(self.test_case.directory)
+        self.assertEqual(self.test_case.logger.errors, [])
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.directory.name, "tara.snapshot")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def generate_report(self, tara) -> str:
+        AttackForest(tara.attack_trees).evaluate()
+        return MarkdownWriter().write(TaraDocumentGenerator(MemoryErrorLogger()).generate(tara))
+
+    def test_a_loaded_snapshot_equals_the_parsed_tara(self):
+        write_snapshot(self.tara, self.file_path)
+        logger = MemoryErrorLogger()
+
+        # Act
+        tara = read_snapshot(self.file_path, logger)
+
+        # Assert
+        self.assertEqual(logger.errors, [])
+        self.assertEqual([vars(a) for a in tara.assumptions], [vars(a) for a in self.tara.assumptions])
+        self.assertEqual([vars(d) for d in tara.damage_scenarios], [vars(d) for d in self.tara.damage_scenarios])
+        self.assertEqual([vars(a) for a in tara.assets], [vars(a) for a in self.tara.assets])
+        self.assertEqual([vars(c) for c in tara.security_controls], [vars(c) for c in self.tara.security_controls])
+        self.assertEqual([tree.id for tree in tara.attack_trees], [tree.id for tree in self.tara.attack_trees])
+        for loaded_tree, parsed_tree in zip(tara.attack_trees, self.tara.attack_trees):
+            self.assertEqual(loaded_tree.description, parsed_tree.description)
+            self.assertEqual([(node.type, node.name, node.security_control_ids) for node in loaded_tree.get_nodes()],
+                             [(node.type, node.name, node.security_control_ids) for node in parsed_tree.get_nodes()])
+        self.assertEqual(self.generate_report(tara), self.generate_report(self.tara))
+
+    def test_an_opened_snapshot_only_loads_the_touched_attack_trees(self):
+        write_snapshot(self.tara, self.file_path)
+        tara = open_snapshot(self.file_path, MemoryErrorLogger())
+        attack_trees = tara.attack_trees_by_id()
+        self.assertEqual(list(attack_trees), [tree.id for tree in self.tara.attack_trees])
+        self.assertFalse(any(tree.is_loaded() for tree in tara.attack_trees))
+
+        # Act
+        feasibility = attack_trees["AT_A-1_MAN"].get_feasibility()
+
+        # Assert
+        self.assertEqual(feasibility, self.tara.attack_trees_by_id()["AT_A-1_MAN"].get_feasibility())
+        # AT_A-1_MAN references TAT_TREE
+        self.assertEqual({tree.id for tree in tara.attack_trees if tree.is_loaded()}, {"AT_A-1_MAN", "TAT_TREE"})
+
+        # AT_A-2_MAN carries the active controls C-1 and C-2
+        self.assertEqual(attack_trees["AT_A-2_MAN"].get_feasibility(), self.tara.attack_trees_by_id()["AT_A-2_MAN"].get_feasibility())
+        self.assertEqual({tree.id for tree in tara.attack_trees if tree.is_loaded()}, {"AT_A-1_MAN", "TAT_TREE", "AT_A-2_MAN", "CIRC_C-1", "CIRC_C-2"})
+        self.assertEqual(self.generate_report(tara), self.generate_report(self.tara))
+
+    def test_the_model_service_answers_from_an_opened_snapshot(self):
+        write_snapshot(self.tara, self.file_path)
+        parsed_service = TaraModelService(self.test_case.mock_reader, self.test_case.directory)
+
+        # Act
+        service = TaraModelService(self.test_case.mock_reader, self.test_case.directory, self.file_path)
+
+        # Assert
+        self.assertEqual(service.handle("GET", "/threat-scenarios/TS-3", None), parsed_service.handle("GET", "/threat-scenarios/TS-3", None))
+        self.assertLess(len([tree for tree in service.tara.attack_trees if tree.is_loaded()]), len(service.tara.attack_trees))
+        self.assertEqual(service.handle("GET", "/threat-scenarios", None), parsed_service.handle("GET", "/threat-scenarios", None))
+        self.assertEqual(service.handle("PUT", "/controls/C-2", {"active": False}), parsed_service.handle("PUT", "/controls/C-2", {"active": False}))
+
+    def test_other_files_are_rejected(self):
+        with open(self.file_path, 'wb') as f:
+            f.write(b"# Assumptions\n")
+
+        with self.assertRaises(ValueError):
+            read_snapshot(self.file_path, MemoryErrorLogger())
@@ -0,0 +1,114 @@
+import unittest
+from tara.domain.risk import RiskLevel
+from tara.domain.what_if_analysis import WhatIfAnalysis
+from tara.domain.what_if_document_generator import WhatIfDocumentGenerator
+from tara.domain.flat_attack_forest import FlatAttackForest
+from tara.domain.numpy_forest_evaluator import NumpyForestEvaluator, np
+from tara.domain.test_tara_report_generator import TestCase
+from tara.MarkdownLib.markdown_document import *
+
+class TestWhatIfAnalysis(unittest.TestCase):
+    def setUp(self):
+        self.t = TestCase()
+        self.tara = self.t.parser.parse(self.t.directory)
+        self.assertEqual(self.t.logger.errors, [])
+
+    def test_the_residual_risks_are_evaluated_for_each_control_set(self):
+        analysis = WhatIfAnalysis(self.tara)
+
+        # Act
+        risks = analysis.evaluate([set(), {"C-1"}, {"C-1", "C-2"}])
+
+        # Assert
+        self.assertEqual(analysis.get_initial_risks(), [RiskLevel.High, RiskLevel.Medium, RiskLevel.Medium, RiskLevel.Medium])
+        self.assertEqual(risks, [
+            [RiskLevel.High, RiskLevel.Medium, RiskLevel.Medium],
+            [RiskLevel.Medium, RiskLevel.Medium, RiskLevel.Medium],
+            [RiskLevel.Medium, RiskLevel.Low, RiskLevel.VeryLow],
+            [RiskLevel.Medium, RiskLevel.Medium, RiskLevel.Medium],
+        ])
+
+    def test_the_control_states_are_restored(self):
+        analysis = WhatIfAnalysis(self.tara)
+        residual_risks = analysis.evaluate([{"C-1", "C-2"}])
+
+        analysis.evaluate([set(), {"C-2"}])
+
+        self.assertTrue(all(control.is_active for control in self.tara.security_controls))
+        self.assertEqual(analysis.evaluate([{"C-1", "C-2"}]), residual_risks)
+
+    def test_a_flat_forest_evaluates_the_same_residual_risks(self):
+        control_sets = [set(), {"C-1"}, {"C-2"}, {"C-1", "C-2"}]
+        expected_risks = WhatIfAnalysis(self.tara).evaluate(control_sets)
+        self.tara.security_controls[0].is_active = False
+        analysis = WhatIfAnalysis(self.tara, FlatAttackForest.from_attack_trees(self.tara.attack_trees))
+
+        # Act
+        risks = analysis.evaluate(control_sets)
+
+        # Assert
+        self.assertEqual(risks, expected_risks)
+        self.assertEqual(analysis.get_initial_risks(), [RiskLevel.High, RiskLevel.Medium, RiskLevel.Medium, RiskLevel.Medium])
+        # the states of the controls are not used
+        self.assertEqual([control.is_active for control in self.tara.security_controls], [False, True])
+        self.assertEqual(analysis.evaluate_control_sensitivities()[0].changed_risks, [2])
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_a_numpy_evaluator_evaluates_the_same_residual_risks(self):
+        control_sets = [set(), {"C-1"}, {"C-2"}, {"C-1", "C-2"}]
+        expected_analysis = WhatIfAnalysis(self.tara)
+        expected_risks = expected_analysis.evaluate(control_sets)
+        analysis = WhatIfAnalysis(self.tara, NumpyForestEvaluator(FlatAttackForest.from_attack_trees(self.tara.attack_trees)))
+
+        # Act
+        risks = analysis.evaluate(control_sets)
+
+        # Assert
+        self.assertEqual(risks, expected_risks)
+        self.assertEqual(analysis.get_initial_risks(), expected_analysis.get_initial_risks())
+
+    def test_a_tara_without_attack_trees_can_be_analysed(self):
+        self.tara.attack_trees = []
+        analysis = WhatIfAnalysis(self.tara)
+
+        # Act
+        risks = analysis.evaluate([set(), {"C-1"}])
+
+        # Assert
+        self.assertEqual(risks, [[initial_risk, initial_risk] for initial_risk in analysis.get_initial_risks()])
+        self.assertTrue(all(control.is_active for control in self.tara.security_controls))
+
+    def test_unknown_controls_are_rejected(self):
+        analysis = WhatIfAnalysis(self.tara)
+
+        with self.assertRaises(ValueError):
+            analysis.evaluate([{"C-3"}])
+
+    def test_a_what_if_report_can_be_generated(self):
+        generator = WhatIfDocumentGenerator()
+
+        # Act
+        document: MarkdownDocument = generator.generate(self.tara, [set(), {"C-1", "C-2"}])
+
+        # Assert
+        content = document.getContent()
+        self.assertEqual(len(content), 2)
+        self.assertEqual(content[0].title, "What-If Analysis")
+
+        table: MarkdownTable = content[1]
+        self.assertTrue(table.hasHeader(["ID", "Asset", "Threat", "Threat Scenario", "Initial Risk", "No Controls", "C-1, C-2"]))
+        self.assertEqual(table.getRowCount(), 4)
+        self.assertEqual(table.getRow(2), ["TS-3", "A-2", "MAN", "Litigation caused by manipulation of Asset 2", "Medium", "Medium", "VeryLow"])
+
+    def test_the_sensitivity_of_each_active_control_is_evaluated(self):
+        self.tara.security_controls[1].is_active = False
+        analysis = WhatIfAnalysis(self.tara)
+
+        # Act
+        sensitivities = analysis.evaluate_control_sensitivities()
+
+        # Assert
+        self.assertEqual([sensitivity.control.id for sensitivity in sensitivities], ["C-1"])
+        self.assertEqual(sensitivities[0].changed_risks, [0, 2])
+        self.assertEqual(sensitivities[0].score_changes, [-7, 0, -7, 0])
+        self.assertFalse(self.tara.security_controls[1].is_active)
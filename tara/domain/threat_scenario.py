@@ -1,7 +1,10 @@
+from typing import Iterator
 from tara.domain.asset import Asset
 from tara.domain.security_property import SecurityProperty
 from tara.domain.damage_scenario import DamageScenario
 from tara.domain.feasibility import Feasibility
+from tara.domain.risk import RiskLevel
+from tara.domain.tara import Tara
 
 class ThreatScenario:
     def __init__(self, asset: Asset, security_property: SecurityProperty, damage_scenario: DamageScenario, feasibility: Feasibility):
@@ -17,3 +20,30 @@ class ThreatScenario:
         self.security_property = security_property
         self.damage_scenario = damage_scenario
         self.feasibility = feasibility
+
+    def get_description(self) -> str:
+        """
+        Returns the description of the threat scenario, e.g. "Litigation caused by manipulation of Asset 1".
+        """
+        damage_scenario_name = self.damage_scenario.name if self.damage_scenario else "Unknown"
+        attack_description: str = self.security_property.to_attack_description().lower()
+        return f"{damage_scenario_name} caused by {attack_description} of {self.asset.name}"
+
+    def get_risk(self, feasibility: Feasibility) -> RiskLevel:
+        """
+        Returns the risk of the threat scenario for the given feasibility, e.g. the initial or a residual feasibility.
+        """
+        impact = self.damage_scenario.get_impact() if self.damage_scenario else None
+        return RiskLevel.look_up(impact, feasibility.calculate_feasibility_level())
+
+def iterate_threat_scenarios(tara: Tara) -> Iterator[tuple[Asset, SecurityProperty, DamageScenario]]:
+    """
+    Yields the asset, the security property and the damage scenario of each threat scenario
+    in the order of the threat scenario table, so the n-th threat scenario has the ID TS-n.
+    The damage scenario is None if its ID does not exist.
+    """
+    damage_scenarios = tara.damage_scenarios_by_id()
+    for asset in tara.assets:
+        for security_property, damage_scenario_ids in asset.damage_scenarios.items():
+            for ds_id in damage_scenario_ids:
+                yield asset, security_property, damage_scenarios.get(ds_id)
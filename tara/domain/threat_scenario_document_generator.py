@@ -6,6 +6,7 @@ from tara.domain.attack_tree import attack_tree_id, AttackTree
 from tara.domain.feasibility import Feasibility
 from tara.domain.risk import RiskLevel
 from tara.domain.security_property import SecurityProperty
+from tara.domain.threat_scenario import ThreatScenario
 
 class FeasibilityComparision:
     def __init__(self):
@@ -26,27 +27,21 @@ class ThreatScenarioDocumentGenerator:
         builder = MarkdownTableBuilder() \
             .withHeader("ID", "Asset" ,"Damage", "Threat", "Threat Scenario", "Impact", "Initial Risk", "Risk Handling", "Residual Risk", "Feasibility")
 
-        # Here all feasibilites are collected
-        feasibilities = {}
-
-        # Calculate and cache all initial feasibilities
-        self._calculate_feasibilities(tara, without_controls=True, feasibilities=feasibilities)
+        # Calculate all initial and residual feasibilities
+        feasibilities = self._calculate_feasibilities(tara)
 
-        # Calculate and cache all residual feasibilities
-        self._calculate_feasibilities(tara, without_controls=False, feasibilities=feasibilities)
+        damage_scenarios = tara.damage_scenarios_by_id()
 
         # Build the table rows
         i = 1
         for asset in tara.assets:
             for security_property, damage_scenario_ids in asset.damage_scenarios.items():
                 for ds_id in damage_scenario_ids:
-                    damage_scenario: DamageScenario = self._find_by_id(tara.damage_scenarios, ds_id)
-                    damage_scenario_name = damage_scenario.name if damage_scenario else "Unknown"
+                    damage_scenario: DamageScenario = damage_scenarios.get(ds_id)
                     impact = damage_scenario.get_impact() if damage_scenario else None
                     impact_name = impact.name if impact else "Unknown"
 
                     at_id = attack_tree_id(asset, security_property)
-                    # attack_tree: AttackTree = self._find_by_id(tara.attack_trees, at_id)
                     
                     feasibility_id = (asset.id, security_property)
 
@@ -60,39 +55,35 @@ class ThreatScenarioDocumentGenerator:
                     
                     linked_feasibility = f"[{feasibility_level.name}](#{at_id.lower()})"
 
-                    attack_description: str = security_property.to_attack_description().lower()
+                    threat_scenario = ThreatScenario(asset, security_property, damage_scenario, initial_feasibility)
 
-                    threat_scenario = f"{damage_scenario_name} caused by {attack_description} of {asset.name}"
-
-                    builder.withRow(f"TS-{i}", f"{asset.id}", f"{ds_id}", f"{SecurityProperty.to_attack_id(security_property)}", threat_scenario, impact_name, initial_risk.name, "", risk.name, linked_feasibility)
+                    builder.withRow(f"TS-{i}", f"{asset.id}", f"{ds_id}", f"{SecurityProperty.to_attack_id(security_property)}", threat_scenario.get_description(), impact_name, initial_risk.name, "", risk.name, linked_feasibility)
                     i += 1
 
         return builder.build()
 
-    def _calculate_feasibilities(self, tara: Tara, without_controls: bool, feasibilities: dict) -> None:
-        for t in tara.attack_trees:
-            t.invalidate_cache()
+    def _calculate_feasibilities(self, tara: Tara) -> dict:
+        """
+        Calculates the initial and residual feasibility of every threat.
+        The whole forest is evaluated once per mode in topological order,
+        so every tree is evaluated only once.
+        """
+        forest = tara.get_forest()
+        forest.invalidate_cache()
+        initial_feasibilities = forest.evaluate(without_controls=True)
+        residual_feasibilities = forest.evaluate(without_controls=False)
 
+        feasibilities = {}
         for asset in tara.assets:
             for security_property, _damage_scenario_ids in asset.damage_scenarios.items():
                 at_id = attack_tree_id(asset, security_property)
-                attack_tree: AttackTree = self._find_by_id(tara.attack_trees, at_id)
-                
-                initial_feasibility = attack_tree.get_feasibility(without_controls) if attack_tree else Feasibility()
-
-                feasibility_id = (asset.id, security_property)
-                fc = feasibilities.get(feasibility_id)
-                if not fc:
-                    fc = FeasibilityComparision()
-                    feasibilities[feasibility_id] = fc
-
-                if without_controls:
-                    fc.initial = initial_feasibility
-                else:
-                    fc.residual = initial_feasibility
-
-    def _find_by_id(self, items, item_id) -> object:
-        for item in items:
-            if item.id == item_id:
-                return item
-        return None
+
+                fc = FeasibilityComparision()
+                if at_id in forest.attack_trees:
+                    fc.initial = initial_feasibilities[at_id]
+                    fc.residual = residual_feasibilities[at_id]
+
+                feasibilities[(asset.id, security_property)] = fc
+
+        return feasibilities
+
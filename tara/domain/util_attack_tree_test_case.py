@@ -10,9 +10,9 @@ class AttackTreeTestCase:
         self.logger = MemoryErrorLogger()
         self.object_store = ObjectStore(MemoryErrorLogger())
 
-    def register_control(self, control_id: str, is_active: bool):
+    def register_control(self, control_id: str, is_active: bool) -> SecurityControl:
         """
-        Registers a security control in the object store.
+        Registers a security control in the object store and returns it.
         """
         control = SecurityControl()
         control.id = control_id
@@ -20,6 +20,7 @@ class AttackTreeTestCase:
         control.security_goal = "Goal"
         control.is_active = is_active
         self.object_store.add(control)
+        return control
 
     def parse_attack_tree(self, attack_tree_description: str, attack_tree_id: str) -> AttackTree:
         parser = MarkdownParser()
@@ -0,0 +1,153 @@
+from typing import Union
+from tara.domain.tara import Tara
+from tara.domain.attack_tree import attack_tree_id
+from tara.domain.flat_attack_forest import FlatAttackForest
+from tara.domain.numpy_forest_evaluator import NumpyForestEvaluator
+from tara.domain.feasibility import Feasibility
+from tara.domain.risk import RiskLevel
+from tara.domain.threat_scenario import ThreatScenario, iterate_threat_scenarios
+from tara.domain.security_control import SecurityControl
+
+class ControlSensitivity:
+    def __init__(self, control: SecurityControl):
+        self.control = control
+        # Indexes of the threat scenarios whose residual risk changes when the control is turned off
+        self.changed_risks: list[int] = []
+        # Change of the residual feasibility score of each threat scenario when the control is turned off
+        self.score_changes: list[int] = []
+
+class WhatIfAnalysis:
+    """
+    Evaluates the residual risk of every threat scenario for several sets of active security controls.
+
+    By default all control sets are evaluated on one attack forest. Between two sets only the controls
+    whose state changes are switched, and only the nodes depending on them are re-evaluated,
+    so subtrees which are not affected by a control are evaluated once for all sets.
+    The states of the controls are restored after the analysis.
+
+    With an evaluator, a FlatAttackForest or a NumpyForestEvaluator, every control set is evaluated by one sweep of the
+    evaluator over all trees instead, and the states of the controls are not changed.
+    """
+
+    def __init__(self, tara: Tara, evaluator: Union[FlatAttackForest, NumpyForestEvaluator] = None):
+        """
+        :param tara: The TARA to analyse.
+        :param evaluator: Evaluates all trees for a set of active controls with evaluate_trees,
+            None to switch the controls on the attack trees.
+        """
+        self.tara = tara
+        self.forest = tara.get_forest()
+        self.evaluator = evaluator
+        if evaluator is None:
+            self.forest.invalidate_cache()
+            initial_feasibilities = self.forest.evaluate(without_controls=True)
+        else:
+            initial_feasibilities = evaluator.evaluate_trees(set(), without_controls=True)
+
+        # The threat scenarios in the order of the threat scenario table, with their initial feasibility
+        self.threat_scenarios: list[ThreatScenario] = []
+        for asset, security_property, damage_scenario in iterate_threat_scenarios(tara):
+            initial_feasibility = initial_feasibilities.get(attack_tree_id(asset, security_property), Feasibility())
+            self.threat_scenarios.append(ThreatScenario(asset, security_property, damage_scenario, initial_feasibility))
+
+    def get_initial_risks(self) -> list[RiskLevel]:
+        """
+        Returns the risk of each threat scenario without any controls.
+        """
+        return [threat_scenario.get_risk(threat_scenario.feasibility) for threat_scenario in self.threat_scenarios]
+
+    def evaluate(self, control_sets: list[set[str]]) -> list[list[RiskLevel]]:
+        """
+        Evaluates the residual risk of every threat scenario for each set of active controls.
+
+        :param control_sets: The sets of the IDs of the active controls. All other controls are inactive.
+        :return: A matrix with one row per threat scenario and one column per control set.
+        """
+        return [
+            [threat_scenario.get_risk(feasibility) for feasibility in row]
+            for threat_scenario, row in zip(self.threat_scenarios, self.evaluate_feasibilities(control_sets))
+        ]
+
+    def evaluate_feasibilities(self, control_sets: list[set[str]]) -> list[list[Feasibility]]:
+        """
+        Evaluates the residual feasibility of every threat scenario for each set of active controls.
+
+        :param control_sets: The sets of the IDs of the active controls. All other controls are inactive.
+        :return: A matrix with one row per threat scenario and one column per control set.
+        """
+        control_ids = {control.id for control in self.tara.security_controls}
+        unknown_control_ids = sorted(set().union(*control_sets) - control_ids)
+        if unknown_control_ids:
+            raise ValueError(f"Unknown security controls: {', '.join(unknown_control_ids)}")
+
+        if self.evaluator is not None:
+            columns = [self._get_threat_scenario_feasibilities(self.evaluator.evaluate_trees(control_set)) for control_set in control_sets]
+        else:
+            original_states = {control.id: control.is_active for control in self.tara.security_controls}
+            columns = []
+            try:
+                for control_set in control_sets:
+                    self.set_active_controls(control_set)
+                    columns.append(self.evaluate_residual_feasibilities())
+            finally:
+                self.set_active_controls({control_id for control_id, is_active in original_states.items() if is_active})
+
+        return [list(row) for row in zip(*columns)] if columns else [[] for _ in self.threat_scenarios]
+
+    def evaluate_control_sensitivities(self) -> list[ControlSensitivity]:
+        """
+        Determines for each active control how the residual risks and feasibility scores
+        change when this control alone is turned off. All variants are evaluated on the
+        same forest, so only the nodes depending on the respective control are re-evaluated.
+
+        :return: One entry per active control in the order of the controls table.
+        """
+        active_controls = [control for control in self.tara.security_controls if control.is_active]
+        active_control_ids = {control.id for control in active_controls}
+        control_sets = [active_control_ids] + [active_control_ids - {control.id} for control in active_controls]
+        feasibilities = self.evaluate_feasibilities(control_sets)
+
+        sensitivities = []
+        for column, control in enumerate(active_controls, start=1):
+            sensitivity = ControlSensitivity(control)
+            for i, threat_scenario in enumerate(self.threat_scenarios):
+                residual_feasibility = feasibilities[i][0]
+                feasibility = feasibilities[i][column]
+                if threat_scenario.get_risk(feasibility) != threat_scenario.get_risk(residual_feasibility):
+                    sensitivity.changed_risks.append(i)
+                sensitivity.score_changes.append(feasibility.calculate_feasibility_score() - residual_feasibility.calculate_feasibility_score())
+            sensitivities.append(sensitivity)
+
+        return sensitivities
+
+    def set_active_controls(self, control_ids: set[str]) -> None:
+        """
+        Activates the given controls and deactivates all other controls.
+        Only the nodes depending on a switched control are re-evaluated by the next evaluation.
+        """
+        for control in self.tara.security_controls:
+            self.forest.set_control_active(control.id, control.id in control_ids)
+
+    def evaluate_residual_feasibilities(self) -> list[Feasibility]:
+        """
+        Returns the residual feasibility of each threat scenario for the current states of the controls.
+        """
+        return self._get_threat_scenario_feasibilities(self.forest.evaluate())
+
+    def _get_threat_scenario_feasibilities(self, feasibilities: dict[str, Feasibility]) -> list[Feasibility]:
+        """
+        Returns the feasibility of the attack tree of each threat scenario from the feasibilities by tree ID.
+        """
+        return [
+            feasibilities.get(attack_tree_id(threat_scenario.asset, threat_scenario.security_property), Feasibility())
+            for threat_scenario in self.threat_scenarios
+        ]
+
+    def evaluate_residual_risks(self) -> list[RiskLevel]:
+        """
+        Returns the residual risk of each threat scenario for the current states of the controls.
+        """
+        return [
+            threat_scenario.get_risk(feasibility)
+            for threat_scenario, feasibility in zip(self.threat_scenarios, self.evaluate_residual_feasibilities())
+        ]
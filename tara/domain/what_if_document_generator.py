@@ -0,0 +1,41 @@
+from typing import Union
+from tara.MarkdownLib.markdown_document import MarkdownDocument, MarkdownTable
+from tara.MarkdownLib.markdown_document_builder import MarkdownDocumentBuilder, MarkdownTableBuilder
+from tara.domain.tara import Tara
+from tara.domain.what_if_analysis import WhatIfAnalysis
+from tara.domain.flat_attack_forest import FlatAttackForest
+from tara.domain.numpy_forest_evaluator import NumpyForestEvaluator
+from tara.domain.security_property import SecurityProperty
+
+class WhatIfDocumentGenerator:
+    def generate(self, tara: Tara, control_sets: list[set[str]], evaluator: Union[FlatAttackForest, NumpyForestEvaluator] = None) -> MarkdownDocument:
+        """
+        Generates a report with the residual risk of every threat scenario for each set of active controls.
+
+        :param tara: The parsed TARA.
+        :param control_sets: The sets of the IDs of the active controls.
+        :param evaluator: Evaluates all trees for each control set, see WhatIfAnalysis.
+        :return: A markdown document with one risk column per control set.
+        """
+        h1 = 1
+
+        document_builder = MarkdownDocumentBuilder() \
+            .withSection("What-If Analysis", h1) \
+            .withTable(self._build_what_if_table(tara, control_sets, evaluator))
+
+        return document_builder.build()
+
+    def _build_what_if_table(self, tara: Tara, control_sets: list[set[str]], evaluator: Union[FlatAttackForest, NumpyForestEvaluator]) -> MarkdownTable:
+        analysis = WhatIfAnalysis(tara, evaluator)
+        residual_risks = analysis.evaluate(control_sets)
+        initial_risks = analysis.get_initial_risks()
+
+        control_set_names = [", ".join(sorted(control_set)) if control_set else "No Controls" for control_set in control_sets]
+        builder = MarkdownTableBuilder() \
+            .withHeader("ID", "Asset", "Threat", "Threat Scenario", "Initial Risk", *control_set_names)
+
+        for i, threat_scenario in enumerate(analysis.threat_scenarios):
+            builder.withRow(f"TS-{i + 1}", threat_scenario.asset.id, SecurityProperty.to_attack_id(threat_scenario.security_property),
+                            threat_scenario.get_description(), initial_risks[i].name, *[risk.name for risk in residual_risks[i]])
+
+        return builder.build()
@@ -19,6 +19,7 @@ class ErrorLogger(IErrorLogger):
     def log_error(self, error: Exception) -> None:
         """Logs an error message to the console."""
         print(f"Error: {error}")
+        self._has_errors = True
 
     def log_warning(self, warning: str) -> None:
         """Logs a warning message to the console."""
@@ -53,4 +54,33 @@ class MemoryErrorLogger(IErrorLogger):
     def get_warnings(self) -> list[str]:
         """Returns the list of logged warnings."""
         return self.warnings
-    
\ No newline at end of file
+    
+
+class BufferedErrorLogger(IErrorLogger):
+    """
+    Records errors and warnings in the order they are logged, so that they can be
+    passed on to another logger later, e.g. after parsing in a worker process.
+    """
+    def __init__(self):
+        # (is_error, message) pairs
+        self.entries: list[tuple[bool, str]] = []
+
+    def log_error(self, error: Exception) -> None:
+        """Records an error message."""
+        self.entries.append((True, str(error)))
+
+    def log_warning(self, warning: str) -> None:
+        """Records a warning message."""
+        self.entries.append((False, warning))
+
+    def has_errors(self) -> bool:
+        """Returns True if there are any recorded errors."""
+        return any(is_error for is_error, _message in self.entries)
+
+    def replay(self, logger: IErrorLogger) -> None:
+        """Logs all recorded messages to the given logger in their original order."""
+        for is_error, message in self.entries:
+            if is_error:
+                logger.log_error(message)
+            else:
+                logger.log_warning(message)
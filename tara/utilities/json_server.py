@@ -0,0 +1,56 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, unquote
+
+def create_json_server(host: str, port: int, handle) -> ThreadingHTTPServer:
+    """
+    Creates an HTTP server which passes each request to handle(method, path, body)
+    and sends the returned (status, response) pair as JSON.
+
+    The body of a request is parsed as JSON, an empty body is passed as None.
+    The calls of handle are serialized, so it does not have to be thread safe.
+    Connections are kept alive, so a client can send many requests over one connection.
+    """
+    lock = threading.Lock()
+
+    class JsonRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            self._handle("GET")
+
+        def do_POST(self):
+            self._handle("POST")
+
+        def do_PUT(self):
+            self._handle("PUT")
+
+        def _handle(self, method: str) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            content = self.rfile.read(length) if length else b""
+            try:
+                body = json.loads(content) if content else None
+            except ValueError:
+                self._send(400, {"error": "The request body is not valid JSON."})
+                return
+
+            with lock:
+                status, response = handle(method, unquote(urlsplit(self.path).path), body)
+            self._send(status, response)
+
+        def _send(self, status: int, response: object) -> None:
+            content = json.dumps(response).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format, *args):
+            # requests are not logged to the console
+            pass
+
+    server = ThreadingHTTPServer((host, port), JsonRequestHandler)
+    server.daemon_threads = True
+    return server
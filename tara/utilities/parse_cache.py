@@ -0,0 +1,77 @@
+import hashlib
+import os
+import pickle
+
+# Changes whenever the format of the cached objects changes, so that old entries are not used
+CACHE_VERSION = 1
+
+class ParseCache:
+    """
+    An on-disk cache for the results of parsing input files.
+
+    Each entry is keyed by the path of the file and a hash of its content, so an entry
+    is only used while the file is unchanged. The results are stored with pickle,
+    one file per entry in the cache directory.
+    """
+
+    def __init__(self, directory: str = ".tara_cache"):
+        self.directory = directory
+
+    def _get_entry_path(self, file_path: str, content: str) -> str:
+        key = hashlib.sha256(f"{CACHE_VERSION}\0{file_path}\0{content}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{key}.pickle")
+
+    def get(self, file_path: str, content: str) -> object:
+        """
+        Returns the cached result for the file with the given content or None if there is none.
+        Unreadable entries are treated as missing.
+        """
+        try:
+            with open(self._get_entry_path(file_path, content), 'rb') as f:
+                return pickle.load(f)
+        except Exception:
+            return None
+
+    def put(self, file_path: str, content: str, result: object) -> None:
+        """
+        Stores the result for the file with the given content.
+        Results which can not be stored are not cached.
+        """
+        entry_path = self._get_entry_path(file_path, content)
+        temporary_path = f"{entry_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temporary_path, 'wb') as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            # replacing is atomic, so parallel parsers never read partial entries
+            os.replace(temporary_path, entry_path)
+        except Exception:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+class MemoryParseCache:
+    """
+    Keeps the latest parse result of each file in memory, for a long running process
+    which parses the same directory again and again.
+
+    The results are not copied, so the parses of an unchanged file share the same objects.
+    """
+
+    def __init__(self):
+        # Maps a file path to the content and the result of its latest parse
+        self._entries: dict[str, tuple[str, object]] = {}
+
+    def get(self, file_path: str, content: str) -> object:
+        """
+        Returns the cached result for the file with the given content or None if there is none.
+        """
+        entry = self._entries.get(file_path)
+        if entry is None or entry[0] != content:
+            return None
+        return entry[1]
+
+    def put(self, file_path: str, content: str, result: object) -> None:
+        """
+        Stores the result for the file with the given content, replacing the result of older content.
+        """
+        self._entries[file_path] = (content, result)
@@ -0,0 +1,97 @@
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+class PhaseStatistics:
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        # The highest traced memory in bytes while the phase ran, None if memory is not traced
+        self.peak_memory: int = None
+
+class PhaseTimer:
+    """
+    Measures the wall time and optionally the peak memory of the phases of a command.
+
+    A phase can be entered several times, its calls and times add up. Phases must not be
+    nested, because the peak memory is measured by resetting the peak of tracemalloc at the
+    start of each phase. Tracing memory slows the program down considerably, the times
+    are only comparable between runs with the same setting.
+    A disabled timer measures nothing and adds almost no overhead.
+    """
+
+    def __init__(self, enabled: bool = True, trace_memory: bool = False):
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        # The statistics by phase name, in the order the phases were first entered
+        self._statistics: dict[str, PhaseStatistics] = {}
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Measures the enclosed code as a call of the phase with the given name.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            statistics = self._get_statistics(name)
+            statistics.seconds += time.perf_counter() - start
+            statistics.calls += 1
+            if self.trace_memory:
+                statistics.peak_memory = max(statistics.peak_memory or 0, tracemalloc.get_traced_memory()[1])
+
+    def wrap(self, name: str, function):
+        """
+        Returns a function which measures each call of the given function as a call of the phase.
+        Only the time is measured, so the wrapper can be used for functions called very often.
+        A disabled timer returns the function itself.
+        """
+        if not self.enabled:
+            return function
+
+        statistics = self._get_statistics(name)
+
+        def timed_function(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                statistics.seconds += time.perf_counter() - start
+                statistics.calls += 1
+
+        return timed_function
+
+    def get_statistics(self) -> list[PhaseStatistics]:
+        """
+        Returns the statistics of all phases in the order they were first entered.
+        """
+        return list(self._statistics.values())
+
+    def format_report(self) -> str:
+        """
+        Returns a table of the calls, the time and the peak memory of each phase.
+        """
+        name_width = max([len("Phase")] + [len(statistics.name) for statistics in self._statistics.values()])
+        lines = [f"{'Phase':<{name_width}}  {'Calls':>8}  {'Time [s]':>10}  {'Peak memory [MB]':>16}"]
+        for statistics in self._statistics.values():
+            peak_memory = f"{statistics.peak_memory / 1e6:.1f}" if statistics.peak_memory is not None else "-"
+            lines.append(f"{statistics.name:<{name_width}}  {statistics.calls:>8}  {statistics.seconds:>10.3f}  {peak_memory:>16}")
+        lines.append(f"{'Total':<{name_width}}  {'':>8}  {sum(statistics.seconds for statistics in self._statistics.values()):>10.3f}")
+        return "\n".join(lines)
+
+    def _get_statistics(self, name: str) -> PhaseStatistics:
+        statistics = self._statistics.get(name)
+        if statistics is None:
+            statistics = PhaseStatistics(name)
+            self._statistics[name] = statistics
+        return statistics
@@ -0,0 +1,29 @@
+from typing import TextIO
+from tara.MarkdownLib.markdown_document import MarkdownDocument
+from tara.MarkdownLib.markdown_writer import MarkdownWriter
+
+class StreamingMarkdownWriter:
+    """
+    Writes a markdown document part by part to an open file.
+    Each part is rendered and written as soon as it is passed, so only one part
+    and its text have to be in memory at a time.
+    """
+
+    def __init__(self, file: TextIO, separator: str = "\n"):
+        """
+        :param file: The file to write to.
+        :param separator: The text written between two parts.
+        """
+        self.file = file
+        self.separator = separator
+        self.writer = MarkdownWriter()
+        self._is_first_part = True
+
+    def write(self, part: MarkdownDocument) -> None:
+        """
+        Renders a part of the document and writes it to the file.
+        """
+        if not self._is_first_part:
+            self.file.write(self.separator)
+        self.file.write(self.writer.write(part))
+        self._is_first_part = False
@@ -0,0 +1,23 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+from tara.utilities.error_logger import ErrorLogger
+
+class TestErrorLogger(unittest.TestCase):
+    def test_logged_errors_are_reported(self):
+        logger = ErrorLogger()
+        output = io.StringIO()
+
+        # Act
+        with redirect_stdout(output):
+            logger.log_warning("Attack tree AT_A-1_MAN is missing.")
+            has_errors_after_warning = logger.has_errors()
+            logger.log_error("Duplicate ID found: A-1")
+
+        # Assert
+        self.assertFalse(has_errors_after_warning)
+        self.assertTrue(logger.has_errors())
+        self.assertEqual(output.getvalue(), "Warning: Attack tree AT_A-1_MAN is missing.\nError: Duplicate ID found: A-1\n")
+
+    def test_a_new_logger_has_no_errors(self):
+        self.assertFalse(ErrorLogger().has_errors())